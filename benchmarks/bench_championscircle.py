@@ -0,0 +1,412 @@
+"""Offline load benchmarks for the ChampionsCircle cog.
+
+Drives the real cog against the stand-ins in ``benchmarks.fakes`` through a
+few scripted scenarios and reports, per scenario and applicant count, the
+latency percentiles of one operation plus the Config reads/writes and Discord
+API calls it cost on average.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_championscircle             # compare with baseline.json
+    python -m benchmarks.bench_championscircle --save      # record a new baseline
+    python -m benchmarks.bench_championscircle --sizes 10 100
+
+A second table compares the stored size and ``json.dumps`` time of one
+guild's applications in the old dict format and the compact one.
+
+Call and Config counts are deterministic, so any increase over the baseline
+is reported as a regression. Latencies depend on the machine and only count
+as a regression beyond ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+import tempfile
+import time
+from collections import Counter
+from unittest import mock
+
+from redbot.core import Config
+
+from championsCircle.championsCircle import ChampionsCircle, SubmitView
+from championsCircle.database import ApplicationDatabase
+from championsCircle.questions import DEFAULT_QUESTIONS
+from championsCircle.seeding import parse_rank
+from championsCircle.state import Application
+
+from .fakes import FakeBot, FakeConfig, FakeInteraction
+
+BASELINE_PATH = pathlib.Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+# Latency regressions smaller than this are noise, whatever the ratio.
+LATENCY_FLOOR = 0.0005
+
+# Keyed by the IDs of the default questions.
+ANSWERS = {
+    "q1": "benchmark",
+    "q2": "Champion II",
+    "q3": "PC",
+    "q4": "EU",
+    "q5": "https://rocketleague.tracker.network/rocket-league/profile/epic/benchmark",
+    "q6": "Yes",
+    "q7": "Yes",
+    "q8": "None",
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Harness:
+    """One cog wired to one fake guild with ``size`` members."""
+
+    def __init__(self, size):
+        self.bot = FakeBot()
+        self.guild = self.bot.add_guild()
+        self.channel = self.guild.add_channel()
+        self.role = self.guild.add_role()
+        self.reviewer = self.guild.add_member()
+        self.members = [self.guild.add_member() for _ in range(size)]
+        self.config = FakeConfig()
+        with mock.patch.object(Config, "get_conf", return_value=self.config):
+            self.cog = ChampionsCircle(self.bot)
+
+    async def start(self):
+        # The expiry worker isn't started; scenarios drive it by hand.
+        await self.cog.state.load()
+        state = self.cog.state.get(self.guild.id)
+        state.set("champions_channel", self.channel.id)
+        state.set("champions_role_id", self.role.id)
+        state.set("reviewer_ids", [self.reviewer.id])
+        # Renders are triggered explicitly so they can be timed on their own.
+        state.set("render_window", 3600.0)
+
+    def add_applications(self, status="active", timestamp=None, members=None):
+        """Give ``members`` (default: all of the harness's) an application each, in their own guilds."""
+        now = time.time()
+        for offset, member in enumerate(self.members if members is None else members):
+            applications = self.cog.state.get(member.guild.id).applications
+            applications.add(Application(
+                member.id, status, (timestamp or now) + offset * 0.001, parse_rank(ANSWERS["q2"]), list(ANSWERS.values())
+            ))
+
+    async def settle(self):
+        """Render the board and flush state, then zero every counter."""
+        await self.cog.renderer.render(self.guild)
+        await self.cog.state.flush()
+        self.reset()
+
+    def reset(self):
+        self.bot.ledger.calls.clear()
+        self.config.reads = self.config.writes = self.config.bytes_written = 0
+
+    async def stop(self):
+        self.cog.renderer.close()
+        self.cog.expiry.stop()
+        await self.cog.state.close()
+
+
+class Measurement:
+    def __init__(self, scenario, size):
+        self.scenario = scenario
+        self.size = size
+        self.samples = []
+        self.ops = 0
+        self.calls = Counter()
+        self.config_reads = self.config_writes = self.config_bytes = 0
+
+    async def time(self, coro):
+        start = time.perf_counter()
+        result = await coro
+        self.samples.append(time.perf_counter() - start)
+        self.ops += 1
+        return result
+
+    def collect(self, harness):
+        """Add the counters accumulated since the harness's last ``reset``."""
+        self.calls.update(harness.bot.ledger.snapshot())
+        self.config_reads += harness.config.reads
+        self.config_writes += harness.config.writes
+        self.config_bytes += harness.config.bytes_written
+        harness.reset()
+
+    def result(self):
+        ops = max(self.ops, 1)
+        return {
+            "scenario": self.scenario,
+            "size": self.size,
+            "ops": self.ops,
+            "p50": percentile(self.samples, 50),
+            "p95": percentile(self.samples, 95),
+            "p99": percentile(self.samples, 99),
+            "config_reads": self.config_reads / ops,
+            "config_writes": self.config_writes / ops,
+            "config_bytes": self.config_bytes / ops,
+            "api_calls": sum(self.calls.values()) / ops,
+            "routes": {route: count / ops for route, count in sorted(self.calls.items())},
+        }
+
+
+async def registration_burst(size):
+    """Every member submits an application at once, then the board renders."""
+    harness = Harness(size)
+    await harness.start()
+    await harness.settle()
+    measurement = Measurement("registration_burst", size)
+
+    async def submit(member):
+        view = SubmitView(harness.cog, member, dict(ANSWERS), harness.guild.id)
+        await measurement.time(view.submit.callback(FakeInteraction(member, harness.guild)))
+
+    await asyncio.gather(*(submit(member) for member in harness.members))
+    await harness.cog.renderer.render(harness.guild)
+    await harness.cog.state.flush()
+    measurement.collect(harness)
+    await harness.stop()
+    return measurement.result()
+
+
+async def single_approvals(size):
+    """A reviewer approves every pending application one by one."""
+    harness = Harness(size)
+    await harness.start()
+    harness.add_applications()
+    await harness.settle()
+    measurement = Measurement("single_approvals", size)
+    for member in harness.members:
+        await measurement.time(harness.cog.review_applications(harness.guild, [member.id], "approved"))
+    await harness.cog.renderer.render(harness.guild)
+    await harness.cog.state.flush()
+    measurement.collect(harness)
+    await harness.stop()
+    return measurement.result()
+
+
+async def mass_approval(size, repeat):
+    """``ccapprove all``: every pending application approved in one call."""
+    measurement = Measurement("mass_approval", size)
+    for _ in range(repeat):
+        harness = Harness(size)
+        await harness.start()
+        harness.add_applications()
+        await harness.settle()
+        user_ids = harness.cog.select_pending(harness.guild, ["all"])
+        await measurement.time(harness.cog.review_applications(harness.guild, user_ids, "approved"))
+        await harness.cog.renderer.render(harness.guild)
+        await harness.cog.state.flush()
+        measurement.collect(harness)
+        await harness.stop()
+    return measurement.result()
+
+
+async def expiry_sweep(size, repeat):
+    """Every active application is past its deadline when the sweep runs."""
+    measurement = Measurement("expiry_sweep", size)
+    for _ in range(repeat):
+        harness = Harness(size)
+        await harness.start()
+        state = harness.cog.state.get(harness.guild.id)
+        harness.add_applications(timestamp=time.time() - state["application_duration"] * 86400 - 60)
+        harness.cog.expiry.reschedule_guild(state)
+        await harness.settle()
+
+        await measurement.time(harness.cog.expiry.sweep(time.time()))
+        await harness.cog.renderer.render(harness.guild)
+        await harness.cog.state.flush()
+        measurement.collect(harness)
+        await harness.stop()
+    return measurement.result()
+
+
+async def full_render(size, repeat):
+    """Rebuild the whole board, as ``starttourney`` and setting changes do."""
+    harness = Harness(size)
+    await harness.start()
+    harness.add_applications()
+    await harness.settle()
+    measurement = Measurement("full_render", size)
+    for _ in range(repeat):
+        # Forget the cached board so every message is actually re-sent.
+        harness.cog.renderer.forget(harness.guild.id)
+        await measurement.time(harness.cog.update_embed(harness.guild))
+    await harness.cog.state.flush()
+    measurement.collect(harness)
+    await harness.stop()
+    return measurement.result()
+
+
+async def incremental_render(size, samples=50):
+    """Re-render after one applicant's status changed."""
+    harness = Harness(size)
+    await harness.start()
+    harness.add_applications()
+    await harness.settle()
+    measurement = Measurement("incremental_render", size)
+    applications = harness.cog.state.get(harness.guild.id).applications
+    for member in harness.members[:samples]:
+        applications.set_status(member.id, "denied")
+        harness.cog.schedule_embed_update(harness.guild, member.id)
+        await measurement.time(harness.cog.renderer.render(harness.guild))
+    await harness.cog.state.flush()
+    measurement.collect(harness)
+    await harness.stop()
+    return measurement.result()
+
+
+async def flushed_approvals(size, backend, samples=50):
+    """Approve one applicant and write it out straight away, per storage backend."""
+    harness = Harness(size)
+    await harness.start()
+    harness.add_applications()
+    await harness.settle()
+    with tempfile.TemporaryDirectory() as directory:
+        if backend == "sqlite":
+            await harness.cog.state.switch_backend(ApplicationDatabase(pathlib.Path(directory) / "applications.sqlite3").open())
+            harness.reset()
+        measurement = Measurement(f"flushed_approval_{backend}", size)
+        applications = harness.cog.state.get(harness.guild.id).applications
+        for member in harness.members[:samples]:
+            applications.set_status(member.id, "approved")
+            await measurement.time(harness.cog.state.flush())
+        measurement.collect(harness)
+        await harness.stop()
+        if harness.cog.state.database is not None:
+            harness.cog.state.database.close()
+    return measurement.result()
+
+
+async def run_all(sizes, repeat):
+    results = []
+    for size in sizes:
+        results.append(await registration_burst(size))
+        results.append(await single_approvals(size))
+        results.append(await mass_approval(size, repeat))
+        results.append(await expiry_sweep(size, repeat))
+        results.append(await full_render(size, repeat))
+        results.append(await incremental_render(size))
+        results.append(await flushed_approvals(size, "config"))
+        results.append(await flushed_approvals(size, "sqlite"))
+    return results
+
+
+def storage_footprint(sizes, repeat):
+    """Bytes and serialization time of ``size`` applications, dict format vs compact."""
+    rows = []
+    for size in sizes:
+        compact = {
+            str(user_id): Application(
+                user_id, "active", 1700000000.0 + user_id, parse_rank(ANSWERS["q2"]), list(ANSWERS.values())
+            ).encode()
+            for user_id in range(10**17, 10**17 + size)
+        }
+        # What the same applications looked like before answers were positional.
+        questions = [question["id"] for question in DEFAULT_QUESTIONS]
+        legacy = {
+            key: {
+                "user_id": int(key),
+                "status": "active",
+                "timestamp": entry[1],
+                "answers": dict(zip(questions, entry[3])),
+                "rank": entry[2],
+            }
+            for key, entry in compact.items()
+        }
+        row = {"size": size}
+        for name, value in (("dict", legacy), ("compact", compact)):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                encoded = json.dumps(value)
+                timings.append(time.perf_counter() - start)
+            row[f"{name}_bytes"] = len(encoded)
+            row[f"{name}_seconds"] = min(timings)
+        rows.append(row)
+    return rows
+
+
+def print_footprint(rows):
+    header = f"{'size':>7}{'dict KiB':>12}{'compact KiB':>14}{'saved':>8}{'dict ms':>10}{'compact ms':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        saved = 1 - r["compact_bytes"] / r["dict_bytes"]
+        print(
+            f"{r['size']:>7}{r['dict_bytes'] / 1024:>12.1f}{r['compact_bytes'] / 1024:>14.1f}{saved:>8.0%}"
+            f"{r['dict_seconds'] * 1000:>10.3f}{r['compact_seconds'] * 1000:>12.3f}"
+        )
+
+
+def _key(result):
+    return f"{result['scenario']}/{result['size']}"
+
+
+def print_table(results):
+    header = f"{'scenario':<25}{'size':>7}{'ops':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'cfg r/op':>10}{'cfg w/op':>10}{'api/op':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<25}{r['size']:>7}{r['ops']:>7}"
+            f"{r['p50'] * 1000:>10.3f}{r['p95'] * 1000:>10.3f}{r['p99'] * 1000:>10.3f}"
+            f"{r['config_reads']:>10.3f}{r['config_writes']:>10.3f}{r['api_calls']:>10.3f}"
+        )
+
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regressions against ``baseline``."""
+    regressions = []
+    for result in results:
+        base = baseline.get(_key(result))
+        if base is None:
+            continue
+        for field in ("config_reads", "config_writes", "api_calls"):
+            if result[field] > base[field] + 1e-9:
+                regressions.append(f"{_key(result)}: {field} {base[field]:.3f} -> {result[field]:.3f} per op")
+        for field in ("p50", "p95"):
+            if result[field] > base[field] * (1 + tolerance) and result[field] - base[field] > LATENCY_FLOOR:
+                regressions.append(
+                    f"{_key(result)}: {field} {base[field] * 1000:.3f}ms -> {result[field] * 1000:.3f}ms"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="runs of the single-shot scenarios")
+    parser.add_argument("--save", action="store_true", help=f"write the results to {BASELINE_PATH.name}")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative latency increase")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_all(args.sizes, args.repeat))
+    print_table(results)
+    print()
+    print_footprint(storage_footprint(args.sizes, args.repeat))
+
+    if args.save:
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        baseline.update({_key(result): result for result in results})
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved {len(results)} results to {BASELINE_PATH}")
+        return 0
+
+    if not BASELINE_PATH.exists():
+        print("\nNo baseline recorded yet; run with --save to create one.")
+        return 0
+    regressions = compare(results, json.loads(BASELINE_PATH.read_text()), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"- {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
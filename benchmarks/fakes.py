@@ -0,0 +1,279 @@
+"""In-process stand-ins for the bot, Discord objects and Red's Config.
+
+Every fake that would make a REST call in production records it on a shared
+``ApiLedger`` instead, so a benchmark can report how many calls an operation
+would have cost.
+"""
+import asyncio
+import copy
+import itertools
+import json
+import random
+from collections import Counter
+from datetime import datetime, timezone
+
+_ids = itertools.count(10**17)
+
+
+def snowflake():
+    return next(_ids)
+
+
+class ApiLedger:
+    """Counts calls by route. With ``latency`` set, role edits also sleep up to that many seconds."""
+
+    def __init__(self, latency=None):
+        self.calls = Counter()
+        self.latency = latency
+
+    def record(self, route):
+        self.calls[route] += 1
+
+    async def wait(self):
+        if self.latency is not None:
+            await asyncio.sleep(random.uniform(0, self.latency))
+
+    def snapshot(self):
+        return Counter(self.calls)
+
+
+class FakeGroup:
+    def __init__(self, config, guild_id):
+        self.config = config
+        self.guild_id = guild_id
+
+    async def set_raw(self, key, value):
+        self.config.writes += 1
+        self.config.bytes_written += len(json.dumps(value))
+        self.config.data.setdefault(self.guild_id, {})[key] = copy.deepcopy(value)
+
+    async def clear_raw(self, key):
+        self.config.writes += 1
+        self.config.data.get(self.guild_id, {}).pop(key, None)
+
+    async def get_raw(self, key):
+        self.config.reads += 1
+        return copy.deepcopy(self.config.data.get(self.guild_id, {}).get(key, self.config.defaults[key]))
+
+
+class FakeConfig:
+    """Dict-backed Config that counts reads, writes and bytes serialized."""
+
+    def __init__(self):
+        self.defaults = {}
+        self.data = {}
+        self.reads = 0
+        self.writes = 0
+        self.bytes_written = 0
+
+    def register_guild(self, **defaults):
+        self.defaults = defaults
+
+    def register_global(self, **defaults):
+        self.global_defaults = defaults
+
+    async def all_guilds(self):
+        self.reads += 1
+        return {
+            guild_id: {**copy.deepcopy(self.defaults), **copy.deepcopy(data)}
+            for guild_id, data in self.data.items()
+        }
+
+    def guild_from_id(self, guild_id):
+        return FakeGroup(self, guild_id)
+
+    def guild(self, guild):
+        return FakeGroup(self, guild.id)
+
+
+class FakeRole:
+    def __init__(self, guild, name="Champions"):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+    @property
+    def members(self):
+        return [member for member in self.guild.members.values() if self in member.roles]
+
+
+class FakeMember:
+    def __init__(self, guild, ledger, user_id=None):
+        self.id = user_id or snowflake()
+        self.guild = guild
+        self.name = f"player{self.id % 100000}"
+        self.mention = f"<@{self.id}>"
+        self.bot = False
+        self.roles = []
+        self._ledger = ledger
+
+    async def add_roles(self, *roles, reason=None):
+        self._ledger.record("PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}")
+        await self._ledger.wait()
+        self.roles.extend(role for role in roles if role not in self.roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        self._ledger.record("DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}")
+        await self._ledger.wait()
+        self.roles = [role for role in self.roles if role not in roles]
+
+    async def send(self, content=None, **kwargs):
+        self._ledger.record("POST /users/@me/channels")
+        self._ledger.record("POST /channels/{channel_id}/messages")
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id=None):
+        self.id = message_id or snowflake()
+        self.channel = channel
+        self.created_at = datetime.now(timezone.utc)
+
+    async def edit(self, **kwargs):
+        self.channel.ledger.record("PATCH /channels/{channel_id}/messages/{message_id}")
+
+    async def delete(self):
+        self.channel.ledger.record("DELETE /channels/{channel_id}/messages/{message_id}")
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+    def __init__(self, guild, ledger):
+        self.id = snowflake()
+        self.guild = guild
+        self.ledger = ledger
+        self.messages = {}
+        self.mention = f"<#{self.id}>"
+
+    async def send(self, content=None, **kwargs):
+        self.ledger.record("POST /channels/{channel_id}/messages")
+        message = FakeMessage(self)
+        self.messages[message.id] = message
+        return message
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self, message_id)
+
+    async def fetch_message(self, message_id):
+        self.ledger.record("GET /channels/{channel_id}/messages/{message_id}")
+        return FakeMessage(self, message_id)
+
+    async def history(self, limit=100, before=None):
+        self.ledger.record("GET /channels/{channel_id}/messages")
+        ordered = sorted(self.messages.values(), key=lambda message: message.id, reverse=True)
+        if before is not None:
+            ordered = [message for message in ordered if message.id < before.id]
+        for message in ordered[:limit]:
+            yield message
+
+    async def delete_messages(self, messages):
+        self.ledger.record("POST /channels/{channel_id}/messages/bulk-delete")
+        for message in messages:
+            self.messages.pop(message.id, None)
+
+
+class FakeGuild:
+    def __init__(self, ledger):
+        self.id = snowflake()
+        self.name = "Benchmark Guild"
+        self.members = {}
+        self.roles = {}
+        self.channels = {}
+        self.ledger = ledger
+
+    def add_member(self):
+        member = FakeMember(self, self.ledger)
+        self.members[member.id] = member
+        return member
+
+    def add_role(self, name="Champions"):
+        role = FakeRole(self, name)
+        self.roles[role.id] = role
+        return role
+
+    def add_channel(self):
+        channel = FakeChannel(self, self.ledger)
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+class FakeBot:
+    def __init__(self, latency=None):
+        self.ledger = ApiLedger(latency)
+        self.guilds_by_id = {}
+        self.cogs = {}
+
+    @property
+    def guilds(self):
+        return list(self.guilds_by_id.values())
+
+    def add_guild(self):
+        guild = FakeGuild(self.ledger)
+        self.guilds_by_id[guild.id] = guild
+        return guild
+
+    def get_guild(self, guild_id):
+        return self.guilds_by_id.get(guild_id)
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds_by_id.values():
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+
+    def get_user(self, user_id):
+        for guild in self.guilds_by_id.values():
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member
+        return None
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    async def wait_until_red_ready(self):
+        return
+
+    async def is_admin(self, member):
+        return True
+
+
+class _FakeResponse:
+    def __init__(self, ledger):
+        self._ledger = ledger
+
+    async def defer(self, **kwargs):
+        self._ledger.record("POST /interactions/{interaction_id}/{token}/callback")
+
+    async def send_message(self, *args, **kwargs):
+        self._ledger.record("POST /interactions/{interaction_id}/{token}/callback")
+
+    async def send_modal(self, modal):
+        self._ledger.record("POST /interactions/{interaction_id}/{token}/callback")
+
+
+class _FakeFollowup:
+    def __init__(self, ledger):
+        self._ledger = ledger
+
+    async def send(self, *args, **kwargs):
+        self._ledger.record("POST /webhooks/{application_id}/{token}")
+
+
+class FakeInteraction:
+    def __init__(self, user, guild=None):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.response = _FakeResponse(user._ledger)
+        self.followup = _FakeFollowup(user._ledger)
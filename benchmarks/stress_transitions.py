@@ -0,0 +1,173 @@
+"""Concurrency stress test for ChampionsCircle application transitions.
+
+Every member of several fake guilds submits once, and reviewers then race
+each other: approvals and denials from the reviewer DM buttons, ``ccapprove``
+and ``ccdeny`` on everyone pending, the Cancel Application button, expiry
+sweeps and applicants submitting again, all interleaved at random. Role edits take a random few
+milliseconds, as real API calls would, so a transition that awaits in the
+middle can be overtaken. Afterwards every guild must be consistent:
+
+- each application sits in exactly the status index it says it has;
+- the seeding index holds exactly the approved applicants;
+- the Champions role is held by exactly the approved applicants.
+
+Run from the repository root::
+
+    python -m benchmarks.stress_transitions
+    python -m benchmarks.stress_transitions --guilds 8 --members 500 --seed 7
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from unittest import mock
+
+from redbot.core import Config
+
+from championsCircle.championsCircle import AdminResponseView, CancelApplicationButton, ChampionsCircle, SubmitView
+
+from .bench_championscircle import ANSWERS
+from .fakes import FakeBot, FakeConfig, FakeInteraction
+
+ROLE_LATENCY = 0.003  # seconds, upper bound per role edit
+MAX_DELAY = 0.05  # seconds an operation may wait before firing
+
+
+async def _after(delay, coro):
+    await asyncio.sleep(delay)
+    await coro
+
+
+class Stress:
+    def __init__(self, guilds, members, rng):
+        self.rng = rng
+        self.bot = FakeBot(latency=ROLE_LATENCY)
+        self.config = FakeConfig()
+        with mock.patch.object(Config, "get_conf", return_value=self.config):
+            self.cog = ChampionsCircle(self.bot)
+        self.guilds = []
+        for _ in range(guilds):
+            guild = self.bot.add_guild()
+            guild.role = guild.add_role()
+            guild.reviewers = [guild.add_member(), guild.add_member()]
+            guild.applicants = [guild.add_member() for _ in range(members)]
+            self.guilds.append(guild)
+        self.operations = Counter()
+
+    async def start(self):
+        await self.cog.state.load()
+        for guild in self.guilds:
+            state = self.cog.state.get(guild.id)
+            state.set("champions_role_id", guild.role.id)
+            state.set("reviewer_ids", [reviewer.id for reviewer in guild.reviewers])
+            state.set("render_window", 3600.0)
+
+    async def stop(self):
+        self.cog.renderer.close()
+        self.cog.expiry.stop()
+        await self.cog.state.close()
+
+    def workload(self):
+        """One coroutine per operation, each delayed by a random amount."""
+        operations = []
+        for guild in self.guilds:
+            for member in guild.applicants:
+                operations.append(("submit", self.submit(guild, member)))
+                for _ in range(self.rng.randint(1, 3)):
+                    kind = self.rng.choice(("approve", "approve", "deny", "cancel", "expire", "resubmit"))
+                    operations.append((kind, getattr(self, kind)(guild, member)))
+            for _ in range(3):
+                operations.append(("ccapprove", self.review_all(guild, "approved")))
+                operations.append(("ccdeny", self.review_all(guild, "denied")))
+        self.rng.shuffle(operations)
+        for kind, _ in operations:
+            self.operations[kind] += 1
+        return [_after(self.rng.uniform(0, MAX_DELAY), coro) for _, coro in operations]
+
+    async def submit(self, guild, member):
+        view = SubmitView(self.cog, member, dict(ANSWERS), guild.id)
+        await view.submit.callback(FakeInteraction(member, guild))
+
+    async def resubmit(self, guild, member):
+        await self.submit(guild, member)
+
+    async def approve(self, guild, member):
+        view = AdminResponseView(self.cog, member.id, guild.id)
+        await view.approve.callback(FakeInteraction(self.rng.choice(guild.reviewers), guild))
+
+    async def deny(self, guild, member):
+        view = AdminResponseView(self.cog, member.id, guild.id)
+        await view.deny.callback(FakeInteraction(self.rng.choice(guild.reviewers), guild))
+
+    async def cancel(self, guild, member):
+        await CancelApplicationButton(self.cog).callback(FakeInteraction(member, guild))
+
+    async def expire(self, guild, member):
+        await self.cog.expire_applications(guild, [member.id])
+
+    async def review_all(self, guild, status):
+        await self.cog.review_applications(guild, self.cog.select_pending(guild, ["all"]), status)
+
+    def check(self):
+        """Return a description of every inconsistency found."""
+        problems = []
+        for guild in self.guilds:
+            applications = self.cog.state.get(guild.id).applications
+            for status, index in applications._by_status.items():
+                for user_id in index:
+                    if applications.get(user_id).status != status:
+                        problems.append(f"guild {guild.id}: {user_id} indexed as {status}")
+            if sum(len(index) for index in applications._by_status.values()) != len(applications):
+                problems.append(f"guild {guild.id}: status indexes don't cover every application exactly once")
+            approved = {application.user_id for application in applications.with_status("approved")}
+            if set(applications.seeding.seeds()) != approved:
+                problems.append(f"guild {guild.id}: seeding index doesn't match the approved applicants")
+            holders = {member.id for member in guild.role.members}
+            for user_id in holders - approved:
+                problems.append(f"guild {guild.id}: {user_id} holds the role while {applications.get(user_id).status}")
+            for user_id in approved - holders:
+                problems.append(f"guild {guild.id}: {user_id} is approved without the role")
+        return problems
+
+
+async def run(guilds, members, seed):
+    stress = Stress(guilds, members, random.Random(seed))
+    await stress.start()
+    operations = stress.workload()
+    start = time.perf_counter()
+    await asyncio.gather(*operations)
+    elapsed = time.perf_counter() - start
+    problems = stress.check()
+    statuses = Counter(
+        application.status
+        for guild in stress.guilds
+        for application in stress.cog.state.get(guild.id).applications.applications.values()
+    )
+    await stress.stop()
+    return stress.operations, statuses, elapsed, problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--members", type=int, default=250, help="applicants per guild")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    operations, statuses, elapsed, problems = asyncio.run(run(args.guilds, args.members, args.seed))
+    total = sum(operations.values())
+    print(f"{total} operations in {elapsed:.2f}s across {args.guilds} guilds: " + ", ".join(f"{count} {kind}" for kind, count in sorted(operations.items())))
+    print("Final statuses: " + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())))
+    if problems:
+        print(f"\n{len(problems)} inconsistencies:")
+        for line in problems[:50]:
+            print(f"- {line}")
+        return 1
+    print("\nState is consistent.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
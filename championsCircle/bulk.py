@@ -0,0 +1,257 @@
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import timedelta
+
+import discord
+
+log = logging.getLogger("red.championsCircle.bulk")
+
+# Role edits share one per-guild rate limit bucket; discord.py waits out the
+# bucket itself, so a handful of requests in flight keeps it saturated
+# without queueing hundreds of sleeping requests behind it.
+ROLE_CONCURRENCY = 4
+DM_CONCURRENCY = 4
+MAX_ATTEMPTS = 3
+# Discord refuses to bulk-delete messages older than 14 days; leave a margin
+# so a message doesn't cross the line between listing and deleting it.
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=10)
+BULK_DELETE_BATCH = 100
+
+_inline_sends = set()  # queue_dm tasks still sending
+
+
+class ProgressMessage:
+    """A single status message that is edited at most every ``interval`` seconds."""
+
+    def __init__(self, channel, label, total=None, interval=3.0):
+        self.channel = channel
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.message = None
+        self._last_edit = 0.0
+        self._editing = False
+
+    def _text(self):
+        if self.total is None:
+            return f"{self.label}: {self.done}"
+        return f"{self.label}: {self.done}/{self.total}"
+
+    async def start(self):
+        self.message = await self.channel.send(self._text())
+        self._last_edit = time.monotonic()
+
+    async def advance(self, count=1):
+        self.done += count
+        if self.message is None or self._editing or time.monotonic() - self._last_edit < self.interval:
+            return
+        self._editing = True
+        try:
+            await self.message.edit(content=self._text())
+        except discord.HTTPException:
+            pass
+        finally:
+            self._last_edit = time.monotonic()
+            self._editing = False
+
+    async def finish(self, text, delete_after=None):
+        if self.message is not None:
+            try:
+                await self.message.edit(content=text, delete_after=delete_after)
+                return
+            except discord.HTTPException:
+                pass
+        await self.channel.send(text, delete_after=delete_after)
+
+
+class RoleMutationResult:
+    def __init__(self):
+        self.succeeded = []
+        self.skipped = []
+        self.failed = []  # (member, reason)
+
+    def report(self, action, limit=20):
+        """Human-readable summary, listing at most ``limit`` failures."""
+        lines = [f"{action}: {len(self.succeeded)} succeeded, {len(self.skipped)} already done, {len(self.failed)} failed."]
+        for member, reason in self.failed[:limit]:
+            lines.append(f"- {member.mention}: {reason}")
+        if len(self.failed) > limit:
+            lines.append(f"...and {len(self.failed) - limit} more.")
+        return "\n".join(lines)
+
+
+async def with_retries(call):
+    """Await ``call()``, retrying 429 and 5xx responses with backoff.
+
+    Returns None on success or a short reason on failure.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            await call()
+            return None
+        except discord.Forbidden:
+            return "missing permissions"
+        except discord.NotFound:
+            return "no longer exists"
+        except discord.HTTPException as e:
+            retryable = e.status == 429 or e.status >= 500
+            if not retryable or attempt == MAX_ATTEMPTS - 1:
+                return str(e)
+            await asyncio.sleep(2 ** attempt)
+
+
+async def _mutate(member, role, add, reason):
+    if add:
+        return await with_retries(lambda: member.add_roles(role, reason=reason))
+    return await with_retries(lambda: member.remove_roles(role, reason=reason))
+
+
+async def mutate_roles(members, role, add=True, progress=None, reason=None, concurrency=ROLE_CONCURRENCY, lock=None):
+    """Add or remove ``role`` for many members with bounded concurrency.
+
+    ``add`` may also be a callable taking the member, asked right before
+    that member's edit. ``lock``, if given, is called with the member and
+    must return an async context manager; the decision and the edit both
+    happen inside it. Members that already have the desired state are
+    skipped without an API call. Failures are collected in the returned
+    ``RoleMutationResult`` instead of aborting the run.
+    """
+    result = RoleMutationResult()
+    pending = iter(list(members))
+
+    async def apply(member):
+        wanted = add(member) if callable(add) else add
+        if (role in member.roles) == wanted:
+            result.skipped.append(member)
+            return
+        error = await _mutate(member, role, wanted, reason)
+        if error is None:
+            result.succeeded.append(member)
+        else:
+            log.error(f"Failed to {'add' if wanted else 'remove'} {role.name} for {member.name}: {error}")
+            result.failed.append((member, error))
+
+    async def worker():
+        for member in pending:
+            async with lock(member) if lock is not None else contextlib.nullcontext():
+                await apply(member)
+            if progress is not None:
+                await progress.advance()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result
+
+
+def queue_dm(bot, user, content=None, *, source, urgent=False, **kwargs):
+    """DM ``user`` through the DMQueue cog if it is loaded, or inline otherwise.
+
+    Inline sends retry 429 and 5xx responses and log failures. Either way
+    this returns at once with an awaitable of whether the DM was delivered;
+    awaiting it is optional. ``urgent`` puts it ahead of bulk notices in the
+    queue.
+    """
+    queue = bot.get_cog("DMQueue")
+    if queue is not None:
+        return queue.submit(user, content, source=source, urgent=urgent, **kwargs)
+    task = asyncio.ensure_future(_send_inline(user, content, source, **kwargs))
+    # The loop only keeps weak references to tasks; hold this one until it's done.
+    _inline_sends.add(task)
+    task.add_done_callback(_inline_sends.discard)
+    return task
+
+
+async def _send_inline(user, content, source, **kwargs):
+    error = await with_retries(lambda: user.send(content, **kwargs))
+    if error is not None:
+        log.error(f"Failed to send {source} DM to user {user.id}: {error}")
+    return error is None
+
+
+async def send_dms(users, content, concurrency=DM_CONCURRENCY, bot=None, source=None):
+    """DM ``content`` to many users; returns a list of (user, reason) failures.
+
+    With ``bot`` and the DMQueue cog loaded the DMs are queued instead, and
+    this returns right away with no failures; the queue reports those.
+    """
+    queue = bot.get_cog("DMQueue") if bot is not None else None
+    if queue is not None:
+        for user in users:
+            queue.submit(user, content, source=source)
+        return []
+
+    failed = []
+    pending = iter(list(users))
+
+    async def worker():
+        for user in pending:
+            error = await with_retries(lambda user=user: user.send(content))
+            if error is not None:
+                log.error(f"Failed to send DM to user {user.id}: {error}")
+                failed.append((user, error))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return failed
+
+
+class PurgeResult:
+    def __init__(self):
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+
+    @property
+    def deleted(self):
+        return self.bulk_deleted + self.single_deleted
+
+    def report(self):
+        text = f"Deleted {self.deleted} messages ({self.bulk_deleted} in bulk, {self.single_deleted} individually)."
+        if self.failed:
+            text += f" {self.failed} could not be deleted."
+        return text
+
+
+async def purge_channel(channel, progress=None, keep=()):
+    """Delete every message in ``channel`` except the IDs in ``keep``.
+
+    History is streamed a page of 100 at a time, newest first. Messages young
+    enough are removed with one bulk-delete call per page; only older ones
+    fall back to single deletes, one at a time. ``discord.Forbidden`` is
+    raised to the caller if the bot can't manage messages at all.
+    """
+    result = PurgeResult()
+    keep = set(keep)
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    before = None
+    while True:
+        page = [message async for message in channel.history(limit=BULK_DELETE_BATCH, before=before)]
+        if not page:
+            break
+        before = page[-1]
+        page = [message for message in page if message.id not in keep]
+        recent = [message for message in page if message.created_at > cutoff]
+        old = [message for message in page if message.created_at <= cutoff]
+
+        if recent:
+            try:
+                await channel.delete_messages(recent)
+            except discord.Forbidden:
+                raise
+            except discord.HTTPException as e:
+                log.error(f"Bulk delete failed, deleting individually: {str(e)}")
+                old = recent + old
+            else:
+                result.bulk_deleted += len(recent)
+                if progress is not None:
+                    await progress.advance(len(recent))
+
+        for message in old:
+            if await with_retries(message.delete) is None:
+                result.single_deleted += 1
+            else:
+                result.failed += 1
+            if progress is not None:
+                await progress.advance()
+    return result
@@ -1,9 +1,30 @@
 import discord
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import box
+from redbot.core.utils.menus import menu, DEFAULT_CONTROLS
 from discord.ext.commands import guild_only
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from .bulk import ProgressMessage, mutate_roles, purge_channel, queue_dm, send_dms
+from .database import BACKENDS, DATABASE_FILENAME, ApplicationDatabase
+from .dmrouter import DMRouter
+from .expiry import EXPIRY_CONCURRENCY, ExpiryScheduler
+from .export import EXPORT_FORMATS, UPLOAD_MARGIN, encode_csv, encode_jsonl, iter_records, pack_files, snapshot_ids
+from .instrumentation import Instrumentation
+from .questions import DEFAULT_QUESTIONS, MAX_ANSWER_LENGTH, QUESTION_ROLES, QUESTION_TYPES, question_from_text
+from .render import RenderScheduler
+from .seeding import application_rank, build_bracket, format_rank, parse_rank
+from .state import STATUSES, Application, GuildStateCache
+
+REVIEW_PAGE_LIMIT = 25  # pages built per ccreview call
+BRACKET_MATCHES_PER_PAGE = 15
+APPROVED_ALREADY = "Your Champions Circle application has already been approved. Cancel it first if you want to apply again."
 
 class ChampionsCircle(commands.Cog):
     def __init__(self, bot):
@@ -12,45 +33,89 @@ class ChampionsCircle(commands.Cog):
         default_guild = {
             "champions_channel": None,
             "champions_role_id": None,
-            "active_applications": [],
-            "cancelled_applications": [],
-            "approved_applications": [],
-            "denied_applications": [],
+            "applications": {},  # str(user_id) -> compact application, see state.Application
+            "schema_version": 0,
             "champions_message_id": None,
+            "board_message_ids": [],  # applicant shard messages, in board order
             "application_duration": 7,  # days
-            "custom_questions": [
-                "Epic Account ID:",
-                "Rank:",
-                "Primary Platform (PC, Xbox, PlayStation, Switch):",
-                "Preferred Region for Matches (NA East, NA West, EU, Other - please specify if Other):",
-                "RL Tracker Link:",
-                "Have you read and understood the tournament rules? (Yes/No)",
-                "Do you agree to follow the tournament code of conduct? (Yes/No)",
-                "Any special requests or additional notes? (e.g., match scheduling preferences, etc)"
-            ],
+            "custom_questions": DEFAULT_QUESTIONS,  # question objects, see questions.QuestionSchema
             "tourney_title": "Champions Circle Tournament",
             "tourney_description": "Join our exciting tournament!",
             "tourney_time": None,  # We'll store this as a UTC timestamp
+            "render_window": 2.0,  # seconds to coalesce embed updates
+            "reviewer_ids": [],  # users who receive new applications and may use the review commands
+            "questionnaire_mode": "modal",  # "modal" forms or the "dm" question-by-question flow
         }
         self.config.register_guild(**default_guild)
+        self.config.register_global(
+            storage_backend="config",  # where applications live, see ccstorage
+            expiry_concurrency=EXPIRY_CONCURRENCY,  # guilds swept at once
+        )
+        self.instrumentation = Instrumentation(bot)
+        self.state = GuildStateCache(self.config, default_guild, timer=self.instrumentation.time_config)
+        self.renderer = RenderScheduler(self)
+        self.expiry = ExpiryScheduler(self)
+        self.dm_router = DMRouter()
+        self._background = set()  # fire-and-forget tasks, kept referenced until done
         self.logger = logging.getLogger("red.championsCircle")
-        self.admin_user_id = 131881984690487296  # Replace with the actual admin user ID
+        self.admin_user_id = 131881984690487296  # Fallback reviewer when a guild has none configured
         self.application_cooldowns = commands.CooldownMapping.from_cooldown(1, 3600, commands.BucketType.user)
 
+    async def cog_load(self):
+        self.instrumentation.install()
+        self.instrumentation.start_exporter(str(cog_data_path(self) / "metrics.prom"))
+        if await self.config.storage_backend() == "sqlite":
+            self.state.database = self.open_database()
+        await self.state.load()
+        self.expiry.concurrency = await self.config.expiry_concurrency()
+        self.expiry.start()
+
+    async def cog_unload(self):
+        self.instrumentation.uninstall()
+        self.expiry.stop()
+        for task in self._background:
+            task.cancel()
+        self.dm_router.close_all()
+        self.renderer.close()
+        await self.state.close()
+        if self.state.database is not None:
+            self.state.database.close()
+
+    def in_background(self, coro):
+        """Run ``coro`` without waiting for it; it is cancelled on unload."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def open_database(self):
+        return ApplicationDatabase(cog_data_path(self) / DATABASE_FILENAME).open()
+
     def reset_cooldowns(self):
         self.application_cooldowns = commands.CooldownMapping.from_cooldown(1, 3600, commands.BucketType.user)
 
     @commands.Cog.listener()
     async def on_ready(self):
         self.logger.info(f"ChampionsCircle is ready!")
-        self.bot.loop.create_task(self.close_expired_applications())
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.guild is None and not message.author.bot:
+            self.dm_router.dispatch(message)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        # Their board entry switches to "User left server".
+        state = self.state.peek(member.guild.id)
+        if state and state.applications.get(member.id):
+            self.schedule_embed_update(member.guild, member.id)
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     @guild_only()
     async def starttourney(self, ctx):
         """Start a new tournament and set up the join button for Champions Circle applications."""
-        if ctx.channel.id != await self.config.guild(ctx.guild).champions_channel():
+        if ctx.channel.id != self.state.get(ctx.guild.id)["champions_channel"]:
             await ctx.send("This command can only be used in the Champions Circle channel.")
             return
 
@@ -60,7 +125,10 @@ class ChampionsCircle(commands.Cog):
         
         embed = discord.Embed(title="Champions Circle Applications", description="Current applicants and their status.", color=0x00ff00)
         message = await ctx.send(embed=embed, view=view)
-        await self.config.guild(ctx.guild).champions_message_id.set(message.id)
+        self.renderer.forget(ctx.guild.id)
+        state = self.state.get(ctx.guild.id)
+        state.set("champions_message_id", message.id)
+        state.set("board_message_ids", [])
         await self.update_embed(ctx.guild)
 
         # Delete the command message
@@ -74,35 +142,37 @@ class ChampionsCircle(commands.Cog):
     @commands.command()
     @commands.has_permissions(administrator=True)
     @guild_only()
-    async def test_role_assign(self, ctx, member: discord.Member):
-        role = ctx.guild.get_role(await self.config.guild(ctx.guild).champions_role_id())
+    async def test_role_assign(self, ctx, members: commands.Greedy[discord.Member]):
+        """Assign the Champions role to one or more members."""
+        role = ctx.guild.get_role(self.state.get(ctx.guild.id)["champions_role_id"])
         if role is None:
             await ctx.send("Error: Champions role not found.")
             return
-        try:
-            await member.add_roles(role)
-            await ctx.send(f"Successfully assigned {role.name} to {member.name}")
-        except discord.Forbidden:
-            await ctx.send("Error: I don't have permission to assign roles.")
-        except discord.HTTPException as e:
-            await ctx.send(f"An error occurred: {str(e)}")
+        if not members:
+            await ctx.send_help(ctx.command)
+            return
+        progress = ProgressMessage(ctx.channel, f"Assigning {role.name}", len(members))
+        await progress.start()
+        result = await mutate_roles(members, role, add=True, progress=progress)
+        await progress.finish(result.report(f"Assigning {role.name}"))
 
     @commands.command()
     @guild_only()
     async def list_champions(self, ctx):
-        approved_applications = await self.config.guild(ctx.guild).approved_applications()
-        if not approved_applications:
+        applications = self.state.get(ctx.guild.id).applications
+        if not applications.count("approved"):
             await ctx.send("There are no champions yet!")
             return
 
+        schema = self.state.get(ctx.guild.id).questions
         embed = discord.Embed(title="Champions Circle", description="Our esteemed champions:", color=0x00ff00)
-        for application in approved_applications:
-            champion_id = application['user_id']
+        for application in applications.with_status("approved"):
+            champion_id = application.user_id
             champion = ctx.guild.get_member(champion_id)
             if champion:
-                rank = application['answers'].get('Rank:', 'Unranked')
-                tracker_link = application['answers'].get('RL Tracker Link:', 'Not provided')
-                value = f"Rank: [{rank}]({tracker_link})" if tracker_link != 'Not provided' else f"Rank: {rank}"
+                rank = schema.answer(application.answers, "rank", "Unranked")
+                tracker_link = schema.answer(application.answers, "tracker")
+                value = f"Rank: [{rank}]({tracker_link})" if tracker_link else f"Rank: {rank}"
                 embed.add_field(name=champion.name, value=value, inline=False)
 
         await ctx.send(embed=embed)
@@ -112,7 +182,7 @@ class ChampionsCircle(commands.Cog):
     @guild_only()
     async def clearall(self, ctx):
         """Clear all messages in the Champions Circle channel."""
-        if ctx.channel.id != await self.config.guild(ctx.guild).champions_channel():
+        if ctx.channel.id != self.state.get(ctx.guild.id)["champions_channel"]:
             await ctx.send("This command can only be used in the Champions Circle channel.")
             return
 
@@ -130,24 +200,24 @@ class ChampionsCircle(commands.Cog):
 
         # Clear messages
         channel = ctx.channel
-        await ctx.send("Clearing all messages...")
+        progress = ProgressMessage(channel, "Clearing all messages... deleted")
+        await progress.start()
 
         try:
-            async for message in channel.history(limit=None):
-                await message.delete()
+            result = await purge_channel(channel, progress=progress, keep={progress.message.id})
         except discord.Forbidden:
-            await ctx.send("I don't have permission to delete messages in this channel.")
+            await progress.finish("I don't have permission to delete messages in this channel.")
         except discord.HTTPException:
-            await ctx.send("An error occurred while trying to delete messages.")
+            await progress.finish("An error occurred while trying to delete messages.")
         else:
-            await ctx.send("All messages have been cleared from the Champions Circle channel.", delete_after=10)
+            await progress.finish(f"All messages have been cleared from the Champions Circle channel. {result.report()}", delete_after=10)
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     @guild_only()
     async def endtourney(self, ctx):
         """End the current tournament, clear the channel, and reset the cog's state."""
-        if ctx.channel.id != await self.config.guild(ctx.guild).champions_channel():
+        if ctx.channel.id != self.state.get(ctx.guild.id)["champions_channel"]:
             await ctx.send("This command can only be used in the Champions Circle channel.")
             return
 
@@ -165,49 +235,66 @@ class ChampionsCircle(commands.Cog):
 
         # Clear messages
         channel = ctx.channel
-        await ctx.send("Ending tournament and clearing channel...")
+        progress = ProgressMessage(channel, "Ending tournament and clearing channel... deleted")
+        await progress.start()
 
         try:
-            await channel.purge(limit=None)
+            result = await purge_channel(channel, progress=progress, keep={progress.message.id})
         except discord.Forbidden:
-            await ctx.send("I don't have permission to delete messages in this channel.")
+            await progress.finish("I don't have permission to delete messages in this channel.")
             return
         except discord.HTTPException:
-            await ctx.send("An error occurred while trying to delete messages.")
+            await progress.finish("An error occurred while trying to delete messages.")
             return
+        await progress.finish(result.report(), delete_after=10)
 
         # Reset cog state
-        await self.config.guild(ctx.guild).active_applications.set([])
-        await self.config.guild(ctx.guild).cancelled_applications.set([])
-        await self.config.guild(ctx.guild).approved_applications.set([])
-        await self.config.guild(ctx.guild).denied_applications.set([])
-        await self.config.guild(ctx.guild).champions_message_id.set(None)
+        async with self.state.transaction(ctx.guild.id) as state:
+            self.renderer.forget(ctx.guild.id)
+            self.expiry.forget_guild(ctx.guild.id)
+            state.applications.clear()
+            state.set("champions_message_id", None)
+            state.set("board_message_ids", [])
 
         # Reset cooldowns
         self.reset_cooldowns()
 
-        # Remove Champions role from all members
+        # Remove the Champions role; anyone approved again meanwhile keeps it
         guild = ctx.guild
-        champions_role = guild.get_role(await self.config.guild(ctx.guild).champions_role_id())
+        champions_role = guild.get_role(state["champions_role_id"])
         if champions_role:
-            for member in champions_role.members:
-                try:
-                    await member.remove_roles(champions_role)
-                except discord.HTTPException:
-                    self.logger.error(f"Failed to remove Champions role from {member.name}")
+            members = champions_role.members
+            progress = ProgressMessage(channel, f"Removing {champions_role.name}", len(members))
+            await progress.start()
+            result = await self.sync_champions_role(guild, champions_role, members, progress=progress, reason="Tournament ended")
+            await progress.finish(result.report(f"Removing {champions_role.name}"))
         else:
-            self.logger.error(f"Champions role with ID {await self.config.guild(ctx.guild).champions_role_id()} not found.")
+            self.logger.error(f"Champions role with ID {state['champions_role_id']} not found.")
 
         # Send a temporary message that will be deleted after 10 seconds
         temp_msg = await channel.send("Tournament ended. Channel cleared, cog state reset, and application cooldowns reset. You can now use the starttourney command for a new tournament.", delete_after=10)
 
+    def schedule_embed_update(self, guild, *user_ids, full=False):
+        """Queue a re-render of the tournament board; bursts are coalesced.
+
+        Only the shards holding ``user_ids`` are rebuilt, plus the header.
+        Pass ``full=True`` when something affects every applicant's entry.
+        """
+        self.renderer.request(guild, user_ids, full=full)
+
     async def update_embed(self, guild):
-        tourney_title = await self.config.guild(guild).tourney_title()
+        """Re-render the whole tournament board immediately."""
+        await self.renderer.render(guild, full=True)
+
+    def build_embed(self, guild):
+        """Build the board header with the tournament details."""
+        state = self.state.get(guild.id)
+        tourney_title = state["tourney_title"]
         embed = discord.Embed(title=tourney_title, color=0x00ff00)
         
         # Add tournament details
-        tourney_description = await self.config.guild(guild).tourney_description()
-        tourney_time = await self.config.guild(guild).tourney_time()
+        tourney_description = state["tourney_description"]
+        tourney_time = state["tourney_time"]
         
         embed.add_field(name="Description", value=tourney_description, inline=False)
         
@@ -215,87 +302,228 @@ class ChampionsCircle(commands.Cog):
             embed.add_field(name="Time", value=f"<t:{tourney_time}:F>", inline=False)
         else:
             embed.add_field(name="Time", value="Not set", inline=False)
-        
-        async def format_user_entry(application):
-            user_id = application['user_id']
+        return embed
+
+    def entry_formatter(self, guild):
+        """Return a function rendering one application as a board line."""
+        schema = self.state.get(guild.id).questions
+
+        def format_user_entry(application):
+            user_id = application.user_id
             user = guild.get_member(user_id)
             if not user:
                 return f"<@{user_id}> (User left server)"
             
-            rank = "Unranked"
-            tracker_link = ""
-            if 'answers' in application:
-                questions = await self.config.guild(guild).custom_questions()
-                rank_question = next((q for q in questions if q.lower().startswith("rank")), None)
-                tracker_question = next((q for q in questions if "tracker" in q.lower()), None)
-                
-                if rank_question and rank_question in application['answers']:
-                    rank = application['answers'][rank_question]
-                if tracker_question and tracker_question in application['answers']:
-                    tracker_link = application['answers'][tracker_question]
+            rank = schema.answer(application.answers, "rank", "Unranked")
+            tracker_link = schema.answer(application.answers, "tracker")
             
             if tracker_link:
                 return f"<@{user_id}> - [{rank}]({tracker_link})"
             else:
                 return f"<@{user_id}> - {rank}"
 
-        active_applications = await self.config.guild(guild).active_applications()
-        active_list = "\n".join([await format_user_entry(app) for app in active_applications]) or "No active applications"
-        
-        approved_applications = await self.config.guild(guild).approved_applications()
-        approved_list = "\n".join([await format_user_entry(app) for app in approved_applications]) or "No approved applications"
-        
-        denied_applications = await self.config.guild(guild).denied_applications()
-        denied_list = "\n".join([await format_user_entry(app) for app in denied_applications]) or "No denied applications"
-        
-        cancelled_applications = await self.config.guild(guild).cancelled_applications()
-        cancelled_list = "\n".join([await format_user_entry(app) for app in cancelled_applications]) or "No cancelled applications"
-        
-        embed.add_field(name="🟦 Active Applications", value=active_list, inline=False)
-        embed.add_field(name="🟩 Approved Applications", value=approved_list, inline=False)
-        embed.add_field(name="🟥 Denied Applications", value=denied_list, inline=False)
-        embed.add_field(name="🟨 Cancelled Applications", value=cancelled_list, inline=False)
+        return format_user_entry
 
-        channel = self.bot.get_channel(await self.config.guild(guild).champions_channel())
-        if not channel:
-            self.logger.error(f"Error: Channel with ID {await self.config.guild(guild).champions_channel()} not found.")
-            return
+    async def send_answers_to_admin(self, user, answers):
+        state = self.state.get(user.guild.id)
+        reviewer_ids = state["reviewer_ids"] or [self.admin_user_id]
 
-        try:
-            if await self.config.guild(guild).champions_message_id():
-                message = await channel.fetch_message(await self.config.guild(guild).champions_message_id())
-                await message.edit(embed=embed)
+        embed = discord.Embed(title=f"New Champion Application: {user.name}", color=0x00ff00)
+        for question, answer in state.questions.labelled(answers)[:25]:
+            embed.add_field(name=question[:256], value=answer, inline=False)
+
+        for reviewer_id in reviewer_ids:
+            reviewer = self.bot.get_user(reviewer_id)
+            if not reviewer:
+                self.logger.error(f"Error: Reviewer with ID {reviewer_id} not found.")
+                continue
+            view = AdminResponseView(self, user.id, user.guild.id)
+            queue_dm(self.bot, reviewer, embed=embed, view=view, source="championscircle.review", urgent=True)
+
+    async def review_applications(self, guild, user_ids, status):
+        """Approve or deny several applications at once.
+
+        Only pending applications are moved. All status changes land in one
+        state write and one board re-render under the guild's transaction;
+        the role grants then run through the concurrent workers after it is
+        released, followed by the DMs. Returns the IDs that were moved and
+        the role result (approvals only).
+        """
+        async with self.state.transaction(guild.id) as state:
+            moved = [user_id for user_id, _ in state.applications.transition(user_ids, status)]
+            if not moved:
+                return moved, None
+            for user_id in moved:
+                self.expiry.discard(guild.id, user_id)
+        self.schedule_embed_update(guild, *moved)
+
+        members = [member for member in map(guild.get_member, moved) if member]
+        for user_id in set(moved) - {member.id for member in members}:
+            self.logger.error(f"Error: User with ID {user_id} not found in the guild.")
+
+        role_result = None
+        if status == "approved":
+            role = guild.get_role(state["champions_role_id"])
+            if role:
+                role_result = await self.sync_champions_role(guild, role, members, reason="Champions Circle application approved")
+                message = f"Congratulations! Your application for the Champions Circle has been approved. You've been given the {role.name} role. Welcome to the Champions Circle!"
             else:
-                message = await channel.send(embed=embed)
-                await self.config.guild(guild).champions_message_id.set(message.id)
-        except discord.HTTPException as e:
-            self.logger.error(f"Error updating embed: {str(e)}")
+                self.logger.error(f"Error: Champions role with ID {state['champions_role_id']} not found.")
+                message = "Congratulations! Your application for the Champions Circle has been approved. However, there was an issue assigning the role. Please contact an administrator."
+        else:
+            message = "We're sorry, but your application for the Champions Circle has been denied. If you have any questions about this decision, please contact an administrator."
+        await send_dms(members, message, bot=self.bot, source="championscircle.review")
+        return moved, role_result
+
+    async def sync_champions_role(self, guild, role, members, progress=None, reason=None):
+        """Give ``role`` to the approved ``members`` and take it from the rest.
+
+        Runs after the transition's transaction is released. Each member's
+        status is read again right before their edit, under their
+        ``member_lock``, so when two transitions race the last edit follows
+        the final status.
+        """
+        applications = self.state.get(guild.id).applications
+
+        def approved(member):
+            application = applications.get(member.id)
+            return application is not None and application.status == "approved"
+
+        state = self.state.get(guild.id)
+        return await mutate_roles(
+            members, role, add=approved, progress=progress, reason=reason, lock=lambda member: state.member_lock(member.id)
+        )
+
+    def select_pending(self, guild, targets):
+        """Resolve user IDs, mentions, ``all`` or ``rank=<text>`` to pending applicant IDs."""
+        applications = self.state.get(guild.id).applications
+        pending = [app.user_id for app in applications.with_status("active")]
+        selected = {}
+        for target in targets:
+            if target.lower() == "all":
+                selected.update(dict.fromkeys(pending))
+            elif target.lower().startswith("rank="):
+                wanted = target[5:].lower()
+                schema = self.state.get(guild.id).questions
+                for user_id in pending:
+                    rank = schema.answer(applications.get(user_id).answers, "rank")
+                    if wanted in rank.lower():
+                        selected[user_id] = None
+            else:
+                match = re.fullmatch(r"<@!?(\d+)>|(\d+)", target)
+                if match:
+                    user_id = int(match.group(1) or match.group(2))
+                    application = applications.get(user_id)
+                    if application and application.status == "active":
+                        selected[user_id] = None
+        return list(selected)
+
+    async def can_review(self, ctx):
+        if ctx.author.id in self.state.get(ctx.guild.id)["reviewer_ids"]:
+            return True
+        return ctx.author.guild_permissions.administrator or await self.bot.is_admin(ctx.author)
 
-    async def send_answers_to_admin(self, user, answers):
-        admin_user = self.bot.get_user(self.admin_user_id)
-        if not admin_user:
-            self.logger.error(f"Error: Admin user with ID {self.admin_user_id} not found.")
+    @commands.command()
+    @guild_only()
+    async def ccreview(self, ctx, start: int = 1):
+        """Page through pending applications, starting at the given position."""
+        if not await self.can_review(ctx):
+            await ctx.send("Only Champions Circle reviewers can use this command.")
+            return
+        applications = self.state.get(ctx.guild.id).applications
+        questions = self.state.get(ctx.guild.id).questions
+        total = applications.count("active")
+        if not total:
+            await ctx.send("There are no pending applications.")
             return
 
-        embed = discord.Embed(title=f"New Champion Application: {user.name}", color=0x00ff00)
-        for question, answer in answers.items():
-            embed.add_field(name=question, value=answer, inline=False)
+        start = min(max(start, 1), total)
+        pages = []
+        for position, application in enumerate(applications.with_status("active"), 1):
+            if position < start:
+                continue
+            if len(pages) >= REVIEW_PAGE_LIMIT:
+                break
+            member = ctx.guild.get_member(application.user_id)
+            name = member.name if member else f"User {application.user_id} (left server)"
+            embed = discord.Embed(title=f"Pending Application: {name}", color=0x00ff00)
+            for question, answer in questions.labelled(application.answers)[:25]:
+                embed.add_field(name=question[:256], value=str(answer)[:1024] or "\u200b", inline=False)
+            embed.set_footer(text=f"Application {position}/{total} • User ID {application.user_id}")
+            pages.append(embed)
+        await menu(ctx, pages, DEFAULT_CONTROLS)
+
+    async def _bulk_review(self, ctx, targets, status):
+        if not await self.can_review(ctx):
+            await ctx.send("Only Champions Circle reviewers can use this command.")
+            return
+        user_ids = self.select_pending(ctx.guild, targets)
+        if not user_ids:
+            await ctx.send("No pending applications matched.")
+            return
+        async with ctx.typing():
+            moved, role_result = await self.review_applications(ctx.guild, user_ids, status)
+        text = f"{len(moved)} application(s) {status}."
+        if role_result is not None:
+            text += "\n" + role_result.report("Assigning the Champions role")
+        await ctx.send(text)
+
+    @commands.command()
+    @guild_only()
+    async def ccapprove(self, ctx, *targets: str):
+        """Approve pending applications by user ID or mention, `all`, or `rank=<text>`."""
+        await self._bulk_review(ctx, targets, "approved")
+
+    @commands.command()
+    @guild_only()
+    async def ccdeny(self, ctx, *targets: str):
+        """Deny pending applications by user ID or mention, `all`, or `rank=<text>`."""
+        await self._bulk_review(ctx, targets, "denied")
+
+    @commands.group()
+    @commands.admin_or_permissions(administrator=True)
+    @guild_only()
+    async def ccreviewers(self, ctx):
+        """Manage who reviews Champions Circle applications."""
+        if ctx.invoked_subcommand is None:
+            await ctx.send_help(ctx.command)
 
-        view = AdminResponseView(self, user.id, user.guild.id)
-        await admin_user.send(embed=embed, view=view)
+    @ccreviewers.command(name="add")
+    async def add_reviewer(self, ctx, user: discord.Member):
+        """Add a reviewer."""
+        state = self.state.get(ctx.guild.id)
+        if user.id not in state["reviewer_ids"]:
+            state["reviewer_ids"].append(user.id)
+            state.mark_dirty("reviewer_ids")
+        await ctx.send(f"{user.name} will now receive Champions Circle applications.")
+
+    @ccreviewers.command(name="remove")
+    async def remove_reviewer(self, ctx, user: discord.Member):
+        """Remove a reviewer."""
+        state = self.state.get(ctx.guild.id)
+        if user.id in state["reviewer_ids"]:
+            state["reviewer_ids"].remove(user.id)
+            state.mark_dirty("reviewer_ids")
+        await ctx.send(f"{user.name} is no longer a Champions Circle reviewer.")
+
+    @ccreviewers.command(name="list")
+    async def list_reviewers(self, ctx):
+        """List the reviewers."""
+        reviewer_ids = self.state.get(ctx.guild.id)["reviewer_ids"]
+        if not reviewer_ids:
+            await ctx.send("No reviewers set; applications go to the bot's default admin.")
+            return
+        await ctx.send("Reviewers:\n" + "\n".join(f"<@{user_id}>" for user_id in reviewer_ids))
 
     @commands.command()
     @guild_only()
     async def cancel_application(self, ctx):
         """Cancel your Champions Circle application."""
-        if ctx.author.id in await self.config.guild(ctx.guild).active_applications():
-            active_applications = await self.config.guild(ctx.guild).active_applications()
-            active_applications.remove(ctx.author.id)
-            await self.config.guild(ctx.guild).active_applications.set(active_applications)
-            cancelled_applications = await self.config.guild(ctx.guild).cancelled_applications()
-            cancelled_applications.append(ctx.author.id)
-            await self.config.guild(ctx.guild).cancelled_applications.set(cancelled_applications)
-            await self.update_embed(ctx.guild)
+        async with self.state.transaction(ctx.guild.id) as state:
+            moved = state.applications.transition([ctx.author.id], "cancelled", ("active",))
+        if moved:
+            self.expiry.discard(ctx.guild.id, ctx.author.id)
+            self.schedule_embed_update(ctx.guild, ctx.author.id)
             await ctx.send("Your Champions Circle application has been cancelled.", ephemeral=True)
         else:
             await ctx.send("You don't have an active Champions Circle application.", ephemeral=True)
@@ -305,7 +533,7 @@ class ChampionsCircle(commands.Cog):
     @guild_only()
     async def setchampionschannel(self, ctx, channel: discord.TextChannel):
         """Set the Champions Circle channel."""
-        await self.config.guild(ctx.guild).champions_channel.set(channel.id)
+        self.state.get(ctx.guild.id).set("champions_channel", channel.id)
         await ctx.send(f"Champions Circle channel set to {channel.mention}")
 
     @commands.command()
@@ -313,7 +541,9 @@ class ChampionsCircle(commands.Cog):
     @guild_only()
     async def setapplicationduration(self, ctx, days: int):
         """Set the duration for which applications remain open."""
-        await self.config.guild(ctx.guild).application_duration.set(days)
+        state = self.state.get(ctx.guild.id)
+        state.set("application_duration", days)
+        self.expiry.reschedule_guild(state)
         await ctx.send(f"Application duration set to {days} days.")
 
     @commands.command()
@@ -321,38 +551,24 @@ class ChampionsCircle(commands.Cog):
     @guild_only()
     async def setchampionsrole(self, ctx, role: discord.Role):
         """Set the Champions Circle role."""
-        await self.config.guild(ctx.guild).champions_role_id.set(role.id)
+        self.state.get(ctx.guild.id).set("champions_role_id", role.id)
         await ctx.send(f"Champions Circle role set to {role.name}")
 
-    async def close_expired_applications(self):
-        """Close applications that have expired."""
-        while self == self.bot.get_cog("ChampionsCircle"):
-            try:
-                all_guilds = await self.config.all_guilds()
-                for guild_id, guild_data in all_guilds.items():
-                    guild = self.bot.get_guild(guild_id)
-                    if not guild:
-                        continue
-                    
-                    active_apps = guild_data["active_applications"]
-                    for app in active_apps[:]:  # Create a copy of the list to iterate over
-                        if "timestamp" in app and datetime.now() - datetime.fromtimestamp(app["timestamp"]) > timedelta(days=guild_data["application_duration"]):
-                            active_apps.remove(app)
-                            guild_data["cancelled_applications"].append(app)
-                            user = guild.get_member(app["user_id"])
-                            if user:
-                                try:
-                                    await user.send("Your Champions Circle application has expired.")
-                                except discord.HTTPException:
-                                    self.logger.error(f"Failed to send expiration message to user {user.id}")
-                    
-                    await self.config.guild(guild).active_applications.set(active_apps)
-                    await self.config.guild(guild).cancelled_applications.set(guild_data["cancelled_applications"])
-                    await self.update_embed(guild)
-            except Exception as e:
-                self.logger.error(f"Error in close_expired_applications: {str(e)}")
-            
-            await asyncio.sleep(3600)  # Check every hour
+    async def expire_applications(self, guild, user_ids):
+        """Cancel active applications whose deadline has passed; returns how many were.
+
+        The board update and the DMs telling applicants happen in the
+        background, so a slow DM never holds up the sweep.
+        """
+        async with self.state.transaction(guild.id) as state:
+            expired = [user_id for user_id, _ in state.applications.transition(user_ids, "cancelled", ("active",))]
+        if not expired:
+            return 0
+        self.schedule_embed_update(guild, *expired)
+
+        members = [member for member in map(guild.get_member, expired) if member]
+        self.in_background(send_dms(members, "Your Champions Circle application has expired.", bot=self.bot, source="championscircle.expiry"))
+        return len(expired)
 
     @commands.command()
     async def cchelp(self, ctx):
@@ -374,18 +590,25 @@ class ChampionsCircle(commands.Cog):
         embed.add_field(name="clearall", value="Clear all messages in the Champions Circle channel", inline=False)
         embed.add_field(name="test_role_assign", value="Test role assignment", inline=False)
         embed.add_field(name="championssettings", value="Display current settings for the Champions Circle cog", inline=False)
+        embed.add_field(name="ccexport", value="Export all applications and answers as CSV or JSONL files", inline=False)
+        embed.add_field(name="ccstats / ccstorage / setexpiryconcurrency", value="Show API call counts, Config timings and expiry sweeps, switch application storage between Config and SQLite, or set how many guilds expire at once (bot owner only)", inline=False)
+
+        # Review commands
+        embed.add_field(name="Application Review", value="\u200b", inline=False)
+        embed.add_field(name="ccreview", value="Page through pending applications", inline=False)
+        embed.add_field(name="ccapprove / ccdeny", value="Approve or deny many applications: user IDs or mentions, `all`, or `rank=<text>`", inline=False)
+        embed.add_field(name="ccreviewers add/remove/list", value="Manage who reviews applications", inline=False)
 
         # Tournament management commands
         embed.add_field(name="Tournament Management", value="\u200b", inline=False)
-        embed.add_field(name="tourney settitle", value="Set the tournament title", inline=False)
-        embed.add_field(name="tourney setdescription", value="Set the tournament description", inline=False)
+        embed.add_field(name="tourney settitle / setdescription", value="Set the tournament title or description", inline=False)
         embed.add_field(name="tourney settime", value="Set the tournament time (format: YYYY-MM-DD HH:MM)", inline=False)
+        embed.add_field(name="tourney setrenderwindow", value="Set how many seconds of changes are batched into one embed update", inline=False)
 
         # Question management commands
         embed.add_field(name="Question Management", value="\u200b", inline=False)
-        embed.add_field(name="questions add", value="Add a custom question to the Champions Circle application", inline=False)
-        embed.add_field(name="questions remove", value="Remove a custom question from the Champions Circle application", inline=False)
-        embed.add_field(name="questions list", value="List all custom questions for the Champions Circle application", inline=False)
+        embed.add_field(name="questions add/remove/edit/list", value="Manage the application questions; `settype` and `setrole` set answer types and rank/tracker/platform/region roles", inline=False)
+        embed.add_field(name="questions mode", value="Choose between pop-up forms (modal) and DM questions (dm)", inline=False)
 
         await ctx.send(embed=embed)
 
@@ -395,7 +618,8 @@ class ChampionsCircle(commands.Cog):
     async def championssettings(self, ctx):
         """Display current settings for the Champions Circle cog."""
         guild = ctx.guild
-        settings = await self.config.guild(guild).all()
+        state = self.state.get(guild.id)
+        settings = state.data
 
         embed = discord.Embed(title="Champions Circle Settings", color=0x00ff00)
         
@@ -413,16 +637,152 @@ class ChampionsCircle(commands.Cog):
         else:
             embed.add_field(name="Tournament Time", value="Not set", inline=False)
         
-        embed.add_field(name="Active Applications", value=len(settings['active_applications']), inline=True)
-        embed.add_field(name="Approved Applications", value=len(settings['approved_applications']), inline=True)
-        embed.add_field(name="Denied Applications", value=len(settings['denied_applications']), inline=True)
-        embed.add_field(name="Cancelled Applications", value=len(settings['cancelled_applications']), inline=True)
+        embed.add_field(name="Active Applications", value=state.applications.count("active"), inline=True)
+        embed.add_field(name="Approved Applications", value=state.applications.count("approved"), inline=True)
+        embed.add_field(name="Denied Applications", value=state.applications.count("denied"), inline=True)
+        embed.add_field(name="Cancelled Applications", value=state.applications.count("cancelled"), inline=True)
         
         cooldown = self.application_cooldowns._cooldown
         embed.add_field(name="Application Cooldown", value=f"{cooldown.per} seconds", inline=False)
+        embed.add_field(name="Reviewers", value=", ".join(f"<@{user_id}>" for user_id in settings['reviewer_ids']) or "Not set", inline=False)
+        embed.add_field(name="Questionnaire Mode", value=settings['questionnaire_mode'], inline=False)
+        embed.add_field(name="Embed Render Window", value=f"{settings['render_window']} seconds", inline=False)
 
         await ctx.send(embed=embed)
 
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    @guild_only()
+    async def ccexport(self, ctx, export_format: str = "csv", *statuses: str):
+        """Export every application and its answers as CSV or JSONL.
+
+        Optionally list statuses (active, approved, denied, cancelled) to
+        export only those. Large exports are split into several files.
+        """
+        export_format = export_format.lower()
+        statuses = tuple(status.lower() for status in statuses) or STATUSES
+        if export_format not in EXPORT_FORMATS or not set(statuses) <= set(STATUSES):
+            await ctx.send(f"Usage: `{ctx.clean_prefix}ccexport [csv|jsonl] [statuses...]` where statuses are {', '.join(STATUSES)}.")
+            return
+
+        state = self.state.get(ctx.guild.id)
+        user_ids = snapshot_ids(state.applications, statuses)
+        if not user_ids:
+            await ctx.send("There are no applications to export.")
+            return
+
+        records = iter_records(ctx.guild, state.applications, user_ids)
+        if export_format == "csv":
+            header, lines = encode_csv(records, state.questions.questions)
+        else:
+            header, lines = encode_jsonl(records, state.questions)
+        filename = f"championscircle-{ctx.guild.id}-{datetime.now(timezone.utc):%Y%m%d-%H%M}"
+        limit = ctx.guild.filesize_limit - UPLOAD_MARGIN
+
+        parts = 0
+        async with ctx.typing():
+            async for file in pack_files(header, lines, filename, export_format, limit):
+                parts += 1
+                await ctx.send(f"Export part {parts}", file=file)
+        await ctx.send(f"Exported {len(user_ids)} applications in {parts} file(s).")
+
+    @commands.command()
+    @commands.is_owner()
+    async def ccstats(self, ctx, top: int = 10):
+        """Show Discord API call counts, rate limits and Config I/O timings."""
+        stats = self.instrumentation
+        uptime = max(time.time() - stats.started, 1)
+        total = sum(stats.calls.values())
+
+        def table(counter):
+            rows = [f"{count:>6}  {name}" for name, count in counter.most_common(top)]
+            return box("\n".join(rows)[:1000]) if rows else "None yet"
+
+        embed = discord.Embed(title="Champions Circle API Stats", color=0x00ff00)
+        embed.add_field(name="REST Calls", value=f"{total} in {int(uptime // 60)} minutes ({total / uptime * 60:.1f}/min)", inline=False)
+        embed.add_field(name="Top Routes", value=table(stats.by_route()), inline=False)
+        embed.add_field(name="Top Commands", value=table(stats.by_command()), inline=False)
+        embed.add_field(
+            name="Rate Limits",
+            value=f"{sum(stats.rate_limited.values())} responses with 429 ({stats.global_rate_limits} global), {stats.backoff_seconds:.1f}s spent backing off",
+            inline=False,
+        )
+        errors = ", ".join(f"{status}: {count}" for status, count in sorted(stats.errors.items()))
+        embed.add_field(name="HTTP Errors", value=errors or "None", inline=False)
+        config_io = "\n".join(
+            f"{operation}: {stat.count} calls, avg {stat.mean * 1000:.1f}ms, max {stat.max * 1000:.1f}ms"
+            for operation, stat in sorted(stats.config_io.items())
+        )
+        embed.add_field(name="Config I/O", value=config_io or "None yet", inline=False)
+        if stats.last_sweep:
+            finished, seconds, _, expired, failed = stats.last_sweep
+            sweeps = (
+                f"{stats.sweeps.count} guild sweeps, avg {stats.sweeps.mean * 1000:.1f}ms, max {stats.sweeps.max * 1000:.1f}ms; "
+                f"{stats.sweep_expired} expired, {stats.sweep_failures} guild failures\n"
+                f"Last <t:{int(finished)}:R>: {expired} expired{' (failed, will retry)' if failed else ''} in {seconds * 1000:.1f}ms"
+            )
+        else:
+            sweeps = "None yet"
+        embed.add_field(name=f"Expiry Sweeps (up to {self.expiry.concurrency} guilds at once)", value=sweeps, inline=False)
+        embed.set_footer(text=f"Prometheus metrics: {cog_data_path(self) / 'metrics.prom'}")
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def setexpiryconcurrency(self, ctx, guilds: int):
+        """Set how many guilds the expiry sweep processes at once."""
+        if guilds < 1:
+            await ctx.send("The sweep needs to process at least one guild at a time.")
+            return
+        await self.config.expiry_concurrency.set(guilds)
+        self.expiry.concurrency = guilds
+        await ctx.send(f"Expiry sweeps will process up to {guilds} guilds at once.")
+
+    @commands.command()
+    @commands.is_owner()
+    async def ccstorage(self, ctx, backend: Optional[str] = None):
+        """Show or change where applications are stored: `config` or `sqlite`.
+
+        Switching copies every guild's applications to the new backend and
+        then removes them from the old one. Guild settings always stay in
+        Config.
+        """
+        current = "sqlite" if self.state.database is not None else "config"
+        if backend is None:
+            message = f"Applications are stored in **{current}**."
+            if self.state.database is not None:
+                counts = self.state.database.counts()
+                message += " " + ", ".join(f"{counts.get(code, 0)} {status}" for code, status in enumerate(STATUSES)) + "."
+            await ctx.send(message)
+            return
+        backend = backend.lower()
+        if backend not in BACKENDS:
+            await ctx.send(f"Unknown backend. Choose one of: {', '.join(BACKENDS)}.")
+            return
+        if backend == current:
+            await ctx.send(f"Applications are already stored in {current}.")
+            return
+
+        previous = self.state.database
+        database = self.open_database() if backend == "sqlite" else None
+        async with ctx.typing():
+            try:
+                await self.state.switch_backend(database, commit=lambda: self.config.storage_backend.set(backend))
+            except Exception as e:
+                self.state.database = previous
+                if database is not None:
+                    database.close()
+                # Rewrite everything in case the failure left the old copy incomplete.
+                for state in self.state:
+                    state.mark_dirty("applications")
+                self.logger.error(f"Failed to move applications to {backend}: {str(e)}")
+                await ctx.send(f"Moving applications to {backend} failed; they are still stored in {current}.")
+                return
+        if previous is not None:
+            previous.close()
+        total = sum(len(state.applications) for state in self.state)
+        await ctx.send(f"Moved {total} applications to {backend}.")
+
     @commands.group()
     @commands.admin_or_permissions(administrator=True)
     @guild_only()
@@ -431,33 +791,124 @@ class ChampionsCircle(commands.Cog):
         if ctx.invoked_subcommand is None:
             await ctx.send_help(ctx.command)
 
+    def _asked_question(self, state, index):
+        asked = state.questions.asked
+        return asked[index - 1] if 1 <= index <= len(asked) else None
+
     @questions.command(name="add")
     @guild_only()
     async def add_question(self, ctx, *, question: str):
-        """Add a custom question to the Champions Circle application."""
-        async with self.config.guild(ctx.guild).custom_questions() as questions:
-            questions.append(question)
-        await ctx.send(f"Question added: {question}")
+        """Add a custom question to the Champions Circle application.
+
+        The answer type and role are guessed from the wording; change them
+        with `questions settype` and `questions setrole`.
+        """
+        state = self.state.get(ctx.guild.id)
+        new_question = question_from_text(state.questions.next_id(), question)
+        state["custom_questions"].append(new_question)
+        state.mark_dirty("custom_questions")
+        self.schedule_embed_update(ctx.guild, full=True)
+        await ctx.send(f"Question added: {question} (type: {new_question['type']}, role: {new_question['role'] or 'none'})")
 
     @questions.command(name="remove")
     @guild_only()
     async def remove_question(self, ctx, index: int):
-        """Remove a custom question from the Champions Circle application."""
-        async with self.config.guild(ctx.guild).custom_questions() as questions:
-            if 1 <= index <= len(questions):
-                removed_question = questions.pop(index - 1)
-                await ctx.send(f"Question removed: {removed_question}")
-            else:
-                await ctx.send("Invalid question index.")
+        """Remove a custom question from the Champions Circle application.
+
+        Answers already given to it are kept and still shown to reviewers.
+        """
+        state = self.state.get(ctx.guild.id)
+        question = self._asked_question(state, index)
+        if question is None:
+            await ctx.send("Invalid question index.")
+            return
+        question["retired"] = True
+        state.mark_dirty("custom_questions")
+        self.schedule_embed_update(ctx.guild, full=True)
+        await ctx.send(f"Question removed: {question['text']}")
+
+    @questions.command(name="edit")
+    @guild_only()
+    async def edit_question(self, ctx, index: int, *, text: str):
+        """Reword a question; existing answers stay attached to it."""
+        state = self.state.get(ctx.guild.id)
+        question = self._asked_question(state, index)
+        if question is None:
+            await ctx.send("Invalid question index.")
+            return
+        question["text"] = text
+        state.mark_dirty("custom_questions")
+        await ctx.send(f"Question {index} is now: {text}")
+
+    @questions.command(name="settype")
+    @guild_only()
+    async def set_question_type(self, ctx, index: int, question_type: str, *, choices: str = ""):
+        """Set a question's answer type: text, enum, url or yesno.
+
+        For enum, list the choices separated by commas.
+        """
+        state = self.state.get(ctx.guild.id)
+        question = self._asked_question(state, index)
+        question_type = question_type.lower()
+        if question is None:
+            await ctx.send("Invalid question index.")
+            return
+        if question_type not in QUESTION_TYPES:
+            await ctx.send(f"Question type must be one of: {', '.join(QUESTION_TYPES)}.")
+            return
+        choices = [choice.strip() for choice in choices.split(",") if choice.strip()]
+        if question_type == "enum" and len(choices) < 2:
+            await ctx.send("An enum question needs at least two comma-separated choices.")
+            return
+        question["type"] = question_type
+        question["choices"] = choices if question_type == "enum" else []
+        state.mark_dirty("custom_questions")
+        await ctx.send(f"Question {index} now expects: {question_type}" + (f" ({', '.join(choices)})" if question["choices"] else ""))
+
+    @questions.command(name="setrole")
+    @guild_only()
+    async def set_question_role(self, ctx, index: int, role: str):
+        """Mark a question as the rank, tracker, platform or region question (or `none`)."""
+        state = self.state.get(ctx.guild.id)
+        question = self._asked_question(state, index)
+        role = role.lower()
+        if question is None:
+            await ctx.send("Invalid question index.")
+            return
+        if role not in QUESTION_ROLES + ("none",):
+            await ctx.send(f"Role must be one of: {', '.join(QUESTION_ROLES)} or none.")
+            return
+        role = None if role == "none" else role
+        # A role belongs to one question at a time.
+        for other in state["custom_questions"]:
+            if role and other["role"] == role:
+                other["role"] = None
+        question["role"] = role
+        state.mark_dirty("custom_questions")
+        self.schedule_embed_update(ctx.guild, full=True)
+        await ctx.send(f"Question {index} role set to: {role or 'none'}")
+
+    @questions.command(name="mode")
+    @guild_only()
+    async def set_questionnaire_mode(self, ctx, mode: str):
+        """Choose how applicants answer: `modal` (pop-up forms) or `dm` (one question per DM)."""
+        mode = mode.lower()
+        if mode not in ("modal", "dm"):
+            await ctx.send("Mode must be either `modal` or `dm`.")
+            return
+        self.state.get(ctx.guild.id).set("questionnaire_mode", mode)
+        await ctx.send(f"Questionnaire mode set to: {mode}")
 
     @questions.command(name="list")
     @guild_only()
     async def list_questions(self, ctx):
         """List all custom questions for the Champions Circle application."""
         try:
-            questions = await self.config.guild(ctx.guild).custom_questions()
+            questions = self.state.get(ctx.guild.id).questions.asked
             if questions:
-                question_list = "\n".join(f"{i+1}. {q}" for i, q in enumerate(questions))
+                question_list = "\n".join(
+                    f"{i+1}. {q['text']} [{q['type']}{', ' + q['role'] if q['role'] else ''}]" for i, q in enumerate(questions)
+                )
                 await ctx.send(f"Current custom questions:\n{question_list}")
             else:
                 await ctx.send("No custom questions set.")
@@ -475,16 +926,16 @@ class ChampionsCircle(commands.Cog):
     @tourney.command(name="settitle")
     async def set_tourney_title(self, ctx, *, title: str):
         """Set the tournament title."""
-        await self.config.guild(ctx.guild).tourney_title.set(title)
+        self.state.get(ctx.guild.id).set("tourney_title", title)
         await ctx.send(f"Tournament title set to: {title}")
-        await self.update_embed(ctx.guild)
+        self.schedule_embed_update(ctx.guild)
 
     @tourney.command(name="setdescription")
     async def set_tourney_description(self, ctx, *, description: str):
         """Set the tournament description."""
-        await self.config.guild(ctx.guild).tourney_description.set(description)
+        self.state.get(ctx.guild.id).set("tourney_description", description)
         await ctx.send(f"Tournament description set to: {description}")
-        await self.update_embed(ctx.guild)
+        self.schedule_embed_update(ctx.guild)
 
     @tourney.command(name="settime")
     async def set_tourney_time(self, ctx, *, time: str):
@@ -492,19 +943,67 @@ class ChampionsCircle(commands.Cog):
         try:
             tourney_time = datetime.strptime(time, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
             timestamp = int(tourney_time.timestamp())
-            await self.config.guild(ctx.guild).tourney_time.set(timestamp)
+            self.state.get(ctx.guild.id).set("tourney_time", timestamp)
             await ctx.send(f"Tournament time set to: <t:{timestamp}:F>")
-            await self.update_embed(ctx.guild)
+            self.schedule_embed_update(ctx.guild)
         except ValueError:
             await ctx.send("Invalid time format. Please use YYYY-MM-DD HH:MM")
 
+    @tourney.command(name="setrenderwindow")
+    async def set_render_window(self, ctx, seconds: float):
+        """Set how many seconds of changes are batched into one embed update."""
+        if not 0 <= seconds <= 60:
+            await ctx.send("The render window must be between 0 and 60 seconds.")
+            return
+        self.state.get(ctx.guild.id).set("render_window", seconds)
+        await ctx.send(f"Embed updates will now be batched over {seconds} seconds.")
+
+    @tourney.command(name="bracket")
+    async def tourney_bracket(self, ctx, style: str = "single"):
+        """Show a seeded single or double elimination bracket of the approved applicants."""
+        style = style.lower()
+        if style not in ("single", "double"):
+            await ctx.send("Bracket style must be `single` or `double`.")
+            return
+        applications = self.state.get(ctx.guild.id).applications
+        seeds = applications.seeding.seeds()
+        if len(seeds) < 2:
+            await ctx.send("At least two approved applicants are needed for a bracket.")
+            return
+
+        labels = [
+            f"#{seed} <@{user_id}> ({format_rank(application_rank(applications.get(user_id)))})"
+            for seed, user_id in enumerate(seeds, 1)
+        ]
+        rounds = build_bracket(labels, double=style == "double")
+        title = f"{self.state.get(ctx.guild.id)['tourney_title']} Bracket"
+        size = 1 << (len(seeds) - 1).bit_length()
+
+        pages = [discord.Embed(
+            title=title,
+            description=(
+                f"{style.capitalize()} elimination\n"
+                f"{len(seeds)} entrants, {size - len(seeds)} byes\n"
+                f"{sum(len(matches) for _, matches in rounds)} matches in {len(rounds)} rounds"
+            ),
+            color=0x00ff00,
+        )]
+        for name, matches in rounds:
+            for start in range(0, len(matches), BRACKET_MATCHES_PER_PAGE):
+                lines = [f"`{match_id}` {a} vs {b}" for match_id, a, b in matches[start:start + BRACKET_MATCHES_PER_PAGE]]
+                pages.append(discord.Embed(title=f"{title}: {name}", description="\n".join(lines), color=0x00ff00))
+        for number, page in enumerate(pages, 1):
+            page.set_footer(text=f"Page {number}/{len(pages)}")
+        await menu(ctx, pages, DEFAULT_CONTROLS)
+
     @tourney.command(name="help")
     async def tourney_help(self, ctx):
         """Display help for tourney commands."""
         embed = discord.Embed(title="Tournament Management Commands", color=0x00ff00)
-        embed.add_field(name="tourney settitle", value="Set the tournament title", inline=False)
-        embed.add_field(name="tourney setdescription", value="Set the tournament description", inline=False)
+        embed.add_field(name="tourney settitle / setdescription", value="Set the tournament title or description", inline=False)
         embed.add_field(name="tourney settime", value="Set the tournament time (format: YYYY-MM-DD HH:MM)", inline=False)
+        embed.add_field(name="tourney setrenderwindow", value="Set how many seconds of changes are batched into one embed update", inline=False)
+        embed.add_field(name="tourney bracket [single|double]", value="Show a seeded bracket of the approved applicants, best rank first", inline=False)
         await ctx.send(embed=embed)
 
 class QuestionnaireView(discord.ui.View):
@@ -524,24 +1023,106 @@ class QuestionnaireView(discord.ui.View):
         await interaction.response.send_message("Your application has been cancelled.", ephemeral=True)
         self.stop()
 
-    async def ask_questions(self):
-        questions = await self.cog.config.guild(self.user.guild).custom_questions()
+    def send(self, content, **kwargs):
+        # Awaited, so the questions arrive in order; each one is urgent so it isn't stuck behind bulk notices.
+        return queue_dm(self.cog.bot, self.user, content, source="championscircle.questionnaire", urgent=True, **kwargs)
 
-        for i, question in enumerate(questions, 1):
-            await self.user.send(f"Question {i}: {question}")
-            
-            def check(m):
-                return m.author == self.user and isinstance(m.channel, discord.DMChannel)
+    async def ask_questions(self):
+        schema = self.cog.state.get(self.user.guild.id).questions
 
-            try:
-                answer = await self.cog.bot.wait_for('message', check=check, timeout=300)  # 5 minutes timeout per question
-                self.answers[question] = answer.content
-            except asyncio.TimeoutError:
-                await self.user.send("You took too long to answer. The questionnaire has been cancelled.")
-                return
+        session = self.cog.dm_router.open(self.user.id)
+        try:
+            for i, question in enumerate(schema.asked, 1):
+                if not await self.send(f"Question {i}: {question['text']}"):
+                    return  # DMs closed; nothing to wait for
+
+                while True:
+                    try:
+                        answer = await session.wait_for_answer()
+                    except asyncio.TimeoutError:
+                        await self.send("You took too long to answer. The questionnaire has been cancelled.")
+                        return
+                    if answer is None:  # Superseded by a newer questionnaire
+                        return
+                    value, error = schema.validate(question, answer.content)
+                    if error is None:
+                        break
+                    await self.send(f"{error} Please try again.")
+                self.answers[question["id"]] = value
+        finally:
+            self.cog.dm_router.close(session)
 
         submit_view = SubmitView(self.cog, self.user, self.answers, self.user.guild.id)
-        await self.user.send("Thank you for answering the questions. Would you like to submit your answers?", view=submit_view)
+        await self.send("Thank you for answering the questions. Would you like to submit your answers?", view=submit_view)
+
+MODAL_PAGE_SIZE = 5  # Discord allows at most five inputs per modal
+
+
+async def send_questionnaire_modal(cog, interaction, questions, answers, page=0):
+    """Respond to ``interaction`` with the next page of the questionnaire.
+
+    Questions are shown five at a time; once every page is answered the
+    applicant gets the usual submit/cancel prompt.
+    """
+    if page * MODAL_PAGE_SIZE >= len(questions):
+        submit_view = SubmitView(cog, interaction.user, answers, interaction.guild_id)
+        await interaction.response.send_message("Thank you for answering the questions. Would you like to submit your answers?", view=submit_view, ephemeral=True)
+        return
+    await interaction.response.send_modal(QuestionnaireModal(cog, questions, answers, page))
+
+class QuestionnaireModal(discord.ui.Modal):
+    def __init__(self, cog, questions, answers, page):
+        pages = -(-len(questions) // MODAL_PAGE_SIZE)
+        super().__init__(title=f"Champions Circle Application ({page + 1}/{pages})", timeout=600)
+        self.cog = cog
+        self.questions = questions
+        self.answers = answers
+        self.page = page
+        self.inputs = {}
+        for question in questions[page * MODAL_PAGE_SIZE:(page + 1) * MODAL_PAGE_SIZE]:
+            text = question["text"]
+            # Labels are capped at 45 characters; the placeholder shows more of the question.
+            label = text if len(text) <= 45 else text[:44] + "…"
+            placeholder = f"One of: {', '.join(question['choices'])}" if question["type"] == "enum" else text
+            field = discord.ui.TextInput(
+                label=label, placeholder=placeholder[:100], max_length=MAX_ANSWER_LENGTH, default=answers.get(question["id"])
+            )
+            self.add_item(field)
+            self.inputs[question["id"]] = (question, field)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        schema = self.cog.state.get(interaction.guild_id).questions
+        errors = []
+        for question_id, (question, field) in self.inputs.items():
+            value, error = schema.validate(question, field.value)
+            if error:
+                errors.append(f"**{question['text']}** {error}")
+                self.answers[question_id] = field.value
+            else:
+                self.answers[question_id] = value
+        if errors:
+            view = ContinueQuestionnaireView(self.cog, self.questions, self.answers, self.page)
+            await interaction.response.send_message("Some answers need fixing:\n" + "\n".join(errors), view=view, ephemeral=True)
+            return
+        if (self.page + 1) * MODAL_PAGE_SIZE < len(self.questions):
+            view = ContinueQuestionnaireView(self.cog, self.questions, self.answers, self.page + 1)
+            await interaction.response.send_message("Thanks! Click below to answer the remaining questions.", view=view, ephemeral=True)
+        else:
+            await send_questionnaire_modal(self.cog, interaction, self.questions, self.answers, self.page + 1)
+
+class ContinueQuestionnaireView(discord.ui.View):
+    # A modal can't be opened from a modal submission, so chained pages need a click in between.
+    def __init__(self, cog, questions, answers, page):
+        super().__init__(timeout=600)
+        self.cog = cog
+        self.questions = questions
+        self.answers = answers
+        self.page = page
+
+    @discord.ui.button(label="Continue", style=discord.ButtonStyle.primary)
+    async def continue_questionnaire(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await send_questionnaire_modal(self.cog, interaction, self.questions, self.answers, self.page)
+        self.stop()
 
 class SubmitView(discord.ui.View):
     def __init__(self, cog, user, answers, guild_id):
@@ -561,20 +1142,35 @@ class SubmitView(discord.ui.View):
                 await interaction.followup.send("Error: Unable to find the guild. Please try again or contact an administrator.", ephemeral=True)
                 return
 
-            await self.cog.send_answers_to_admin(self.user, self.answers)
-            active_applications = await self.cog.config.guild(guild).active_applications()
-            if self.user.id not in [app["user_id"] for app in active_applications]:
-                active_applications.append({
-                    "user_id": self.user.id,
-                    "timestamp": datetime.now().timestamp(),
-                    "answers": self.answers  # Store the answers
-                })
-                await self.cog.config.guild(guild).active_applications.set(active_applications)
-            cancelled_applications = await self.cog.config.guild(guild).cancelled_applications()
-            if self.user.id in cancelled_applications:
-                cancelled_applications.remove(self.user.id)
-                await self.cog.config.guild(guild).cancelled_applications.set(cancelled_applications)
-            await self.cog.update_embed(guild)
+            schema = self.cog.state.get(guild.id).questions
+            answers, errors = schema.validate_answers(self.answers)
+            if errors:
+                await interaction.followup.send(
+                    "Your application could not be submitted:\n" + "\n".join(f"**{text}** {error}" for text, error in errors),
+                    ephemeral=True,
+                )
+                return
+
+            existing = self.cog.state.get(guild.id).applications.get(self.user.id)
+            if existing and existing.status == "approved":
+                await interaction.followup.send(APPROVED_ALREADY, ephemeral=True)
+                return
+
+            await self.cog.send_answers_to_admin(self.user, answers)
+            async with self.cog.state.transaction(guild.id) as state:
+                existing = state.applications.get(self.user.id)
+                # Approved members are left alone: replacing them would keep the role without approval.
+                if not existing or existing.status not in ("active", "approved"):
+                    application = Application(
+                        self.user.id,
+                        "active",
+                        datetime.now().timestamp(),
+                        parse_rank(schema.answer(answers, "rank")),  # (ordinal, division, mmr) for seeding
+                        answers,  # positional, one slot per question
+                    )
+                    state.applications.add(application)
+                    self.cog.expiry.push(guild.id, application, state["application_duration"])
+            self.cog.schedule_embed_update(guild, self.user.id)
             
             await interaction.followup.send("Your answers have been submitted. Thank you!", ephemeral=True)
         except Exception as e:
@@ -586,14 +1182,12 @@ class SubmitView(discord.ui.View):
         await interaction.response.send_message("Your application has been cancelled.", ephemeral=True)
         guild = self.cog.bot.get_guild(self.guild_id)
         if guild:
-            active_applications = await self.cog.config.guild(guild).active_applications()
-            active_applications = [app for app in active_applications if app["user_id"] != self.user.id]
-            await self.cog.config.guild(guild).active_applications.set(active_applications)
-            cancelled_applications = await self.cog.config.guild(guild).cancelled_applications()
-            if self.user.id not in cancelled_applications:
-                cancelled_applications.append(self.user.id)
-                await self.cog.config.guild(guild).cancelled_applications.set(cancelled_applications)
-            await self.cog.update_embed(guild)
+            async with self.cog.state.transaction(guild.id) as state:
+                if state.applications.get(self.user.id) is None:
+                    state.applications.add(Application(self.user.id, "cancelled"))
+                elif state.applications.transition([self.user.id], "cancelled", ("active",)):
+                    self.cog.expiry.discard(guild.id, self.user.id)
+            self.cog.schedule_embed_update(guild, self.user.id)
         self.stop()
 
 class AdminResponseView(discord.ui.View):
@@ -603,20 +1197,6 @@ class AdminResponseView(discord.ui.View):
         self.applicant_id = applicant_id
         self.guild_id = guild_id
 
-    async def move_application(self, guild, target_list):
-        for list_name in ['active_applications', 'approved_applications', 'denied_applications', 'cancelled_applications']:
-            current_list = await self.cog.config.guild(guild).get_raw(list_name)
-            application = next((app for app in current_list if app['user_id'] == self.applicant_id), None)
-            if application:
-                current_list.remove(application)
-                await self.cog.config.guild(guild).set_raw(list_name, value=current_list)
-                if list_name != target_list:
-                    target = await self.cog.config.guild(guild).get_raw(target_list)
-                    target.append(application)
-                    await self.cog.config.guild(guild).set_raw(target_list, value=target)
-                return application
-        return None
-
     @discord.ui.button(label="Approve", style=discord.ButtonStyle.green)
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
@@ -627,26 +1207,14 @@ class AdminResponseView(discord.ui.View):
                 await interaction.followup.send("Error: Unable to find the guild. Please try again or contact an administrator.")
                 return
 
-            application = await self.move_application(guild, 'approved_applications')
-            if not application:
-                await interaction.followup.send(f"Error: Application for <@{self.applicant_id}> not found.")
+            moved, role_result = await self.cog.review_applications(guild, [self.applicant_id], 'approved')
+            if not moved:
+                await interaction.followup.send(f"Application for <@{self.applicant_id}> is not pending; it may already have been reviewed.")
                 return
 
-            await self.cog.update_embed(guild)
-            
             await interaction.followup.send(f"Application for <@{self.applicant_id}> has been approved.")
-            
-            user = guild.get_member(self.applicant_id)
-            if user:
-                role = guild.get_role(await self.cog.config.guild(guild).champions_role_id())
-                if role:
-                    await user.add_roles(role)
-                    await user.send(f"Congratulations! Your application for the Champions Circle has been approved. You've been given the {role.name} role. Welcome to the Champions Circle!")
-                else:
-                    self.cog.logger.error(f"Error: Champions role with ID {await self.cog.config.guild(guild).champions_role_id()} not found.")
-                    await user.send("Congratulations! Your application for the Champions Circle has been approved. However, there was an issue assigning the role. Please contact an administrator.")
-            else:
-                self.cog.logger.error(f"Error: User with ID {self.applicant_id} not found in the guild.")
+            if role_result and role_result.failed:
+                await interaction.followup.send(f"Could not give the Champions role to <@{self.applicant_id}>: {role_result.failed[0][1]}")
         except Exception as e:
             self.cog.logger.error(f"Error in approve button: {str(e)}")
             await interaction.followup.send("An error occurred while processing the approval. Please try again or contact the bot administrator.")
@@ -661,20 +1229,12 @@ class AdminResponseView(discord.ui.View):
                 await interaction.followup.send("Error: Unable to find the guild. Please try again or contact an administrator.")
                 return
 
-            application = await self.move_application(guild, 'denied_applications')
-            if not application:
-                await interaction.followup.send(f"Error: Application for <@{self.applicant_id}> not found.")
+            moved, _ = await self.cog.review_applications(guild, [self.applicant_id], 'denied')
+            if not moved:
+                await interaction.followup.send(f"Application for <@{self.applicant_id}> is not pending; it may already have been reviewed.")
                 return
 
-            await self.cog.update_embed(guild)
-            
             await interaction.followup.send(f"Application for <@{self.applicant_id}> has been denied.")
-            
-            user = guild.get_member(self.applicant_id)
-            if user:
-                await user.send("We're sorry, but your application for the Champions Circle has been denied. If you have any questions about this decision, please contact an administrator.")
-            else:
-                self.cog.logger.error(f"Error: User with ID {self.applicant_id} not found in the guild.")
         except Exception as e:
             self.cog.logger.error(f"Error in deny button: {str(e)}")
             await interaction.followup.send("An error occurred while processing the denial. Please try again or contact the bot administrator.")
@@ -698,9 +1258,18 @@ class JoinButton(discord.ui.Button):
             await interaction.response.send_message(f"You can apply again in {minutes} minutes and {seconds} seconds.", ephemeral=True)
             return
 
-        if interaction.user.id in [app['user_id'] for app in await self.cog.config.guild(interaction.guild).active_applications()]:
+        application = self.cog.state.get(interaction.guild.id).applications.get(interaction.user.id)
+        if application and application.status == 'active':
             await interaction.response.send_message("You already have an active application for the Champions Circle.", ephemeral=True)
             return
+        if application and application.status == 'approved':
+            await interaction.response.send_message(APPROVED_ALREADY, ephemeral=True)
+            return
+
+        state = self.cog.state.get(interaction.guild.id)
+        if state["questionnaire_mode"] == "modal":
+            await send_questionnaire_modal(self.cog, interaction, state.questions.asked, {})
+            return
 
         view = QuestionnaireView(self.cog, interaction.user)
         await interaction.response.send_message("Great! Let's start your application process. Click the button below to begin the questionnaire:", view=view, ephemeral=True)
@@ -713,34 +1282,27 @@ class CancelApplicationButton(discord.ui.Button):
     async def callback(self, interaction: discord.Interaction):
         user_id = interaction.user.id
         guild = interaction.guild
-        application = None
-
-        for list_name in ['active_applications', 'approved_applications', 'denied_applications']:
-            current_list = await self.cog.config.guild(guild).get_raw(list_name)
-            application = next((app for app in current_list if app['user_id'] == user_id), None)
-            if application:
-                current_list.remove(application)
-                await self.cog.config.guild(guild).set_raw(list_name, value=current_list)
-                break
-
-        if application:
-            cancelled_applications = await self.cog.config.guild(guild).cancelled_applications()
-            cancelled_applications.append(application)
-            await self.cog.config.guild(guild).cancelled_applications.set(cancelled_applications)
-
-            if list_name == 'approved_applications':
-                role = guild.get_role(await self.cog.config.guild(guild).champions_role_id())
-                if role and role in interaction.user.roles:
-                    await interaction.user.remove_roles(role)
-                await interaction.response.send_message("Your approved Champions Circle application has been cancelled. The Champions role has been removed if it was assigned.", ephemeral=True)
+        # Removing the role may take a while, so answer within Discord's deadline first.
+        await interaction.response.defer(ephemeral=True)
+        async with self.cog.state.transaction(guild.id) as state:
+            moved = state.applications.transition([user_id], 'cancelled')
+        previous_status = moved[0][1] if moved else None
+        if previous_status == 'approved':
+            role = guild.get_role(state["champions_role_id"])
+            if role:
+                await self.cog.sync_champions_role(guild, role, [interaction.user], reason="Champions Circle application cancelled")
+
+        if previous_status:
+            self.cog.expiry.discard(guild.id, user_id)
+            if previous_status == 'approved':
+                await interaction.followup.send("Your approved Champions Circle application has been cancelled. The Champions role has been removed if it was assigned.", ephemeral=True)
             else:
-                await interaction.response.send_message("Your Champions Circle application has been cancelled.", ephemeral=True)
+                await interaction.followup.send("Your Champions Circle application has been cancelled.", ephemeral=True)
         else:
-            await interaction.response.send_message("You don't have an active Champions Circle application to cancel.", ephemeral=True)
+            await interaction.followup.send("You don't have an active Champions Circle application to cancel.", ephemeral=True)
         
-        await self.cog.update_embed(guild)
+        self.cog.schedule_embed_update(guild, user_id)
 
 async def setup(bot):
     cog = ChampionsCircle(bot)
-    await bot.add_cog(cog)
-    bot.loop.create_task(cog.close_expired_applications())
\ No newline at end of file
+    await bot.add_cog(cog)
\ No newline at end of file
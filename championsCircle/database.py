@@ -0,0 +1,128 @@
+import json
+import sqlite3
+
+from .state import STATUS_CODES
+
+BACKENDS = ("config", "sqlite")
+DATABASE_FILENAME = "applications.sqlite3"
+
+# Rows hold the same fields as Application.encode, plus the position that
+# keeps ApplicationStore's order across reloads. The primary key doubles as
+# the (guild, user) index; the other two serve status lists and expiry scans.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    timestamp REAL,
+    rank TEXT NOT NULL,
+    answers TEXT NOT NULL,
+    position INTEGER,
+    PRIMARY KEY (guild_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS applications_guild_status ON applications (guild_id, status);
+CREATE INDEX IF NOT EXISTS applications_status_timestamp ON applications (status, timestamp);
+"""
+
+
+INSERT = (
+    "INSERT OR REPLACE INTO applications (guild_id, user_id, status, timestamp, rank, answers, position)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _row(guild_id, application, position):
+    status, timestamp, rank, answers = application.encode()
+    return (
+        guild_id, application.user_id, status, timestamp,
+        json.dumps(rank), json.dumps(answers, ensure_ascii=False), position,
+    )
+
+
+class ApplicationDatabase:
+    """Applications in a local SQLite file instead of the guild's Config blob.
+
+    Config rewrites every application whenever one changes; here a submit
+    is one row upsert and a status change is one row update. Writes are
+    small enough to run on the event loop, and each flush is one
+    transaction. Guild settings stay in Config.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._position = 0
+
+    def open(self):
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(applications)")]
+        if "position" not in columns:
+            # Files from before positions were stored load in timestamp order once.
+            with self._connection:
+                self._connection.execute("ALTER TABLE applications ADD COLUMN position INTEGER")
+        self._position = self._connection.execute("SELECT MAX(position) FROM applications").fetchone()[0] or 0
+        return self
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _next_position(self):
+        self._position += 1
+        return self._position
+
+    def load(self, guild_id):
+        """The guild's applications in ``ApplicationStore``'s encoded form and order."""
+        cursor = self._connection.execute(
+            "SELECT user_id, status, timestamp, rank, answers FROM applications WHERE guild_id = ?"
+            " ORDER BY position, timestamp",
+            (guild_id,),
+        )
+        return {
+            str(user_id): [status, timestamp, json.loads(rank), json.loads(answers)]
+            for user_id, status, timestamp, rank, answers in cursor
+        }
+
+    def guild_ids(self):
+        return [guild_id for guild_id, in self._connection.execute("SELECT DISTINCT guild_id FROM applications")]
+
+    def counts(self):
+        """Row counts by status code, across all guilds."""
+        return dict(self._connection.execute("SELECT status, COUNT(*) FROM applications GROUP BY status"))
+
+    def write(self, guild_id, store):
+        """Write the store's changes since the last write in one transaction.
+
+        Every changed row moves to the end of the order, as it does in the store.
+        """
+        cleared, changes = store.pending()
+        with self._connection:
+            if cleared:
+                self._connection.execute("DELETE FROM applications WHERE guild_id = ?", (guild_id,))
+            for user_id, kind in changes.items():
+                application = store.get(user_id)
+                if kind == "status":
+                    self._connection.execute(
+                        "UPDATE applications SET status = ?, position = ? WHERE guild_id = ? AND user_id = ?",
+                        (STATUS_CODES[application.status], self._next_position(), guild_id, user_id),
+                    )
+                else:
+                    self._connection.execute(INSERT, _row(guild_id, application, self._next_position()))
+        store.take_changes()
+
+    def replace_guild(self, guild_id, store):
+        """Replace everything stored for the guild with the store's contents."""
+        with self._connection:
+            self._connection.execute("DELETE FROM applications WHERE guild_id = ?", (guild_id,))
+            self._connection.executemany(
+                INSERT, (_row(guild_id, application, self._next_position()) for application in store.applications.values())
+            )
+        store.take_changes()
+
+    def clear(self):
+        with self._connection:
+            self._connection.execute("DELETE FROM applications")
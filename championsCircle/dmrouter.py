@@ -0,0 +1,76 @@
+import asyncio
+
+QUESTION_TIMEOUT = 300  # seconds per question
+
+
+class QuestionnaireSession:
+    """One applicant's open DM questionnaire.
+
+    Only a message that arrives while ``wait_for_answer`` is pending is
+    taken as an answer, matching the old per-question ``wait_for``.
+    """
+
+    def __init__(self, user_id, timeout=QUESTION_TIMEOUT):
+        self.user_id = user_id
+        self.timeout = timeout
+        self._waiter = None
+        self.closed = False
+
+    async def wait_for_answer(self):
+        """Wait for the next DM from the applicant.
+
+        Raises ``asyncio.TimeoutError`` after ``timeout`` seconds. Returns
+        None if the session was closed while waiting, e.g. because the user
+        started another questionnaire.
+        """
+        if self.closed:
+            return None
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            return await asyncio.wait_for(self._waiter, self.timeout)
+        finally:
+            self._waiter = None
+
+    def feed(self, message):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(message)
+
+    def close(self):
+        self.closed = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class DMRouter:
+    """Dispatches incoming DMs to the author's questionnaire session.
+
+    A single ``on_message`` listener calls ``dispatch``, which is one dict
+    lookup no matter how many questionnaires are running, instead of every
+    applicant registering a ``wait_for`` predicate that runs on every message
+    the bot sees.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+
+    def open(self, user_id, timeout=QUESTION_TIMEOUT):
+        """Start a session for ``user_id``, closing any previous one."""
+        previous = self._sessions.get(user_id)
+        if previous is not None:
+            previous.close()
+        session = self._sessions[user_id] = QuestionnaireSession(user_id, timeout)
+        return session
+
+    def close(self, session):
+        session.close()
+        if self._sessions.get(session.user_id) is session:
+            del self._sessions[session.user_id]
+
+    def dispatch(self, message):
+        session = self._sessions.get(message.author.id)
+        if session is not None:
+            session.feed(message)
+
+    def close_all(self):
+        for session in list(self._sessions.values()):
+            self.close(session)
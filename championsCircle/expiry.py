@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+
+from .deadlines import DeadlineScheduler
+
+log = logging.getLogger("red.championsCircle.expiry")
+
+EXPIRY_CONCURRENCY = 8  # guilds swept at once
+RETRY_DELAY = 300  # seconds before retrying a guild whose sweep failed
+
+
+def application_deadline(application, duration_days):
+    if not application.timestamp:
+        return None
+    return application.timestamp + duration_days * 86400
+
+
+class ExpiryScheduler(DeadlineScheduler):
+    """Deadlines of active applications across all guilds, keyed by (guild, user).
+
+    Only the applications that are actually due are handed to
+    ``cog.expire_applications``. Every guild with something due is swept in
+    its own task, at most ``concurrency`` at once, and the worker re-arms
+    without waiting for them.
+    """
+
+    def __init__(self, cog, concurrency=EXPIRY_CONCURRENCY):
+        super().__init__(cog.bot)
+        self.cog = cog
+        self.concurrency = concurrency
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    @concurrency.setter
+    def concurrency(self, guilds):
+        self._concurrency = guilds
+        self._semaphore = asyncio.Semaphore(guilds)
+
+    def start(self):
+        for state in self.cog.state:
+            self.reschedule_guild(state)
+        self.start_worker()
+
+    def push(self, guild_id, application, duration_days):
+        """Track (or move) the deadline of an active application."""
+        deadline = application_deadline(application, duration_days)
+        if deadline is not None:
+            self.schedule((guild_id, application.user_id), deadline)
+
+    def discard(self, guild_id, user_id):
+        """Stop tracking an application that left the active state."""
+        self.unschedule((guild_id, user_id))
+
+    def reschedule_guild(self, state):
+        """Recompute every deadline in a guild, e.g. after the duration changed."""
+        self.forget_guild(state.guild_id)
+        for application in state.applications.with_status("active"):
+            self.push(state.guild_id, application, state["application_duration"])
+
+    def forget_guild(self, guild_id):
+        self.unschedule_where(lambda key: key[0] == guild_id)
+
+    async def sweep(self, now):
+        """Expire everything due by ``now`` and wait until those guilds are done."""
+        tasks = self.dispatch(now)
+        if tasks:
+            await asyncio.gather(*tasks.values())
+
+    def group(self, key):
+        return key[0]
+
+    async def handle(self, guild_id, keys):
+        """Expire one guild's due applications.
+
+        A guild that raises is logged and retried after ``RETRY_DELAY``.
+        Duration and counts are recorded on the cog's instrumentation.
+        """
+        guild = self.cog.bot.get_guild(guild_id)
+        if not guild:
+            return
+        start = time.perf_counter()
+        expired, failed = 0, False
+        async with self._semaphore:
+            try:
+                expired = await self.cog.expire_applications(guild, [user_id for _, user_id in keys])
+            except Exception:
+                log.exception(f"Error expiring applications in guild {guild_id}")
+                # Applications resolved meanwhile are skipped when expiring.
+                self.retry(keys, time.time() + RETRY_DELAY)
+                failed = True
+        self.cog.instrumentation.record_sweep(time.perf_counter() - start, 1, expired, failed)
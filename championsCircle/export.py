@@ -0,0 +1,97 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import discord
+
+from .state import STATUSES
+
+EXPORT_FORMATS = ("csv", "jsonl")
+YIELD_EVERY = 250  # rows encoded between yields to the event loop
+# Leave room for the multipart envelope around each attachment.
+UPLOAD_MARGIN = 64 * 1024
+FIXED_COLUMNS = ("user_id", "name", "status", "submitted_at")
+
+
+def snapshot_ids(store, statuses=STATUSES):
+    """The user IDs to export, fixed up front so later changes can't break iteration."""
+    return [application.user_id for status in statuses for application in store.with_status(status)]
+
+
+def iter_records(guild, store, user_ids):
+    """Yield one export record per application, looked up lazily."""
+    for user_id in user_ids:
+        application = store.get(user_id)
+        if application is None:  # removed since the export started
+            continue
+        member = guild.get_member(user_id)
+        timestamp = application.timestamp
+        yield {
+            "user_id": str(user_id),
+            "name": member.name if member else "",
+            "status": application.status,
+            "submitted_at": datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else "",
+            "answers": application.answers,
+        }
+
+
+def encode_csv(records, questions):
+    """Return the encoded header and a generator of encoded rows.
+
+    There is one column per question, retired ones included, headed by the
+    question text. Answers are positional, so each row is padded to length.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data.encode("utf-8")
+
+    header = line(FIXED_COLUMNS + tuple(question["text"] for question in questions))
+
+    def rows():
+        for record in records:
+            answers = record["answers"]
+            yield line([record[column] for column in FIXED_COLUMNS] + answers + [""] * (len(questions) - len(answers)))
+
+    return header, rows()
+
+
+def encode_jsonl(records, schema):
+    """Return an empty header and a generator of JSON lines, answers keyed by question text."""
+    def rows():
+        for record in records:
+            record["answers"] = dict(schema.labelled(record["answers"]))
+            yield json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    return b"", rows()
+
+
+async def pack_files(header, lines, filename, extension, limit):
+    """Pack encoded lines into attachments of at most ``limit`` bytes.
+
+    Only the part being filled is held in memory. Every part starts with
+    ``header``, and the event loop gets a turn every ``YIELD_EVERY`` lines.
+    """
+    part = 1
+    buffer = io.BytesIO(header)
+    buffer.seek(0, io.SEEK_END)
+    for count, line in enumerate(lines, 1):
+        if buffer.tell() + len(line) > limit and buffer.tell() > len(header):
+            buffer.seek(0)
+            yield discord.File(buffer, filename=f"{filename}-{part}.{extension}")
+            part += 1
+            buffer = io.BytesIO(header)
+            buffer.seek(0, io.SEEK_END)
+        buffer.write(line)
+        if count % YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+    if buffer.tell() > len(header) or part == 1:
+        buffer.seek(0)
+        yield discord.File(buffer, filename=f"{filename}-{part}.{extension}")
@@ -0,0 +1,265 @@
+import asyncio
+import contextlib
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+
+import discord
+
+log = logging.getLogger("red.championsCircle.instrumentation")
+
+EXPORT_INTERVAL = 60  # seconds between Prometheus file writes
+UNATTRIBUTED = "(background)"
+
+# The command whose invocation (or a task it spawned) is making the call.
+_current_command = contextvars.ContextVar("championscircle_current_command", default=UNATTRIBUTED)
+_SNOWFLAKE = re.compile(r"\d{15,}")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class LatencyStat:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class _RateLimitLogHandler(logging.Handler):
+    """Picks 429s and their retry delays out of discord.py's HTTP warnings."""
+
+    def __init__(self, instrumentation):
+        super().__init__(logging.WARNING)
+        self.instrumentation = instrumentation
+
+    def emit(self, record):
+        try:
+            message = str(record.msg)
+            if message.startswith("We are being rate limited.") and len(record.args) == 3:
+                method, url, retry_after = record.args
+                path = _SNOWFLAKE.sub("{id}", str(url).replace(discord.http.Route.BASE, ""))
+                waited = 0.0 if "erroring instead" in message else float(retry_after)
+                self.instrumentation.record_rate_limit(method, path, waited)
+            elif message.startswith("Global rate limit has been hit."):
+                self.instrumentation.global_rate_limits += 1
+        except Exception:
+            self.handleError(record)
+
+
+class Instrumentation:
+    """Counts outbound Discord REST calls, rate limits and Config I/O.
+
+    ``install`` wraps ``bot.http.request``, so every cog's calls are seen,
+    and ``bot.invoke``, so calls made while a command runs (including by
+    tasks it starts) are attributed to that command. Everything else is
+    counted under ``(background)``.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.started = time.time()
+        self.calls = Counter()  # (method, route, command) -> count
+        self.latency = {}  # (method, route) -> LatencyStat
+        self.errors = Counter()  # HTTP status -> count
+        self.rate_limited = Counter()  # (method, path) -> 429 responses
+        self.backoff_seconds = 0.0
+        self.global_rate_limits = 0
+        self.config_io = {}  # operation -> LatencyStat
+        self.sweeps = LatencyStat()  # expiry sweep durations
+        self.sweep_guilds = 0
+        self.sweep_expired = 0
+        self.sweep_failures = 0
+        self.last_sweep = None  # (finished at, seconds, guilds, expired, failed)
+        self._original_request = None
+        self._original_invoke = None
+        self._request = None
+        self._invoke = None
+        self._handler = _RateLimitLogHandler(self)
+        self._export_task = None
+
+    def install(self):
+        http = self.bot.http
+        self._original_request = http.request
+        self._original_invoke = self.bot.invoke
+        original_request = self._original_request
+        original_invoke = self._original_invoke
+
+        async def request(route, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original_request(route, **kwargs)
+            except discord.HTTPException as e:
+                self.errors[e.status] += 1
+                raise
+            finally:
+                self.record_call(route.method, route.path, time.perf_counter() - start)
+
+        async def invoke(ctx):
+            label = ctx.command.qualified_name if ctx.command else UNATTRIBUTED
+            if ctx.cog is not None:
+                label = f"{ctx.cog.qualified_name}.{label}"
+            token = _current_command.set(label)
+            try:
+                return await original_invoke(ctx)
+            finally:
+                _current_command.reset(token)
+
+        http.request = self._request = request
+        self.bot.invoke = self._invoke = invoke
+        logging.getLogger("discord.http").addHandler(self._handler)
+
+    def uninstall(self):
+        self.stop_exporter()
+        logging.getLogger("discord.http").removeHandler(self._handler)
+        # Only unwrap what is still ours, in case something wrapped us since.
+        if self._original_request is not None and self.bot.http.request is self._request:
+            self.bot.http.request = self._original_request
+        if self._original_invoke is not None and self.bot.invoke is self._invoke:
+            self.bot.invoke = self._original_invoke
+        self._original_request = self._original_invoke = None
+
+    def record_call(self, method, route, seconds):
+        self.calls[(method, route, _current_command.get())] += 1
+        self.latency.setdefault((method, route), LatencyStat()).observe(seconds)
+
+    def record_rate_limit(self, method, path, waited):
+        self.rate_limited[(method, path)] += 1
+        self.backoff_seconds += waited
+
+    @contextlib.contextmanager
+    def time_config(self, operation):
+        """Time one Config call: ``with instrumentation.time_config("set_raw"): ...``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.config_io.setdefault(operation, LatencyStat()).observe(time.perf_counter() - start)
+
+    def record_sweep(self, seconds, guilds, expired, failed):
+        self.sweeps.observe(seconds)
+        self.sweep_guilds += guilds
+        self.sweep_expired += expired
+        self.sweep_failures += failed
+        self.last_sweep = (time.time(), seconds, guilds, expired, failed)
+
+    def by_route(self):
+        totals = Counter()
+        for (method, route, _), count in self.calls.items():
+            totals[f"{method} {route}"] += count
+        return totals
+
+    def by_command(self):
+        totals = Counter()
+        for (_, _, command), count in self.calls.items():
+            totals[command] += count
+        return totals
+
+    def render_prometheus(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = [
+            "# HELP discord_requests_total Outbound Discord REST calls by route and command.",
+            "# TYPE discord_requests_total counter",
+        ]
+        for (method, route, command), count in sorted(self.calls.items()):
+            lines.append(f"discord_requests_total{_labels(method=method, route=route, command=command)} {count}")
+
+        lines += [
+            "# HELP discord_request_duration_seconds Time spent in REST calls, including rate limit waits.",
+            "# TYPE discord_request_duration_seconds summary",
+        ]
+        for (method, route), stat in sorted(self.latency.items()):
+            labels = _labels(method=method, route=route)
+            lines.append(f"discord_request_duration_seconds_sum{labels} {stat.total:.6f}")
+            lines.append(f"discord_request_duration_seconds_count{labels} {stat.count}")
+
+        lines += [
+            "# HELP discord_request_errors_total REST calls that failed, by HTTP status.",
+            "# TYPE discord_request_errors_total counter",
+        ]
+        for status, count in sorted(self.errors.items()):
+            lines.append(f"discord_request_errors_total{_labels(status=status)} {count}")
+
+        lines += [
+            "# HELP discord_rate_limited_total 429 responses received.",
+            "# TYPE discord_rate_limited_total counter",
+        ]
+        for (method, path), count in sorted(self.rate_limited.items()):
+            lines.append(f"discord_rate_limited_total{_labels(method=method, route=path)} {count}")
+        lines += [
+            "# HELP discord_global_rate_limited_total 429 responses that hit the global rate limit.",
+            "# TYPE discord_global_rate_limited_total counter",
+            f"discord_global_rate_limited_total {self.global_rate_limits}",
+            "# HELP discord_rate_limit_backoff_seconds_total Time spent sleeping after 429 responses.",
+            "# TYPE discord_rate_limit_backoff_seconds_total counter",
+            f"discord_rate_limit_backoff_seconds_total {self.backoff_seconds:.3f}",
+        ]
+
+        lines += [
+            "# HELP championscircle_config_io_seconds Time spent in Config reads and writes.",
+            "# TYPE championscircle_config_io_seconds summary",
+        ]
+        for operation, stat in sorted(self.config_io.items()):
+            labels = _labels(operation=operation)
+            lines.append(f"championscircle_config_io_seconds_sum{labels} {stat.total:.6f}")
+            lines.append(f"championscircle_config_io_seconds_count{labels} {stat.count}")
+
+        lines += [
+            "# HELP championscircle_expiry_sweep_seconds Time spent in expiry sweeps.",
+            "# TYPE championscircle_expiry_sweep_seconds summary",
+            f"championscircle_expiry_sweep_seconds_sum {self.sweeps.total:.6f}",
+            f"championscircle_expiry_sweep_seconds_count {self.sweeps.count}",
+            "# HELP championscircle_expiry_guilds_total Guilds with applications due, summed over sweeps.",
+            "# TYPE championscircle_expiry_guilds_total counter",
+            f"championscircle_expiry_guilds_total {self.sweep_guilds}",
+            "# HELP championscircle_expired_applications_total Applications cancelled by expiry.",
+            "# TYPE championscircle_expired_applications_total counter",
+            f"championscircle_expired_applications_total {self.sweep_expired}",
+            "# HELP championscircle_expiry_failures_total Guild sweeps that raised and were retried later.",
+            "# TYPE championscircle_expiry_failures_total counter",
+            f"championscircle_expiry_failures_total {self.sweep_failures}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Write-then-rename so a scraper never reads a half-written file.
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def start_exporter(self, path, interval=EXPORT_INTERVAL):
+        self._export_task = asyncio.create_task(self._export_loop(path, interval))
+
+    def stop_exporter(self):
+        if self._export_task is not None:
+            self._export_task.cancel()
+            self._export_task = None
+
+    async def _export_loop(self, path, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.write_prometheus, path)
+            except OSError as e:
+                log.error(f"Failed to write metrics to {path}: {str(e)}")
@@ -0,0 +1,176 @@
+import re
+from urllib.parse import urlparse
+
+from .seeding import parse_rank
+
+QUESTION_TYPES = ("text", "enum", "url", "yesno")
+QUESTION_ROLES = ("rank", "tracker", "platform", "region")
+MAX_ANSWER_LENGTH = 1024
+
+_YES = {"y", "yes", "yeah", "yep", "true"}
+_NO = {"n", "no", "nope", "false"}
+_CHOICES = re.compile(r"\(([^()]*,[^()]*)\)")
+
+
+def make_question(question_id, text, type="text", role=None, choices=()):
+    return {"id": question_id, "text": text, "type": type, "role": role, "choices": list(choices), "retired": False}
+
+
+DEFAULT_QUESTIONS = [
+    make_question("q1", "Epic Account ID:"),
+    make_question("q2", "Rank:", role="rank"),
+    make_question("q3", "Primary Platform (PC, Xbox, PlayStation, Switch):", "enum", "platform", ("PC", "Xbox", "PlayStation", "Switch")),
+    make_question("q4", "Preferred Region for Matches (NA East, NA West, EU, Other - please specify if Other):", role="region"),
+    make_question("q5", "RL Tracker Link:", "url", "tracker"),
+    make_question("q6", "Have you read and understood the tournament rules? (Yes/No)", "yesno"),
+    make_question("q7", "Do you agree to follow the tournament code of conduct? (Yes/No)", "yesno"),
+    make_question("q8", "Any special requests or additional notes? (e.g., match scheduling preferences, etc)"),
+]
+
+
+def question_from_text(question_id, text):
+    """Build a question from its prompt, guessing the type and role from the wording.
+
+    This is what the old string questions were matched on, now done once
+    when the question is created instead of on every render.
+    """
+    lowered = text.lower()
+    role = None
+    if lowered.startswith("rank"):
+        role = "rank"
+    elif "tracker" in lowered:
+        role = "tracker"
+    elif "platform" in lowered:
+        role = "platform"
+    elif "region" in lowered:
+        role = "region"
+
+    if "(yes/no)" in lowered:
+        return make_question(question_id, text, "yesno", role)
+    if role == "tracker" or "link" in lowered or "url" in lowered:
+        return make_question(question_id, text, "url", role)
+    # "(PC, Xbox, PlayStation)" style lists of short options become choices.
+    match = _CHOICES.search(text)
+    if match:
+        choices = [choice.strip() for choice in match.group(1).split(",")]
+        if len(choices) >= 2 and all(0 < len(choice) <= 20 for choice in choices):
+            return make_question(question_id, text, "enum", role, choices)
+    return make_question(question_id, text, role=role)
+
+
+class QuestionSchema:
+    """A guild's questions with the lookups every render and submit needs.
+
+    Built once per change of ``custom_questions``. ``asked`` is what
+    applicants answer; retired questions stay in ``by_id`` so answers given
+    to them can still be shown. ``roles`` maps a role to its question ID.
+
+    Stored answers are positional lists: the answer to a question sits at
+    the question's index in ``custom_questions`` (its ``slots`` entry).
+    Questions are only ever appended or retired, so slots never move.
+    """
+
+    def __init__(self, questions):
+        self.questions = questions
+        self.by_id = {question["id"]: question for question in questions}
+        self.slots = {question["id"]: slot for slot, question in enumerate(questions)}
+        self.asked = [question for question in questions if not question.get("retired")]
+        self.roles = {}
+        # Asked questions win over retired ones with the same role.
+        for question in sorted(questions, key=lambda question: not question.get("retired")):
+            if question["role"]:
+                self.roles[question["role"]] = question["id"]
+
+    def answer(self, answers, role, default=""):
+        """The answer to the question with ``role``, or ``default``."""
+        slot = self.slots.get(self.roles.get(role))
+        if slot is None or slot >= len(answers):
+            return default
+        return answers[slot] or default
+
+    def labelled(self, answers):
+        """(question text, answer) pairs in question order, skipping unanswered ones."""
+        return [(question["text"], answer) for question, answer in zip(self.questions, answers) if answer]
+
+    def validate(self, question, value):
+        """Return ``(clean value, None)`` or ``(None, error message)``."""
+        value = (value or "").strip()[:MAX_ANSWER_LENGTH]
+        if not value:
+            return None, "This question needs an answer."
+        kind = question["type"]
+        if kind == "yesno":
+            if value.lower() in _YES:
+                return "Yes", None
+            if value.lower() in _NO:
+                return "No", None
+            return None, "Please answer Yes or No."
+        if kind == "enum":
+            for choice in question["choices"]:
+                if value.lower() == choice.lower():
+                    return choice, None
+            return None, f"Please answer one of: {', '.join(question['choices'])}."
+        if kind == "url":
+            url = value if "://" in value else f"https://{value}"
+            parsed = urlparse(url)
+            if parsed.scheme not in ("http", "https") or "." not in parsed.netloc:
+                return None, "Please answer with a link, e.g. https://rocketleague.tracker.network/..."
+            return url, None
+        return value, None
+
+    def validate_answers(self, answers):
+        """Validate answers to every asked question.
+
+        ``answers`` is keyed by question ID. Returns the cleaned answers as a
+        positional list and a list of ``(question text, error)`` for the ones
+        that failed.
+        """
+        cleaned, errors = [""] * len(self.questions), []
+        for question in self.asked:
+            value, error = self.validate(question, answers.get(question["id"]))
+            if error:
+                errors.append((question["text"], error))
+            else:
+                cleaned[self.slots[question["id"]]] = value
+        while cleaned and not cleaned[-1]:
+            cleaned.pop()
+        return cleaned, errors
+
+    def next_id(self):
+        """A question ID that has never been used in this schema."""
+        numbers = [int(question_id[1:]) for question_id in self.by_id if question_id[1:].isdigit()]
+        return f"q{max(numbers, default=0) + 1}"
+
+
+def upgrade_questions(data):
+    """Convert string questions to question objects and rekey answers by ID.
+
+    Answers to questions that were since removed become retired questions,
+    so nothing stored is lost. Applications also get their parsed rank.
+    """
+    questions = []
+    ids_by_text = {}
+
+    def add(question):
+        questions.append(question)
+        ids_by_text.setdefault(question["text"], question["id"])
+
+    for entry in data["custom_questions"]:
+        add(question_from_text(QuestionSchema(questions).next_id(), entry) if isinstance(entry, str) else entry)
+    next_number = int(QuestionSchema(questions).next_id()[1:])
+
+    for application in data["applications"].values():
+        answers = {}
+        for text, value in (application.get("answers") or {}).items():
+            if text not in ids_by_text:
+                retired = question_from_text(f"q{next_number}", text)
+                retired["retired"] = True
+                add(retired)
+                next_number += 1
+            answers[ids_by_text[text]] = value
+        application["answers"] = answers
+
+    data["custom_questions"] = questions
+    schema = QuestionSchema(questions)
+    for application in data["applications"].values():
+        if application.get("rank") is None:
+            application["rank"] = list(parse_rank(application["answers"].get(schema.roles.get("rank"))))
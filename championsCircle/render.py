@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+
+import discord
+
+log = logging.getLogger("red.championsCircle.render")
+
+# Every shard fits in a single embed field even if all of its applicants end
+# up under the same status, so a shard can never overflow when someone is
+# approved or denied.
+SHARD_CAPACITY = 1024
+MAX_LINE_LENGTH = 256
+# Five full shards stay under Discord's 6000 character limit per message.
+SHARDS_PER_MESSAGE = 5
+
+STATUS_FIELDS = (
+    ("active", "🟦 Active Applications"),
+    ("approved", "🟩 Approved Applications"),
+    ("denied", "🟥 Denied Applications"),
+    ("cancelled", "🟨 Cancelled Applications"),
+)
+
+
+def _digest(embeds):
+    return hash(json.dumps([embed.to_dict() for embed in embeds], sort_keys=True))
+
+
+class BoardLayout:
+    """Assignment of applicants to fixed-capacity board shards.
+
+    Applicants keep the shard they were first placed in. A status change or
+    a new line that still fits touches only that shard; a line that outgrows
+    its shard moves to the tail, touching two.
+    """
+
+    def __init__(self):
+        self.shards = []
+        self.sizes = []
+        self.shard_of = {}
+
+    def place(self, user_id, line):
+        """Set ``user_id``'s line and return the indexes of the shards it touched."""
+        if len(line) > MAX_LINE_LENGTH:
+            line = line[:MAX_LINE_LENGTH - 1] + "…"
+        index = self.shard_of.get(user_id)
+        if index is not None:
+            shard = self.shards[index]
+            old = shard[user_id]
+            if self.sizes[index] - len(old) + len(line) <= SHARD_CAPACITY:
+                shard[user_id] = line
+                self.sizes[index] += len(line) - len(old)
+                return {index}
+            del shard[user_id]
+            self.sizes[index] -= len(old) + 1
+            changed = {index}
+        else:
+            changed = set()
+
+        if not self.shards or self.sizes[-1] + len(line) + 1 > SHARD_CAPACITY:
+            self.shards.append({})
+            self.sizes.append(0)
+        tail = len(self.shards) - 1
+        self.shards[tail][user_id] = line
+        self.sizes[tail] += len(line) + 1
+        self.shard_of[user_id] = tail
+        changed.add(tail)
+        return changed
+
+    def remove(self, user_id):
+        """Drop ``user_id``'s line and return the indexes of the shards it touched."""
+        index = self.shard_of.pop(user_id, None)
+        if index is None:
+            return set()
+        self.sizes[index] -= len(self.shards[index].pop(user_id)) + 1
+        return {index}
+
+
+class RenderScheduler:
+    """Folds bursts of board updates into as few message edits as possible.
+
+    The board is a header message (tournament details and the buttons) plus
+    as many shard messages as the applicant list needs. ``request`` only
+    records what changed; the first request starts a timer of the guild's
+    ``render_window`` seconds and everything that arrives before it fires is
+    rendered together. Only messages containing a touched shard are rebuilt,
+    every message is addressed through a cached ``PartialMessage``, and an
+    edit is skipped when the rendered embeds hash the same as the last ones
+    sent.
+    """
+
+    def __init__(self, cog):
+        self.cog = cog
+        self._pending = {}
+        self._dirty_users = {}
+        self._full = set()
+        self._layouts = {}
+        self._messages = {}
+        self._last_hash = {}
+        self._locks = {}
+
+    def request(self, guild, user_ids=(), full=False):
+        self._dirty_users.setdefault(guild.id, set()).update(user_ids)
+        if full:
+            self._full.add(guild.id)
+        task = self._pending.get(guild.id)
+        if task is None or task.done():
+            self._pending[guild.id] = asyncio.create_task(self._render_later(guild))
+
+    async def _render_later(self, guild):
+        await asyncio.sleep(self.cog.state.get(guild.id)["render_window"])
+        self._pending.pop(guild.id, None)
+        await self.render(guild)
+
+    def _get_message(self, channel, message_id):
+        key = (channel.guild.id, message_id)
+        cached = self._messages.get(key)
+        if cached is None or cached.channel.id != channel.id:
+            cached = channel.get_partial_message(message_id)
+            self._messages[key] = cached
+        return cached
+
+    def _touched_shards(self, guild):
+        """Re-place every dirty applicant and return the shards that changed."""
+        applications = self.cog.state.get(guild.id).applications
+        format_entry = self.cog.entry_formatter(guild)
+        layout = self._layouts.get(guild.id)
+        full = guild.id in self._full or layout is None
+        self._full.discard(guild.id)
+        dirty = self._dirty_users.pop(guild.id, set())
+
+        if full:
+            layout = self._layouts[guild.id] = BoardLayout()
+            ordered = sorted(applications.applications.values(), key=lambda app: app.timestamp or 0)
+            for application in ordered:
+                layout.place(application.user_id, format_entry(application))
+            return layout, set(range(len(layout.shards)))
+
+        touched = set()
+        for user_id in dirty:
+            application = applications.get(user_id)
+            if application is not None:
+                touched |= layout.place(user_id, format_entry(application))
+            else:
+                touched |= layout.remove(user_id)
+        return layout, touched
+
+    def _shard_embed(self, guild, layout, index):
+        applications = self.cog.state.get(guild.id).applications
+        sections = {status: [] for status, _ in STATUS_FIELDS}
+        for user_id, line in layout.shards[index].items():
+            # The store can be cleared between the messages of one render.
+            application = applications.get(user_id)
+            if application is not None:
+                sections[application.status].append(line)
+
+        embed = discord.Embed(title=f"Applicants (page {index + 1})", color=0x00ff00)
+        for status, name in STATUS_FIELDS:
+            if sections[status]:
+                embed.add_field(name=name, value="\n".join(sections[status]), inline=False)
+        if not embed.fields:
+            embed.description = "No applicants on this page."
+        return embed
+
+    async def _send_or_edit(self, channel, key, message_id, embeds, recreate=True):
+        """Edit ``message_id`` (or send a new message) unless nothing changed.
+
+        Returns the message ID now holding the embeds, or None if the message
+        was deleted and should be sent again. With ``recreate=False`` a
+        deleted message is only logged and its ID kept.
+        """
+        digest = _digest(embeds)
+        if message_id and self._last_hash.get(key) == digest:
+            return message_id
+        try:
+            if message_id:
+                await self._get_message(channel, message_id).edit(embeds=embeds)
+            else:
+                message_id = (await channel.send(embeds=embeds)).id
+        except discord.NotFound:
+            log.error(f"Board message {message_id} no longer exists in guild {channel.guild.id}.")
+            self._messages.pop((channel.guild.id, message_id), None)
+            self._last_hash.pop(key, None)
+            return None if recreate else message_id
+        except discord.HTTPException as e:
+            log.error(f"Error updating embed: {str(e)}")
+            return message_id
+        self._last_hash[key] = digest
+        return message_id
+
+    async def render(self, guild, full=False):
+        """Render every changed part of ``guild``'s board now."""
+        if full:
+            self._full.add(guild.id)
+        async with self._locks.setdefault(guild.id, asyncio.Lock()):
+            await self._render(guild)
+
+    async def _render(self, guild):
+        state = self.cog.state.get(guild.id)
+        channel = self.cog.bot.get_channel(state["champions_channel"])
+        if not channel:
+            log.error(f"Error: Channel with ID {state['champions_channel']} not found.")
+            return
+
+        # A new header would lack the Join/Cancel buttons; that takes starttourney.
+        header_id = await self._send_or_edit(
+            channel, (guild.id, "header"), state["champions_message_id"], [self.cog.build_embed(guild)], recreate=False
+        )
+        if header_id != state["champions_message_id"]:
+            state.set("champions_message_id", header_id)
+
+        layout, touched = self._touched_shards(guild)
+        message_ids = state["board_message_ids"]
+        for message_index in sorted({index // SHARDS_PER_MESSAGE for index in touched}):
+            first = message_index * SHARDS_PER_MESSAGE
+            shard_indexes = range(first, min(first + SHARDS_PER_MESSAGE, len(layout.shards)))
+            embeds = [self._shard_embed(guild, layout, index) for index in shard_indexes]
+            if message_index >= len(message_ids):
+                message_ids.append(None)
+            message_id = await self._send_or_edit(
+                channel, (guild.id, message_index), message_ids[message_index], embeds
+            )
+            if message_id != message_ids[message_index]:
+                message_ids[message_index] = message_id
+                state.mark_dirty("board_message_ids")
+
+        # A re-layout can need fewer messages than before; drop the leftovers.
+        needed = -(-len(layout.shards) // SHARDS_PER_MESSAGE)
+        if len(message_ids) > needed:
+            for message_index in range(needed, len(message_ids)):
+                await self._delete(channel, (guild.id, message_index), message_ids[message_index])
+            del message_ids[needed:]
+            state.mark_dirty("board_message_ids")
+
+    async def _delete(self, channel, key, message_id):
+        self._last_hash.pop(key, None)
+        if not message_id:
+            return
+        message = self._messages.pop((channel.guild.id, message_id), None) or channel.get_partial_message(message_id)
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            log.error(f"Error deleting board message {message_id}: {str(e)}")
+
+    def forget(self, guild_id):
+        """Drop any pending render and cached board for a guild."""
+        task = self._pending.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+        self._dirty_users.pop(guild_id, None)
+        self._full.discard(guild_id)
+        self._layouts.pop(guild_id, None)
+        for cache in (self._messages, self._last_hash):
+            for key in [key for key in cache if key[0] == guild_id]:
+                del cache[key]
+
+    def close(self):
+        for guild_id in list(self._pending):
+            self.forget(guild_id)
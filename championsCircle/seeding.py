@@ -0,0 +1,210 @@
+import bisect
+import re
+
+# Rocket League competitive ranks, lowest first. Every rank but the last has
+# three tiers, so a rank's ordinal is ``RANKS.index(rank) * 3 + tier - 1``.
+RANKS = ("Bronze", "Silver", "Gold", "Platinum", "Diamond", "Champion", "Grand Champion", "Supersonic Legend")
+UNRANKED = (-1, 0, 0)  # (ordinal, division, mmr)
+
+_ALIASES = {
+    "bronze": 0, "silver": 1, "gold": 2, "platinum": 3, "plat": 3,
+    "diamond": 4, "diam": 4, "dia": 4, "champion": 5, "champ": 5,
+    "grand champion": 6, "grand champ": 6, "gc": 6,
+    "supersonic legend": 7, "ssl": 7,
+}
+# Single letters only count as a rank when a tier is glued on: "c2", "d3".
+_SHORT = {"b": 0, "s": 1, "g": 2, "p": 3, "d": 4, "c": 5, "gc": 6}
+_ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4}
+_NAMES = "|".join(sorted(map(re.escape, _ALIASES), key=len, reverse=True))
+_RANK_PATTERN = re.compile(
+    rf"\b(?:(?P<name>{_NAMES})\s*(?P<tier>iii|ii|i|[1-3])?|(?P<short>gc|[bsgpdc])(?P<short_tier>[1-3]))(?:\b|(?=d[1-4]\b))"
+)
+_DIVISION_PATTERN = re.compile(r"\bdiv(?:ision)?\.?\s*(iv|iii|ii|i|[1-4])\b")
+# A bare "d4" is a division only straight after a rank ("c2 d4", "c2d4");
+# on its own "d3" is Diamond III.
+_SHORT_DIVISION_PATTERN = re.compile(r"\s*d([1-4])\b")
+_MMR_PATTERN = re.compile(r"\b(\d{3,4})\s*mmr\b")
+_NUMBER_PATTERN = re.compile(r"\b(\d{3,4})\b")
+
+
+def _number(text):
+    return _ROMAN.get(text) or int(text)
+
+
+def parse_rank(text):
+    """Parse a free-text Rocket League rank into ``(ordinal, division, mmr)``.
+
+    Understands names and common shorthands ("Champion II Div 3", "GC1",
+    "c2 d4", "SSL", "Diamond 3 (1100 mmr)"). Parts that can't be found are
+    0; text without a recognisable rank gets ordinal -1.
+    """
+    text = (text or "").lower()
+    ordinal = UNRANKED[0]
+    division = 0
+
+    division_match = _DIVISION_PATTERN.search(text)
+    if division_match:
+        division = _number(division_match.group(1))
+        text = text[:division_match.start()] + " " + text[division_match.end():]
+
+    match = _RANK_PATTERN.search(text)
+    if match:
+        if match.group("name"):
+            rank, tier = _ALIASES[match.group("name")], match.group("tier")
+        else:
+            rank, tier = _SHORT[match.group("short")], match.group("short_tier")
+        ordinal = 21 if rank == 7 else rank * 3 + (_number(tier) if tier else 1) - 1
+        end = match.end()
+        short_division = _SHORT_DIVISION_PATTERN.match(text, end)
+        if short_division and not division:
+            division = int(short_division.group(1))
+            end = short_division.end()
+        text = text[:match.start()] + " " + text[end:]
+
+    # A number labelled "mmr" wins over any other 3-4 digit number.
+    mmr_match = _MMR_PATTERN.search(text) or _NUMBER_PATTERN.search(text)
+    mmr = int(mmr_match.group(1)) if mmr_match else 0
+    return (ordinal, division, mmr)
+
+
+def format_rank(rank):
+    ordinal, division, mmr = rank
+    if ordinal < 0:
+        text = "Unranked"
+    elif ordinal >= 21:
+        text = RANKS[7]
+    else:
+        text = f"{RANKS[ordinal // 3]} {'I' * (ordinal % 3 + 1)}"
+        if division:
+            text += f" Div {('I', 'II', 'III', 'IV')[division - 1]}"
+    if mmr:
+        text += f" ({mmr})"
+    return text
+
+
+def application_rank(application):
+    """The rank parsed when the application was submitted (or migrated)."""
+    return application.rank or UNRANKED
+
+
+class SeedingIndex:
+    """Approved applicants kept sorted by seed: highest rank first.
+
+    Ties go to the earlier application. Inserting or removing one applicant
+    is a binary search plus a list insert, so the order is always ready for
+    ``tourney bracket`` without re-parsing or re-sorting.
+    """
+
+    def __init__(self, applications=()):
+        self._keys = {}
+        for application in applications:
+            self._keys[application.user_id] = self._key(application)
+        self._order = sorted(self._keys.values())
+
+    @staticmethod
+    def _key(application):
+        ordinal, division, mmr = application_rank(application)
+        return (-ordinal, -division, -mmr, application.timestamp or 0, application.user_id)
+
+    def __len__(self):
+        return len(self._order)
+
+    def add(self, application):
+        self.discard(application.user_id)
+        key = self._keys[application.user_id] = self._key(application)
+        bisect.insort(self._order, key)
+
+    def discard(self, user_id):
+        key = self._keys.pop(user_id, None)
+        if key is not None:
+            del self._order[bisect.bisect_left(self._order, key)]
+
+    def clear(self):
+        self._keys.clear()
+        self._order.clear()
+
+    def seeds(self):
+        """User IDs in seed order."""
+        return [key[-1] for key in self._order]
+
+
+def seed_positions(size):
+    """Seeds in bracket order for a power-of-two ``size``, e.g. 1, 8, 4, 5, 2, 7, 3, 6.
+
+    Seeds 1 and 2 can only meet in the final, 1-4 in the semifinals, etc.
+    """
+    positions = [1]
+    while len(positions) < size:
+        total = len(positions) * 2 + 1
+        positions = [seed for position in positions for seed in (position, total - position)]
+    return positions
+
+
+def _play_round(slots, prefix, matches):
+    """Pair up ``slots``; return (winner slots, loser slots) for the next round.
+
+    A slot is an entrant label, a "Winner of ..." reference or None for a bye.
+    Anyone paired with a bye advances without a match.
+    """
+    winners, losers = [], []
+    for a, b in zip(slots[::2], slots[1::2]):
+        if a is None or b is None:
+            winners.append(a if b is None else b)
+            losers.append(None)
+            continue
+        match_id = f"{prefix}-{len(matches) + 1}"
+        matches.append((match_id, a, b))
+        winners.append(f"Winner of {match_id}")
+        losers.append(f"Loser of {match_id}")
+    return winners, losers
+
+
+def build_bracket(labels, double=False):
+    """Lay out a seeded bracket for ``labels``, given in seed order.
+
+    Returns a list of ``(round name, [(match id, side a, side b), ...])``.
+    The bracket is padded to a power of two with byes for the top seeds.
+    Double elimination adds a losers bracket and a grand final.
+    """
+    size = 1 << (len(labels) - 1).bit_length()
+    slots = [labels[seed - 1] if seed <= len(labels) else None for seed in seed_positions(size)]
+    rounds = []
+    winner_losers = []
+    number = 1
+    while len(slots) > 1:
+        matches = []
+        slots, losers = _play_round(slots, f"W{number}", matches)
+        name = "Final" if len(slots) == 1 and not double else f"Winners Round {number}"
+        rounds.append((name, matches))
+        winner_losers.append(losers)
+        number += 1
+
+    if not double:
+        return rounds
+
+    survivors = winner_losers[0]
+    number = 1
+    for index, dropping in enumerate(winner_losers):
+        if index:
+            # Losers dropping in meet survivors in reverse order to avoid early rematches.
+            paired = [slot for pair in zip(survivors, reversed(dropping)) for slot in pair]
+        elif len(survivors) > 1:
+            paired = survivors
+        else:
+            continue  # two entrants: the only loser goes straight to the grand final
+        survivors, number = _losers_round(paired, number, rounds)
+        if len(survivors) > 1 and index:
+            survivors, number = _losers_round(survivors, number, rounds)
+
+    rounds.append(("Grand Final", [("GF", slots[0], survivors[0])]))
+    return rounds
+
+
+def _losers_round(slots, number, rounds):
+    # Rounds made up entirely of byes are skipped without using up a number.
+    matches = []
+    survivors, _ = _play_round(slots, f"L{number}", matches)
+    if not matches:
+        return survivors, number
+    rounds.append((f"Losers Round {number}", matches))
+    return survivors, number + 1
@@ -0,0 +1,427 @@
+import asyncio
+import contextlib
+import copy
+import logging
+
+from .questions import QuestionSchema, upgrade_questions
+from .seeding import UNRANKED, SeedingIndex
+
+log = logging.getLogger("red.championsCircle.state")
+
+STATUSES = ("active", "approved", "denied", "cancelled")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+# The statuses an application may be moved to each status from. Submitting
+# (back to "active") replaces the application instead, see SubmitView.
+TRANSITIONS = {
+    "approved": ("active",),
+    "denied": ("active",),
+    "cancelled": ("active", "approved", "denied"),
+}
+LEGACY_LISTS = {
+    "active_applications": "active",
+    "approved_applications": "approved",
+    "denied_applications": "denied",
+    "cancelled_applications": "cancelled",
+}
+
+
+def migrate_guild_data(data):
+    """Upgrade a guild's stored data in place and return the keys that changed.
+
+    Version 1 replaces the four per-status lists with a single ``applications``
+    mapping keyed by user ID. Legacy lists could hold bare user IDs as well as
+    application dicts, and a user could appear in more than one list; the most
+    recent entry wins and anything but ``cancelled`` wins a tie.
+
+    Version 2 turns ``custom_questions`` into question objects with stable
+    IDs and rekeys every application's answers from question text to ID.
+
+    Version 3 stores each application as a compact list, see
+    ``Application.encode``.
+    """
+    changed = set()
+    if data.get("schema_version", 0) < 1:
+        applications = data.setdefault("applications", {})
+        for list_name, status in LEGACY_LISTS.items():
+            for entry in data.pop(list_name, None) or []:
+                if isinstance(entry, int):
+                    entry = {"user_id": entry}
+                application = {
+                    "user_id": entry["user_id"],
+                    "status": status,
+                    "timestamp": entry.get("timestamp"),
+                    "answers": entry.get("answers", {}),
+                }
+                key = str(application["user_id"])
+                existing = applications.get(key)
+                if existing is None or _precedence(application) >= _precedence(existing):
+                    applications.pop(key, None)
+                    applications[key] = application
+            changed.add(list_name)
+        data["schema_version"] = 1
+        changed.update(("applications", "schema_version"))
+    if data["schema_version"] < 2:
+        upgrade_questions(data)
+        data["schema_version"] = 2
+        changed.update(("custom_questions", "applications", "schema_version"))
+    if data["schema_version"] < 3:
+        slots = {question["id"]: slot for slot, question in enumerate(data["custom_questions"])}
+        data["applications"] = {
+            key: Application(
+                entry["user_id"],
+                entry["status"],
+                entry.get("timestamp"),
+                entry.get("rank") or UNRANKED,
+                _positional({
+                    slots[question_id]: answer
+                    for question_id, answer in (entry.get("answers") or {}).items()
+                    if question_id in slots
+                }),
+            ).encode()
+            for key, entry in data["applications"].items()
+        }
+        data["schema_version"] = 3
+        changed.update(("applications", "schema_version"))
+    return changed
+
+
+def _positional(answers_by_slot):
+    answers = [""] * (max(answers_by_slot, default=-1) + 1)
+    for slot, answer in answers_by_slot.items():
+        answers[slot] = answer
+    return answers
+
+
+def _precedence(application):
+    return (application["timestamp"] or 0, application["status"] != "cancelled")
+
+
+class Application:
+    """One applicant's entry.
+
+    ``answers`` is positional: ``answers[i]`` answers ``custom_questions[i]``,
+    so question text is stored once per guild rather than once per applicant.
+    ``rank`` is the parsed ``(ordinal, division, mmr)``.
+    """
+
+    __slots__ = ("user_id", "status", "timestamp", "rank", "answers")
+
+    def __init__(self, user_id, status, timestamp=None, rank=UNRANKED, answers=None):
+        self.user_id = user_id
+        self.status = status
+        self.timestamp = timestamp
+        self.rank = tuple(rank)
+        self.answers = answers if answers is not None else []
+
+    def encode(self):
+        """The Config form: ``[status code, timestamp, rank, answers]``, keyed by user ID."""
+        return [STATUS_CODES[self.status], self.timestamp, list(self.rank), self.answers]
+
+    @classmethod
+    def decode(cls, key, entry):
+        status, timestamp, rank, answers = entry
+        return cls(int(key), STATUSES[status], timestamp, rank, answers)
+
+
+class ApplicationStore:
+    """A guild's applications keyed by user ID, with per-status indexes.
+
+    ``applications`` maps user IDs to ``Application`` records, decoded once
+    from Config's compact form and encoded again by ``encode``. Each status
+    keeps an insertion-ordered index of user IDs, so lookups, counts and
+    status changes never scan the whole mapping. Changed user IDs are
+    remembered until ``take_changes``, in the order they last changed, so a
+    row-based backend can write just those.
+    An application that changes status moves to the end of the mapping, which
+    keeps the indexes in the same order after a reload. Approved applicants
+    are also kept in seed order in ``seeding``.
+    """
+
+    def __init__(self, encoded, on_change):
+        self.applications = {int(key): Application.decode(key, entry) for key, entry in encoded.items()}
+        self._on_change = on_change
+        self._by_status = {status: {} for status in STATUSES}
+        for application in self.applications.values():
+            self._by_status[application.status][application.user_id] = None
+        self.seeding = SeedingIndex(self.with_status("approved"))
+        self._cleared = False
+        self._changes = {}  # user_id -> "status" if only the status changed, else "row"
+
+    def __len__(self):
+        return len(self.applications)
+
+    def encode(self):
+        return {str(user_id): application.encode() for user_id, application in self.applications.items()}
+
+    def pending(self):
+        """``(cleared, changes)`` since the last ``take_changes``."""
+        return self._cleared, self._changes
+
+    def take_changes(self):
+        pending = self.pending()
+        self._cleared, self._changes = False, {}
+        return pending
+
+    def get(self, user_id):
+        return self.applications.get(user_id)
+
+    def count(self, status):
+        return len(self._by_status[status])
+
+    def with_status(self, status):
+        for user_id in self._by_status[status]:
+            yield self.applications[user_id]
+
+    def add(self, application):
+        """Insert or replace a user's application."""
+        previous = self.applications.pop(application.user_id, None)
+        if previous is not None:
+            self._by_status[previous.status].pop(previous.user_id, None)
+            self.seeding.discard(previous.user_id)
+        self.applications[application.user_id] = application
+        self._by_status[application.status][application.user_id] = None
+        if application.status == "approved":
+            self.seeding.add(application)
+        self._changes.pop(application.user_id, None)
+        self._changes[application.user_id] = "row"
+        self._on_change()
+
+    def set_status(self, user_id, status):
+        """Move a user's application to ``status``; returns it, or None if missing."""
+        application = self.applications.pop(user_id, None)
+        if application is None:
+            return None
+        self._by_status[application.status].pop(user_id, None)
+        application.status = status
+        self.applications[user_id] = application
+        self._by_status[status][user_id] = None
+        if status == "approved":
+            self.seeding.add(application)
+        else:
+            self.seeding.discard(user_id)
+        self._changes[user_id] = self._changes.pop(user_id, "status")
+        self._on_change()
+        return application
+
+    def transition(self, user_ids, status, from_statuses=None):
+        """Move every listed application that may reach ``status`` from its current one.
+
+        ``from_statuses`` defaults to ``TRANSITIONS[status]``. Others are left
+        alone, so two reviewers acting on the same applicant can't both win.
+        Returns ``(user_id, previous status)`` for each one moved.
+        """
+        allowed = from_statuses or TRANSITIONS[status]
+        moved = []
+        for user_id in user_ids:
+            application = self.applications.get(user_id)
+            if application is not None and application.status in allowed:
+                moved.append((user_id, application.status))
+                self.set_status(user_id, status)
+        return moved
+
+    def clear(self):
+        self.applications.clear()
+        for index in self._by_status.values():
+            index.clear()
+        self.seeding.clear()
+        self._cleared, self._changes = True, {}
+        self._on_change()
+
+
+class GuildState:
+    """In-memory copy of one guild's Champions Circle data.
+
+    Reads come straight from ``data``, except applications, which live in
+    ``applications``. Anything that changes a value must go through ``set``
+    or ``mark_dirty`` so the cache knows to write it back. ``lock`` is held
+    by ``GuildStateCache.transaction``; ``member_lock`` orders the role edits
+    that follow a transition, which run after the guild lock is released.
+    """
+
+    def __init__(self, cache, guild_id, data):
+        self._cache = cache
+        self.guild_id = guild_id
+        self.data = data
+        self.dirty = set()
+        self.lock = asyncio.Lock()
+        self._member_locks = {}  # user ID -> [lock, holders and waiters]
+        self._questions = None
+        changed = migrate_guild_data(data)
+        encoded = data.pop("applications")
+        if cache.database is not None:
+            encoded = cache.database.load(guild_id)
+        self.applications = ApplicationStore(encoded, lambda: self.mark_dirty("applications"))
+        if changed:
+            self.mark_dirty(*changed)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    @contextlib.asynccontextmanager
+    async def member_lock(self, user_id):
+        """Serialize work for one member, e.g. Champions role edits."""
+        entry = self._member_locks.setdefault(user_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._member_locks[user_id]
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.mark_dirty(key)
+
+    def snapshot(self, key):
+        """The value to write to Config for ``key``; KeyError if it was removed."""
+        if key == "applications":
+            return self.applications.encode()
+        return self.data[key]
+
+    @property
+    def questions(self):
+        """The ``QuestionSchema`` for ``custom_questions``, rebuilt only after it changes."""
+        if self._questions is None:
+            self._questions = QuestionSchema(self.data["custom_questions"])
+        return self._questions
+
+    def mark_dirty(self, *keys):
+        if "custom_questions" in keys:
+            self._questions = None
+        self.dirty.update(keys)
+        self._cache.schedule_flush()
+
+
+class GuildStateCache:
+    """Per-guild state loaded once from Config and written back in batches.
+
+    Every change is applied to the in-memory copy immediately. Dirty keys are
+    flushed to Config at most ``flush_delay`` seconds after the first change,
+    no matter how many changes follow it. ``timer``, if given, is a context
+    manager factory called with the operation name around each Config call.
+
+    With a ``database`` (see ``database.ApplicationDatabase``) applications
+    are read from and written to it instead, one row per changed applicant.
+    """
+
+    def __init__(self, config, defaults, flush_delay=5.0, timer=None, database=None):
+        self.config = config
+        self.defaults = defaults
+        self.flush_delay = flush_delay
+        self.timer = timer
+        self.database = database
+        self._guilds = {}
+        self._flush_task = None
+
+    def _timed(self, operation):
+        return self.timer(operation) if self.timer else contextlib.nullcontext()
+
+    async def load(self):
+        with self._timed("all_guilds"):
+            all_guilds = await self.config.all_guilds()
+        for guild_id, data in all_guilds.items():
+            self._guilds[guild_id] = GuildState(self, guild_id, data)
+
+    def get(self, guild_id):
+        state = self._guilds.get(guild_id)
+        if state is None:
+            state = GuildState(self, guild_id, copy.deepcopy(self.defaults))
+            self._guilds[guild_id] = state
+        return state
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, guild_id):
+        """``async with cache.transaction(guild_id) as state:`` holds the guild's lock.
+
+        Use it around a status change so that two transitions in one guild
+        never interleave. Keep network calls out of it: role edits run after
+        it is released, under ``GuildState.member_lock``. Each guild has its
+        own lock; guilds never wait on each other.
+        """
+        state = self.get(guild_id)
+        async with state.lock:
+            yield state
+
+    def peek(self, guild_id):
+        """Return the guild's state if it is loaded, without creating it."""
+        return self._guilds.get(guild_id)
+
+    def __iter__(self):
+        return iter(list(self._guilds.values()))
+
+    def schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        # Changes made while this flush is running schedule the next one.
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        for state in list(self._guilds.values()):
+            if not state.dirty:
+                continue
+            keys, state.dirty = state.dirty, set()
+            group = self.config.guild_from_id(state.guild_id)
+            for key in keys:
+                try:
+                    if key == "applications" and self.database is not None:
+                        with self._timed("sqlite_write"):
+                            self.database.write(state.guild_id, state.applications)
+                        continue
+                    try:
+                        value = state.snapshot(key)
+                    except KeyError:
+                        with self._timed("clear_raw"):
+                            await group.clear_raw(key)
+                    else:
+                        with self._timed("set_raw"):
+                            await group.set_raw(key, value=value)
+                        if key == "applications":
+                            state.applications.take_changes()
+                except Exception:
+                    state.dirty.add(key)
+                    log.exception(f"Failed to flush {key} for guild {state.guild_id}")
+
+    async def switch_backend(self, database, commit=None):
+        """Move every guild's applications to ``database``, or to Config if None.
+
+        Pending changes are flushed to the current backend first, so it
+        still holds everything if the copy fails. Once the new copy is
+        complete ``commit`` is awaited (ccstorage saves the choice there) and
+        only then is the old copy removed; failing to remove it is logged.
+        """
+        await self.flush()
+        previous = self.database
+        if previous is not None:
+            for guild_id in previous.guild_ids():
+                self.get(guild_id)
+        self.database = database
+        for state in self:
+            if database is not None:
+                database.replace_guild(state.guild_id, state.applications)
+            else:
+                with self._timed("set_raw"):
+                    await self.config.guild_from_id(state.guild_id).set_raw("applications", value=state.applications.encode())
+                state.applications.take_changes()
+        if commit is not None:
+            await commit()
+        try:
+            if previous is not None:
+                previous.clear()
+            else:
+                for state in self:
+                    with self._timed("clear_raw"):
+                        await self.config.guild_from_id(state.guild_id).clear_raw("applications")
+        except Exception:
+            log.exception("Failed to remove applications from the previous storage backend")
+
+    async def close(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
@@ -2,6 +2,8 @@ import discord
 from redbot.core import commands, Config
 from typing import Optional
 
+from .dm import queue_dm
+
 class CustomEmbedDM(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -99,8 +101,7 @@ class CustomEmbedDM(commands.Cog):
         if additional_message:
             embed.add_field(name="Additional Message", value=additional_message.strip(), inline=False)
 
-        try:
-            await user.send(embed=embed)
+        if await queue_dm(self.bot, user, embed=embed, source="customembeddm", urgent=True):
             await ctx.send(f"Customized embed sent to {user.mention} via DM.")
-        except discord.Forbidden:
+        else:
             await ctx.send(f"I couldn't send a DM to {user.mention}. They might have DMs disabled.")
\ No newline at end of file
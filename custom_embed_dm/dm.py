@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+import discord
+
+log = logging.getLogger("red.custom_embed_dm.dm")
+
+MAX_ATTEMPTS = 3
+
+_inline_sends = set()  # queue_dm tasks still sending
+
+
+async def with_retries(call):
+    """Await ``call()``, retrying 429 and 5xx responses with backoff.
+
+    Returns None on success or a short reason on failure.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            await call()
+            return None
+        except discord.Forbidden:
+            return "missing permissions"
+        except discord.NotFound:
+            return "no longer exists"
+        except discord.HTTPException as e:
+            retryable = e.status == 429 or e.status >= 500
+            if not retryable or attempt == MAX_ATTEMPTS - 1:
+                return str(e)
+            await asyncio.sleep(2 ** attempt)
+
+
+def queue_dm(bot, user, content=None, *, source, urgent=False, **kwargs):
+    """DM ``user`` through the DMQueue cog if it is loaded, or inline otherwise.
+
+    Inline sends retry 429 and 5xx responses and log failures. Either way
+    this returns at once with an awaitable of whether the DM was delivered;
+    awaiting it is optional. ``urgent`` puts it ahead of bulk notices in the
+    queue.
+    """
+    queue = bot.get_cog("DMQueue")
+    if queue is not None:
+        return queue.submit(user, content, source=source, urgent=urgent, **kwargs)
+    task = asyncio.ensure_future(_send_inline(user, content, source, **kwargs))
+    # The loop only keeps weak references to tasks; hold this one until it's done.
+    _inline_sends.add(task)
+    task.add_done_callback(_inline_sends.discard)
+    return task
+
+
+async def _send_inline(user, content, source, **kwargs):
+    error = await with_retries(lambda: user.send(content, **kwargs))
+    if error is not None:
+        log.error(f"Failed to send {source} DM to user {user.id}: {error}")
+    return error is None
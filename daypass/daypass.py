@@ -1,20 +1,117 @@
 import discord
 from redbot.core import commands, Config
+from redbot.core.utils.chat_formatting import pagify
 from discord.ext.commands import guild_only
-import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+import logging
 import re
+import time
+from typing import Optional
+
+from .bulk import ProgressMessage, mutate_roles, queue_dm
+from .expiry import PassScheduler
+from .tiers import DEFAULT_TIER, Tier, TierConverter, migrate_guild_data
+
+DIGEST_MESSAGE_LIMIT = 2000  # Discord's message length limit
+DIGEST_PAGE_LENGTH = 4000  # under the 4096-character embed description limit
+MENTION_ID = re.compile(r"<(?:@[!&]?|#)(\d+)>|(\d{15,21})")
+
 
 class DayPass(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567890)
         default_guild = {
-            "daypass_role_id": None,
-            "daypass_channel_id": None,
-            "active_passes": {}
+            "schema_version": 0,
+            "tiers": {},  # tier name -> Tier.encode()
+            "active_passes": {}  # tier name -> {str(member_id): expires_at}
         }
         self.config.register_guild(**default_guild)
+        self.scheduler = PassScheduler(self)
+        self.tiers = {}  # guild ID -> {tier name: Tier}
+        self.role_index = {}  # guild ID -> {role ID: Tier}
+        self.logger = logging.getLogger("red.daypass")
+
+    async def cog_load(self):
+        all_guilds = await self.config.all_guilds()
+        for guild_id, data in all_guilds.items():
+            changed = migrate_guild_data(data)
+            if changed:
+                group = self.config.guild_from_id(guild_id)
+                for key in changed:
+                    if key in data:
+                        await group.set_raw(key, value=data[key])
+                    else:
+                        await group.clear_raw(key)
+                self.logger.info(f"Migrated DayPass settings for guild {guild_id}")
+            self.index_tiers(guild_id, {name: Tier.decode(name, entry) for name, entry in data["tiers"].items()})
+        self.scheduler.start(all_guilds)
+
+    async def cog_unload(self):
+        self.scheduler.stop()
+
+    def index_tiers(self, guild_id, tiers):
+        self.tiers[guild_id] = tiers
+        self.role_index[guild_id] = {tier.role_id: tier for tier in tiers.values() if tier.role_id}
+
+    async def save_tiers(self, guild, tiers):
+        """Store the guild's tiers and refresh the in-memory tier and role maps."""
+        group = self.config.guild(guild)
+        await group.tiers.set({name: tier.encode() for name, tier in tiers.items()})
+        await group.schema_version.set(1)
+        self.index_tiers(guild.id, tiers)
+
+    def default_tier(self, guild):
+        """The ``default`` tier, or the only tier when there's just one."""
+        tiers = self.tiers.get(guild.id, {})
+        if DEFAULT_TIER in tiers:
+            return tiers[DEFAULT_TIER]
+        return next(iter(tiers.values())) if len(tiers) == 1 else None
+
+    async def tier_objects(self, ctx, tier):
+        """The tier's role and channel, or None after telling the invoker what's missing."""
+        tier = tier or self.default_tier(ctx.guild)
+        if tier is None:
+            await ctx.send("No DayPass tier to use. Set one up with `setrole`/`setchannel` or `daypass tier add`, or name the tier.")
+            return None
+        if not tier.role_id or not tier.channel_id:
+            await ctx.send(f"The {tier.label} role or channel has not been set. Please set them first.")
+            return None
+        role = ctx.guild.get_role(tier.role_id)
+        channel = ctx.guild.get_channel(tier.channel_id)
+        if not role or not channel:
+            await ctx.send(f"The {tier.label} role or channel was not found. Please check the settings.")
+            return None
+        return tier, role, channel
+
+    async def start_pass(self, guild, tier, member, duration_seconds):
+        """Record (or replace) a member's pass expiry and schedule it; returns the expiry timestamp."""
+        return await self.start_passes(guild, tier, [member], duration_seconds)
+
+    async def start_passes(self, guild, tier, members, duration_seconds):
+        """``start_pass`` for many members in one ``active_passes`` write."""
+        expires_at = time.time() + duration_seconds
+        async with self.config.guild(guild).active_passes() as active_passes:
+            passes = active_passes.setdefault(tier.name, {})
+            for member in members:
+                passes[str(member.id)] = expires_at
+        for member in members:
+            self.scheduler.push(guild.id, tier.name, member.id, expires_at)
+        return expires_at
+
+    async def end_passes(self, guild, tier_name, member_ids):
+        """Forget passes in one ``active_passes`` write, without touching roles."""
+        for member_id in member_ids:
+            self.scheduler.discard(guild.id, tier_name, member_id)
+        await self.forget_passes(guild, tier_name, member_ids)
+
+    async def forget_passes(self, guild, tier_name, member_ids):
+        async with self.config.guild(guild).active_passes() as active_passes:
+            passes = active_passes.get(tier_name, {})
+            for member_id in member_ids:
+                passes.pop(str(member_id), None)
+            if not passes:
+                active_passes.pop(tier_name, None)
 
     @commands.group()
     @commands.admin_or_permissions(administrator=True)
@@ -24,83 +121,203 @@ class DayPass(commands.Cog):
         if ctx.invoked_subcommand is None:
             await ctx.send_help(ctx.command)
 
+    async def _edit_default_tier(self, guild, role_id=None, channel_id=None):
+        tiers = dict(self.tiers.get(guild.id, {}))
+        tier = tiers.get(DEFAULT_TIER) or Tier(DEFAULT_TIER)
+        tiers[DEFAULT_TIER] = Tier(DEFAULT_TIER, role_id or tier.role_id, channel_id or tier.channel_id, tier.duration)
+        await self.save_tiers(guild, tiers)
+
+    async def can_change_role(self, ctx, tier, role_id):
+        """Refuse to move a tier with active passes to another role, whose holders would keep the old one."""
+        if tier is None or tier.role_id in (None, role_id):
+            return True
+        if (await self.config.guild(ctx.guild).active_passes()).get(tier.name):
+            await ctx.send(f"The {tier.label} tier has active passes; its role can't be changed until they end.")
+            return False
+        return True
+
     @daypass.command(name="setrole")
     async def set_daypass_role(self, ctx, role_id: int):
-        """Set the role to be used for DayPass using its ID."""
+        """Set the role to be used for the default DayPass tier using its ID."""
         role = ctx.guild.get_role(role_id)
         if not role:
             await ctx.send(f"No role found with ID {role_id}. Please check the ID and try again.")
             return
-        await self.config.guild(ctx.guild).daypass_role_id.set(role_id)
+        owner = self.role_index.get(ctx.guild.id, {}).get(role_id)
+        if owner is not None and owner.name != DEFAULT_TIER:
+            await ctx.send(f"{role.name} is already the role of the {owner.label} tier.")
+            return
+        if not await self.can_change_role(ctx, self.tiers.get(ctx.guild.id, {}).get(DEFAULT_TIER), role_id):
+            return
+        await self._edit_default_tier(ctx.guild, role_id=role_id)
         await ctx.send(f"DayPass role set to {role.name} (ID: {role_id})")
 
     @daypass.command(name="setchannel")
     async def set_daypass_channel(self, ctx, channel_id: int):
-        """Set the channel to be used for DayPass using its ID."""
+        """Set the channel to be used for the default DayPass tier using its ID."""
         channel = ctx.guild.get_channel(channel_id)
         if not channel:
             await ctx.send(f"No channel found with ID {channel_id}. Please check the ID and try again.")
             return
-        await self.config.guild(ctx.guild).daypass_channel_id.set(channel_id)
+        await self._edit_default_tier(ctx.guild, channel_id=channel_id)
         await ctx.send(f"DayPass channel set to {channel.name} (ID: {channel_id})")
 
-    @daypass.command(name="grant")
-    async def grant_daypass(self, ctx, member: discord.Member, *, duration: str):
+    @daypass.group(name="tier")
+    async def daypass_tier(self, ctx):
+        """Manage DayPass tiers, each with its own role, channel and default duration."""
+        if ctx.invoked_subcommand is None:
+            await ctx.send_help(ctx.command)
+
+    @daypass_tier.command(name="add")
+    async def tier_add(self, ctx, name: str, role: discord.Role, channel: discord.TextChannel, *, duration: str):
         """
-        Grant a DayPass to a user for a specified duration.
-        Use format: 1d2h3m4s for 1 day, 2 hours, 3 minutes, and 4 seconds.
+        Add a tier, or change an existing one.
+        Example: `[p]daypass tier add vip @VIP #vip-lounge 2d`
         """
+        name = name.lower()
         duration_seconds = self.parse_duration(duration)
         if duration_seconds == 0:
             await ctx.send("Invalid duration format. Use combinations like 1d, 2h, 30m, 45s.")
             return
-
-        role_id = await self.config.guild(ctx.guild).daypass_role_id()
-        channel_id = await self.config.guild(ctx.guild).daypass_channel_id()
-
-        if not role_id or not channel_id:
-            await ctx.send("DayPass role or channel has not been set. Please set them first.")
+        owner = self.role_index.get(ctx.guild.id, {}).get(role.id)
+        if owner is not None and owner.name != name:
+            await ctx.send(f"{role.name} is already the role of the {owner.label} tier.")
+            return
+        tiers = dict(self.tiers.get(ctx.guild.id, {}))
+        previous = tiers.get(name)
+        if not await self.can_change_role(ctx, previous, role.id):
+            return
+        tiers[name] = Tier(name, role.id, channel.id, duration_seconds)
+        await self.save_tiers(ctx.guild, tiers)
+        await ctx.send(f"{tiers[name].label} tier {'updated' if previous else 'added'}: {role.name} in {channel.mention} for {self.format_duration(duration_seconds)}.")
+
+    @daypass_tier.command(name="remove")
+    async def tier_remove(self, ctx, tier: TierConverter):
+        """Remove a tier that has no active passes."""
+        passes = (await self.config.guild(ctx.guild).active_passes()).get(tier.name)
+        if passes:
+            await ctx.send(f"The {tier.label} tier still has {len(passes)} active passes.")
             return
+        tiers = dict(self.tiers.get(ctx.guild.id, {}))
+        del tiers[tier.name]
+        await self.save_tiers(ctx.guild, tiers)
+        await ctx.send(f"{tier.label} tier removed.")
+
+    @daypass_tier.command(name="list")
+    async def tier_list(self, ctx):
+        """List the DayPass tiers."""
+        tiers = self.tiers.get(ctx.guild.id, {})
+        if not tiers:
+            await ctx.send("There are no DayPass tiers.")
+            return
+        embed = discord.Embed(title="DayPass Tiers", color=discord.Color.blue())
+        for tier in tiers.values():
+            role = ctx.guild.get_role(tier.role_id) if tier.role_id else None
+            channel = ctx.guild.get_channel(tier.channel_id) if tier.channel_id else None
+            embed.add_field(
+                name=tier.name,
+                value=f"Role: {role.mention if role else 'not set'}\nChannel: {channel.mention if channel else 'not set'}\nDefault: {self.format_duration(tier.duration)}",
+                inline=True,
+            )
+        await ctx.send(embed=embed)
 
-        role = ctx.guild.get_role(role_id)
-        channel = ctx.guild.get_channel(channel_id)
+    @daypass.command(name="grant")
+    async def grant_daypass(self, ctx, tier: Optional[TierConverter], member: discord.Member, *, duration: Optional[str] = None):
+        """
+        Grant a DayPass to a user for a specified duration, or the tier's default.
+        Use format: 1d2h3m4s for 1 day, 2 hours, 3 minutes, and 4 seconds.
+        """
+        found = await self.tier_objects(ctx, tier)
+        if found is None:
+            return
+        tier, role, channel = found
 
-        if not role or not channel:
-            await ctx.send("DayPass role or channel not found. Please check the settings.")
+        duration_seconds = self.parse_duration(duration) if duration else tier.duration
+        if duration_seconds == 0:
+            await ctx.send("Invalid duration format. Use combinations like 1d, 2h, 30m, 45s.")
             return
 
+        # Recorded first, so on_member_update sees a pass and doesn't start a default one;
+        # the grant DM is sent here instead, with the real duration.
+        expires_at = await self.start_pass(ctx.guild, tier, member, duration_seconds)
         await member.add_roles(role)
-        expiry_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
-
-        async with self.config.guild(ctx.guild).active_passes() as active_passes:
-            active_passes[str(member.id)] = expiry_time.timestamp()
+        self.queue_grant_dm(ctx.guild, tier, member, duration_seconds, expires_at)
 
         duration_str = self.format_duration(duration_seconds)
-        await ctx.send(f"DayPass granted to {member.mention} for {duration_str}.")
-        self.bot.loop.create_task(self.remove_daypass(ctx.guild, member, role, channel, duration_seconds))
+        await ctx.send(f"{tier.label} granted to {member.mention} for {duration_str}.")
 
-    @daypass.command(name="setduration")
-    async def set_daypass_duration(self, ctx, member: discord.Member, *, duration: str):
+    @daypass.command(name="grantmany")
+    async def grant_many(self, ctx, tier: Optional[TierConverter], duration: str, *, targets: str):
         """
-        Set the duration for a user who already has the DayPass role.
-        Use format: 1d2h3m4s for 1 day, 2 hours, 3 minutes, and 4 seconds.
+        Grant a DayPass to many members at once.
+        Targets can be roles, voice channels (everyone connected) and members, as mentions or IDs.
+        Example: `[p]daypass grantmany 6h @Guests #Stage 123456789012345678`
         """
-        role_id = await self.config.guild(ctx.guild).daypass_role_id()
-        channel_id = await self.config.guild(ctx.guild).daypass_channel_id()
+        duration_seconds = self.parse_duration(duration)
+        if duration_seconds == 0:
+            await ctx.send("Invalid duration format. Use combinations like 1d, 2h, 30m, 45s.")
+            return
 
-        if not role_id or not channel_id:
-            await ctx.send("DayPass role or channel has not been set. Please set them first.")
+        found = await self.tier_objects(ctx, tier)
+        if found is None:
             return
+        tier, role, _ = found
 
-        role = ctx.guild.get_role(role_id)
-        channel = ctx.guild.get_channel(channel_id)
+        members, unresolved = self.resolve_targets(ctx.guild, targets)
+        if not members:
+            await ctx.send("No members found for those targets.")
+            return
 
-        if not role or not channel:
-            await ctx.send("DayPass role or channel not found. Please check the settings.")
+        # Recorded first, so on_member_update sees the passes and doesn't start default ones.
+        expires_at = await self.start_passes(ctx.guild, tier, members, duration_seconds)
+        progress = ProgressMessage(ctx.channel, f"Granting {tier.label}", len(members))
+        await progress.start()
+        result = await mutate_roles(members, role, add=True, progress=progress, reason=f"{tier.label} granted")
+        if result.failed:
+            await self.end_passes(ctx.guild, tier.name, [member.id for member, _ in result.failed])
+        for member in result.succeeded + result.skipped:
+            self.queue_grant_dm(ctx.guild, tier, member, duration_seconds, expires_at)
+
+        summary = result.report(f"{tier.label} for {self.format_duration(duration_seconds)}")
+        if result.skipped:
+            summary += f"\nMembers who already had the role had their pass reset to {self.format_duration(duration_seconds)}."
+        if unresolved:
+            summary += f"\nCould not find: {', '.join(unresolved[:20])}" + (f" and {len(unresolved) - 20} more." if len(unresolved) > 20 else "")
+        await progress.finish(summary)
+
+    def resolve_targets(self, guild, targets):
+        """Members named by role, voice channel and member mentions or IDs; returns (members, unresolved)."""
+        members = {}
+        unresolved = []
+        for token in re.split(r"[\s,]+", targets.strip()):
+            match = MENTION_ID.fullmatch(token)
+            object_id = int(match.group(1) or match.group(2)) if match else None
+            found = None
+            if object_id is not None:
+                found = guild.get_member(object_id) or guild.get_role(object_id) or guild.get_channel(object_id)
+            if isinstance(found, discord.Member):
+                members[found.id] = found
+            elif isinstance(found, discord.Role):
+                members.update((member.id, member) for member in found.members)
+            elif isinstance(found, (discord.VoiceChannel, discord.StageChannel)):
+                members.update((member.id, member) for member in found.members)
+            elif token:
+                unresolved.append(token)
+        return [member for member in members.values() if not member.bot], unresolved
+
+    @daypass.command(name="setduration")
+    async def set_daypass_duration(self, ctx, tier: Optional[TierConverter], member: discord.Member, *, duration: str):
+        """
+        Set the duration for a user who already has the DayPass role.
+        Use format: 1d2h3m4s for 1 day, 2 hours, 3 minutes, and 4 seconds.
+        """
+        found = await self.tier_objects(ctx, tier)
+        if found is None:
             return
+        tier, role, channel = found
 
         if role not in member.roles:
-            await ctx.send(f"{member.mention} does not have the DayPass role. Use the 'grant' command instead.")
+            await ctx.send(f"{member.mention} does not have the {tier.label} role. Use the 'grant' command instead.")
             return
 
         duration_seconds = self.parse_duration(duration)
@@ -108,14 +325,10 @@ class DayPass(commands.Cog):
             await ctx.send("Invalid duration format. Use combinations like 1d, 2h, 30m, 45s.")
             return
 
-        expiry_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
-
-        async with self.config.guild(ctx.guild).active_passes() as active_passes:
-            active_passes[str(member.id)] = expiry_time.timestamp()
+        await self.start_pass(ctx.guild, tier, member, duration_seconds)
 
         duration_str = self.format_duration(duration_seconds)
-        await ctx.send(f"DayPass duration set for {member.mention} to {duration_str}.")
-        self.bot.loop.create_task(self.remove_daypass(ctx.guild, member, role, channel, duration_seconds))
+        await ctx.send(f"{tier.label} duration set for {member.mention} to {duration_str}.")
 
     def parse_duration(self, duration_str):
         """Parse a duration string into seconds."""
@@ -148,119 +361,124 @@ class DayPass(commands.Cog):
             parts.append(f"{seconds}s")
         return " ".join(parts)
 
-    async def remove_daypass(self, guild, member, role, channel, duration_seconds):
-        await asyncio.sleep(duration_seconds)
-        if member and role in member.roles:
-            try:
-                await member.remove_roles(role)
-                await channel.send(f"{member.mention}'s DayPass has expired.")
-            except discord.HTTPException:
-                # Handle the case where the bot can't remove the role
-                await channel.send(f"Failed to remove DayPass role from {member.mention}. Please remove it manually.")
+    async def expire_passes(self, guild, tier_name, member_ids):
+        """Remove a tier's role from members whose pass has run out, and post one digest.
 
-        async with self.config.guild(guild).active_passes() as active_passes:
-            active_passes.pop(str(member.id), None)
+        Returns the IDs whose role couldn't be removed; their passes stay
+        recorded and the scheduler tries them again later.
+        """
+        tier = self.tiers.get(guild.id, {}).get(tier_name)
+        role = guild.get_role(tier.role_id) if tier and tier.role_id else None
+        channel = guild.get_channel(tier.channel_id) if tier and tier.channel_id else None
+        members = [member for member in map(guild.get_member, member_ids) if member and role in member.roles] if role else []
+        failed = []
+        if members:
+            # The scheduler has already let go of these passes, so on_member_update
+            # doesn't take the removals for manual ones.
+            result = await mutate_roles(members, role, add=False, reason=f"{tier.label} expired")
+            failed = [member for member, _ in result.failed]
+            for member, error in result.failed:
+                self.logger.error(f"Failed to remove the {tier.label} role from {member.id} in guild {guild.id}: {error}")
+            if channel:
+                await self.post_digest(channel, f"{tier.label} expired", result.succeeded)
+                await self.post_digest(channel, f"Failed to remove {tier.label} role, will retry later", failed)
+
+        failed_ids = {member.id for member in failed}
+        # Passes granted again while the roles were being removed are kept.
+        await self.forget_passes(guild, tier_name, [
+            member_id for member_id in member_ids
+            if member_id not in failed_ids and (guild.id, tier_name, member_id) not in self.scheduler
+        ])
+        return failed_ids
+
+    async def post_digest(self, channel, title, members):
+        """Announce ``members`` in one message, or in embed pages when the list is long."""
+        if not members:
+            return
+        mentions = " ".join(member.mention for member in members)
+        text = f"{title}: {mentions}" if len(members) > 1 else f"{members[0].mention}: {title}."
+        try:
+            if len(text) <= DIGEST_MESSAGE_LIMIT:
+                await channel.send(text)
+                return
+            pages = list(pagify(mentions, delims=[" "], page_length=DIGEST_PAGE_LENGTH))
+            for number, page in enumerate(pages, 1):
+                embed = discord.Embed(title=f"{title} ({len(members)})", description=page, color=discord.Color.orange())
+                embed.set_footer(text=f"Page {number}/{len(pages)}")
+                await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            self.logger.error(f"Failed to post a DayPass digest in channel {channel.id}: {e}")
 
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
         if before.guild != after.guild:
             return
 
-        role_id = await self.config.guild(after.guild).daypass_role_id()
-        channel_id = await self.config.guild(after.guild).daypass_channel_id()
-
-        if not role_id or not channel_id:
+        # Most updates are nicknames, avatars or timeouts; leave before any await.
+        changed = {role.id for role in before.roles} ^ {role.id for role in after.roles}
+        if not changed:
+            return
+        role_index = self.role_index.get(after.guild.id)
+        if not role_index:
             return
 
-        role = after.guild.get_role(role_id)
-        channel = after.guild.get_channel(channel_id)
+        after_ids = {role.id for role in after.roles}
+        for role_id in changed:
+            tier = role_index.get(role_id)
+            if tier is not None:
+                await self.tier_role_changed(after, tier, role_id in after_ids)
 
-        if not role or not channel:
+    async def tier_role_changed(self, member, tier, added):
+        guild = member.guild
+        if not tier.channel_id or not guild.get_role(tier.role_id) or not guild.get_channel(tier.channel_id):
             return
 
-        # Check if the DayPass role was added
-        if role not in before.roles and role in after.roles:
-            # DayPass role was added
-            duration_seconds = 12 * 3600  # 12 hours in seconds
-            expiry_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
+        # Check if the tier's role was added
+        if added:
+            # The role was added; grant and setduration have already recorded their pass
+            if (guild.id, tier.name, member.id) in self.scheduler:
+                return
+            expires_at = await self.start_pass(guild, tier, member, tier.duration)
+            self.queue_grant_dm(guild, tier, member, tier.duration, expires_at)
 
-            async with self.config.guild(after.guild).active_passes() as active_passes:
-                active_passes[str(after.id)] = expiry_time.timestamp()
+        # The role was removed; expiry forgets the pass before removing the role
+        else:
+            if (guild.id, tier.name, member.id) not in self.scheduler:
+                return
+            await self.end_passes(guild, tier.name, [member.id])
 
             # Send DM to the user
-            try:
-                await after.send(f"You have been granted a DayPass in {after.guild.name} for 12 hours. "
-                                 f"Your access will expire at {expiry_time.strftime('%Y-%m-%d %H:%M:%S UTC')}.")
-            except discord.HTTPException:
-                # If DM fails, log it or handle it as needed
-                pass
-
-            # Start the task to remove the role after the duration
-            self.bot.loop.create_task(self.remove_daypass(after.guild, after, role, channel, duration_seconds))
-
-        # Check if the DayPass role was removed
-        elif role in before.roles and role not in after.roles:
-            # DayPass role was removed
-            async with self.config.guild(after.guild).active_passes() as active_passes:
-                active_passes.pop(str(after.id), None)
-            
-            # Send DM to the user
-            try:
-                await after.send(f"Your DayPass in {after.guild.name} has been manually removed.")
-            except discord.HTTPException:
-                # If DM fails, log it or handle it as needed
-                pass
+            queue_dm(self.bot, member, f"Your {tier.label} in {guild.name} has been manually removed.", source="daypass.removed")
+
+    def queue_grant_dm(self, guild, tier, member, duration_seconds, expires_at):
+        expiry_time = datetime.fromtimestamp(expires_at, timezone.utc)
+        queue_dm(self.bot, member, f"You have been granted a {tier.label} in {guild.name} for {self.format_duration(duration_seconds)}. "
+                                   f"Your access will expire at {expiry_time.strftime('%Y-%m-%d %H:%M:%S UTC')}.", source="daypass.grant")
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
-        async with self.config.guild(member.guild).active_passes() as active_passes:
-            if str(member.id) in active_passes:
-                del active_passes[str(member.id)]
+        held = [name for name in self.tiers.get(member.guild.id, {}) if (member.guild.id, name, member.id) in self.scheduler]
+        for name in held:
+            await self.end_passes(member.guild, name, [member.id])
 
     @daypass.command(name="list")
     async def list_active_passes(self, ctx):
         """List all active DayPasses."""
         active_passes = await self.config.guild(ctx.guild).active_passes()
-        if not active_passes:
+        if not any(active_passes.values()):
             await ctx.send("There are no active DayPasses.")
             return
 
         embed = discord.Embed(title="Active DayPasses", color=discord.Color.blue())
-        for user_id, expiry_timestamp in active_passes.items():
-            user = ctx.guild.get_member(int(user_id))
-            if user:
-                expiry_time = datetime.fromtimestamp(expiry_timestamp)
-                embed.add_field(name=user.name, value=f"Expires: {expiry_time.strftime('%Y-%m-%d %H:%M:%S UTC')}", inline=False)
+        for tier_name, passes in active_passes.items():
+            for user_id, expiry_timestamp in passes.items():
+                user = ctx.guild.get_member(int(user_id))
+                if user:
+                    expiry_time = datetime.fromtimestamp(expiry_timestamp, timezone.utc)
+                    name = user.name if tier_name == DEFAULT_TIER else f"{user.name} ({tier_name})"
+                    embed.add_field(name=name, value=f"Expires: {expiry_time.strftime('%Y-%m-%d %H:%M:%S UTC')}", inline=False)
 
         await ctx.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        self.bot.loop.create_task(self.check_expired_passes())
-
-    async def check_expired_passes(self):
-        while self == self.bot.get_cog("DayPass"):
-            for guild in self.bot.guilds:
-                role_id = await self.config.guild(guild).daypass_role_id()
-                channel_id = await self.config.guild(guild).daypass_channel_id()
-                role = guild.get_role(role_id)
-                channel = guild.get_channel(channel_id)
-
-                if not role or not channel:
-                    continue
-
-                async with self.config.guild(guild).active_passes() as active_passes:
-                    current_time = datetime.utcnow().timestamp()
-                    expired_passes = [user_id for user_id, expiry_time in active_passes.items() if expiry_time <= current_time]
-
-                    for user_id in expired_passes:
-                        member = guild.get_member(int(user_id))
-                        if member and role in member.roles:
-                            await member.remove_roles(role)
-                            await channel.send(f"{member.mention}'s DayPass has expired.")
-                        del active_passes[user_id]
-
-            await asyncio.sleep(60)  # Check every minute
-
 async def setup(bot):
     await bot.add_cog(DayPass(bot))
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""A deadline heap drained by one worker task; PassScheduler builds on it."""
+import asyncio
+import heapq
+import time
+
+
+class DeadlineScheduler:
+    """Min-heap of deadlines keyed by tuples, drained by one worker task.
+
+    Each key has at most one live deadline in ``_live``; scheduling it again
+    moves it, and heap entries that no longer match are stale and skipped
+    when popped. The worker sleeps until the earliest deadline (plus
+    ``window`` seconds, so neighbouring deadlines are handled together) or
+    until an earlier one is scheduled. Due keys are grouped by ``group``
+    and each group is drained by its own task calling ``handle``, so one
+    slow group never holds up the others; keys that come due while their
+    group is still being handled are queued for that same task.
+
+    Subclasses implement ``group(key)`` and ``async handle(group, keys)``.
+    """
+
+    window = 0.0
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._heap = []
+        self._live = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._handlers = {}  # group -> task handling it
+        self._queued = {}  # group -> keys waiting for that task
+
+    def start_worker(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._handlers.values():
+            task.cancel()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, key):
+        """Whether ``key`` has a deadline that hasn't been handed out yet."""
+        return key in self._live
+
+    def schedule(self, key, deadline):
+        """Track (or move) the deadline for ``key``."""
+        earliest = self._heap[0][0] if self._heap else None
+        self._live[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if earliest is None or deadline < earliest:
+            self._wakeup.set()
+
+    def unschedule(self, key):
+        if self._live.pop(key, None) is not None:
+            self._maybe_compact()
+
+    def unschedule_where(self, predicate):
+        for key in [key for key in self._live if predicate(key)]:
+            del self._live[key]
+        self._maybe_compact()
+
+    def retry(self, keys, deadline):
+        """Schedule handed-out keys again, unless they were rescheduled meanwhile."""
+        earliest = self._heap[0][0] if self._heap else None
+        for key in keys:
+            if self._live.setdefault(key, deadline) == deadline:
+                heapq.heappush(self._heap, (deadline, key))
+        if self._heap and (earliest is None or self._heap[0][0] < earliest):
+            self._wakeup.set()
+
+    def _maybe_compact(self):
+        # Stale entries are normally dropped lazily; rebuild if they dominate.
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(deadline, key) for key, deadline in self._live.items()]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, key = heapq.heappop(self._heap)
+            if self._live.get(key) != deadline:
+                continue
+            del self._live[key]
+            due.append(key)
+        return due
+
+    def dispatch(self, now):
+        """Hand everything due by ``now`` to the groups' tasks without waiting.
+
+        Returns ``{group: task}`` for every group that had something due.
+        """
+        tasks = {}
+        for key in self.pop_due(now):
+            group = self.group(key)
+            self._queued.setdefault(group, []).append(key)
+            if group not in tasks:
+                task = self._handlers.get(group)
+                if task is None:
+                    task = self._handlers[group] = asyncio.create_task(self._drain(group))
+                tasks[group] = task
+        return tasks
+
+    async def _drain(self, group):
+        try:
+            while group in self._queued:
+                await self.handle(group, self._queued.pop(group))
+        finally:
+            self._handlers.pop(group, None)
+
+    def group(self, key):
+        raise NotImplementedError
+
+    async def handle(self, group, keys):
+        raise NotImplementedError
+
+    async def _run(self):
+        await self.bot.wait_until_red_ready()
+        while True:
+            self._wakeup.clear()
+            self.dispatch(time.time())
+
+            timeout = self._heap[0][0] + self.window - time.time() if self._heap else None
+            if timeout is not None and timeout <= 0:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
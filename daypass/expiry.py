@@ -0,0 +1,70 @@
+import logging
+import time
+
+from .deadlines import DeadlineScheduler
+
+log = logging.getLogger("red.daypass.expiry")
+
+# Seconds the worker waits past the earliest deadline, so passes granted
+# around the same time are expired (and announced) together.
+DIGEST_WINDOW = 30.0
+RETRY_DELAY = 300.0  # seconds before the first retry of a failed expiry, doubled per failure
+RETRY_MAX = 6 * 3600.0
+
+
+class PassScheduler(DeadlineScheduler):
+    """DayPass expiry times across all guilds and tiers, keyed by (guild, tier, member).
+
+    Everything due within ``window`` seconds of the earliest deadline is
+    handed to ``cog.expire_passes`` once per guild and tier. Passes it
+    couldn't end, or all of them if it raises, are scheduled again with an
+    exponential backoff.
+    """
+
+    def __init__(self, cog, window=DIGEST_WINDOW):
+        super().__init__(cog.bot)
+        self.cog = cog
+        self.window = window
+        self._failures = {}  # key -> consecutive failed expiries
+
+    def start(self, all_guilds):
+        """Build the heap from every guild's (migrated) ``active_passes`` and start the worker."""
+        for guild_id, data in all_guilds.items():
+            for tier, passes in data.get("active_passes", {}).items():
+                for member_id, expires_at in passes.items():
+                    self.push(guild_id, tier, int(member_id), expires_at)
+        self.start_worker()
+
+    def push(self, guild_id, tier, member_id, expires_at):
+        """Track (or move) a member's pass expiry."""
+        self._failures.pop((guild_id, tier, member_id), None)
+        self.schedule((guild_id, tier, member_id), expires_at)
+
+    def discard(self, guild_id, tier, member_id):
+        self._failures.pop((guild_id, tier, member_id), None)
+        self.unschedule((guild_id, tier, member_id))
+
+    def group(self, key):
+        return key[:2]
+
+    async def handle(self, group, keys):
+        guild_id, tier = group
+        guild = self.cog.bot.get_guild(guild_id)
+        if not guild:
+            return
+        member_ids = [member_id for _, _, member_id in keys]
+        try:
+            failed = set(await self.cog.expire_passes(guild, tier, member_ids))
+        except Exception:
+            log.exception(f"Error expiring {tier} DayPasses in guild {guild_id}")
+            failed = set(member_ids)
+
+        now = time.time()
+        for key in keys:
+            if key[2] not in failed:
+                self._failures.pop(key, None)
+                continue
+            if key in self:
+                continue  # granted again meanwhile
+            failures = self._failures[key] = self._failures.get(key, 0) + 1
+            self.retry([key], now + min(RETRY_DELAY * 2 ** (failures - 1), RETRY_MAX))
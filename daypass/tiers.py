@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+from discord.ext import commands
+
+DEFAULT_TIER = "default"
+DEFAULT_DURATION = 12 * 3600  # seconds
+
+
+class Tier:
+    """One DayPass product: the role it grants, where expiries are announced and its default length."""
+
+    __slots__ = ("name", "role_id", "channel_id", "duration")
+
+    def __init__(self, name, role_id=None, channel_id=None, duration=DEFAULT_DURATION):
+        self.name = name
+        self.role_id = role_id
+        self.channel_id = channel_id
+        self.duration = duration
+
+    @property
+    def label(self):
+        return "DayPass" if self.name == DEFAULT_TIER else f"{self.name} DayPass"
+
+    def encode(self):
+        return {"role_id": self.role_id, "channel_id": self.channel_id, "duration": self.duration}
+
+    @classmethod
+    def decode(cls, name, data):
+        return cls(name, data.get("role_id"), data.get("channel_id"), data.get("duration", DEFAULT_DURATION))
+
+
+def migrate_guild_data(data):
+    """Upgrade a guild's stored data in place and return the keys that changed.
+
+    Version 1 moves the single ``daypass_role_id``/``daypass_channel_id``
+    into a ``default`` tier with the old 12-hour duration, and nests
+    ``active_passes`` by tier name: ``{tier: {member_id: expires_at}}``.
+    Legacy expiry times are converted to real epoch seconds, see
+    ``legacy_timestamp``.
+    """
+    changed = set()
+    if data.get("schema_version", 0) < 1:
+        tiers = data.setdefault("tiers", {})
+        role_id = data.pop("daypass_role_id", None)
+        channel_id = data.pop("daypass_channel_id", None)
+        if role_id or channel_id:
+            tiers[DEFAULT_TIER] = Tier(DEFAULT_TIER, role_id, channel_id).encode()
+        passes = {member_id: legacy_timestamp(expires_at) for member_id, expires_at in (data.get("active_passes") or {}).items()}
+        data["active_passes"] = {DEFAULT_TIER: passes} if passes else {}
+        data["schema_version"] = 1
+        changed.update(("tiers", "active_passes", "schema_version", "daypass_role_id", "daypass_channel_id"))
+    return changed
+
+
+def legacy_timestamp(timestamp):
+    """Correct an expiry written as ``datetime.utcnow().timestamp()``.
+
+    That call treats the naive UTC time as local time, so on a host that
+    isn't on UTC the stored value is off by the local UTC offset at that
+    moment. Turning it back into the same naive wall time and reading that
+    as UTC undoes it, DST included. On a UTC host this changes nothing.
+    """
+    return datetime.fromtimestamp(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+class TierConverter(commands.Converter):
+    """Looks a tier up by name in the invoking guild."""
+
+    async def convert(self, ctx, argument):
+        tier = ctx.cog.tiers.get(ctx.guild.id, {}).get(argument.lower())
+        if tier is None:
+            raise commands.BadArgument(f'No DayPass tier named "{argument}".')
+        return tier
@@ -0,0 +1,4 @@
+from .dmqueue import DMQueue
+
+async def setup(bot):
+    await bot.add_cog(DMQueue(bot))
@@ -0,0 +1,289 @@
+import discord
+from redbot.core import commands, Config
+from redbot.core.utils.chat_formatting import box
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import Counter
+
+DM_WORKERS = 4
+DM_RATE = 5.0  # DMs started per second across all workers
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 2.0  # seconds before the first retry, doubled per attempt
+BACKOFF_MAX = 300.0
+CLOSED_DM_TTL = 7 * 86400  # seconds to stop trying users who refused a DM
+SAVE_DELAY = 2.0  # seconds to coalesce queue writes
+CANNOT_MESSAGE_USER = 50007  # Discord error code for closed DMs
+
+
+class Notice:
+    """One DM waiting to be delivered.
+
+    Notices without a view are saved to Config and survive a reload; views
+    can't be persisted, so interactive DMs live only in memory. ``future``
+    resolves to whether the DM was delivered.
+    """
+
+    __slots__ = ("id", "user_id", "content", "embed", "view", "source", "urgent", "attempts", "not_before", "queued_at", "future")
+
+    def __init__(self, notice_id, user_id, content=None, embed=None, view=None, source=None, urgent=False):
+        self.id = notice_id
+        self.user_id = user_id
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.source = source or "unknown"
+        self.urgent = urgent
+        self.attempts = 0
+        self.not_before = 0.0
+        self.queued_at = time.time()
+        self.future = asyncio.get_running_loop().create_future()
+
+    @property
+    def persistent(self):
+        return self.view is None
+
+    def encode(self):
+        return {
+            "user_id": self.user_id,
+            "content": self.content,
+            "embed": self.embed.to_dict() if self.embed else None,
+            "source": self.source,
+            "urgent": self.urgent,
+            "attempts": self.attempts,
+            "not_before": self.not_before,
+            "queued_at": self.queued_at,
+        }
+
+    @classmethod
+    def decode(cls, notice_id, data):
+        embed = discord.Embed.from_dict(data["embed"]) if data["embed"] else None
+        notice = cls(notice_id, data["user_id"], data["content"], embed, source=data["source"], urgent=data["urgent"])
+        notice.attempts = data["attempts"]
+        notice.not_before = data["not_before"]
+        notice.queued_at = data["queued_at"]
+        return notice
+
+
+class DMQueue(commands.Cog):
+    """Delivers DMs for other cogs through one rate-limited, retrying queue.
+
+    Other cogs look this cog up with ``bot.get_cog("DMQueue")`` and call
+    ``submit``; without it they send inline. Urgent notices (questionnaire
+    prompts, reviewer DMs) go ahead of bulk ones. A 429 or 5xx is retried
+    with exponential backoff; users whose DMs are closed are remembered for
+    ``CLOSED_DM_TTL`` and skipped without an API call.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = Config.get_conf(self, identifier=1234567890)
+        self.config.register_global(
+            queue={},  # notice ID -> Notice.encode(), for notices without a view
+            closed_dms={},  # str(user_id) -> when their DMs were found closed
+        )
+        self.logger = logging.getLogger("red.dmqueue")
+        self.pending = {}  # notice ID -> Notice, queued or being sent
+        self.closed_dms = {}
+        self.stats = Counter()
+        self.wait_total = 0.0
+        self._heaps = ([], [])  # urgent, bulk; each of (not_before, notice ID)
+        self._ids = itertools.count(1)
+        self._wakeup = asyncio.Event()
+        self._ready = asyncio.Queue(maxsize=DM_WORKERS)
+        self._next_start = 0.0
+        self._tasks = []
+        self._save_task = None
+
+    async def cog_load(self):
+        self.closed_dms = {int(user_id): at for user_id, at in (await self.config.closed_dms()).items()}
+        saved = await self.config.queue()
+        for notice_id, data in saved.items():
+            self._push(Notice.decode(int(notice_id), data))
+        self._ids = itertools.count(max(map(int, saved), default=0) + 1)
+        self._tasks = [asyncio.create_task(self._dispatch())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(DM_WORKERS)]
+        if saved:
+            self.logger.info(f"Restored {len(saved)} queued DMs.")
+
+    async def cog_unload(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._save_task is not None:
+            self._save_task.cancel()
+        await self._save()
+        for notice in self.pending.values():
+            if not notice.future.done():
+                notice.future.set_result(None if notice.persistent else False)
+
+    def submit(self, user, content=None, *, embed=None, view=None, source=None, urgent=False):
+        """Queue a DM to ``user`` (a user or user ID) and return a future of whether it was delivered.
+
+        Nobody has to await the future; failures are logged and counted here.
+        It resolves to None if the cog unloads first while the DM is saved
+        for after the reload.
+        """
+        user_id = user if isinstance(user, int) else user.id
+        notice = Notice(next(self._ids), user_id, content, embed, view, source, urgent)
+        self.stats["submitted"] += 1
+        if self._is_closed(user_id):
+            self._count("skipped_closed", notice)
+            notice.future.set_result(False)
+            return notice.future
+        self._push(notice)
+        self._changed(notice)
+        return notice.future
+
+    def _push(self, notice):
+        self.pending[notice.id] = notice
+        heapq.heappush(self._heaps[0 if notice.urgent else 1], (notice.not_before, notice.id))
+        self._wakeup.set()
+
+    def _is_closed(self, user_id):
+        closed_at = self.closed_dms.get(user_id)
+        if closed_at is None:
+            return False
+        if time.time() - closed_at > CLOSED_DM_TTL:
+            del self.closed_dms[user_id]
+            return False
+        return True
+
+    def _changed(self, notice=None):
+        if notice is not None and not notice.persistent:
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(SAVE_DELAY)
+        self._save_task = None
+        await self._save()
+
+    async def _save(self):
+        try:
+            await self.config.queue.set({
+                str(notice.id): notice.encode() for notice in self.pending.values() if notice.persistent
+            })
+            await self.config.closed_dms.set({str(user_id): at for user_id, at in self.closed_dms.items()})
+        except Exception:
+            self.logger.exception("Failed to save the DM queue")
+
+    def _pop_due(self, now):
+        # Urgent notices that are due go first, then bulk ones.
+        for heap in self._heaps:
+            if heap and heap[0][0] <= now:
+                return self.pending.get(heapq.heappop(heap)[1])
+        return None
+
+    async def _dispatch(self):
+        """Move notices that are due onto the workers' queue, at most ``DM_RATE`` per second."""
+        await self.bot.wait_until_red_ready()
+        while True:
+            self._wakeup.clear()
+            notice = self._pop_due(time.time())
+            if notice is not None:
+                delay = self._next_start - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start = time.monotonic() + 1 / DM_RATE
+                await self._ready.put(notice)
+                continue
+            heads = [heap[0][0] for heap in self._heaps if heap]
+            timeout = max(min(heads) - time.time(), 0) if heads else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            notice = await self._ready.get()
+            try:
+                await self._deliver(notice)
+            except Exception:
+                self.logger.exception(f"Unexpected error delivering DM {notice.id}")
+                self._finish(notice, False, "failed")
+
+    async def _deliver(self, notice):
+        if self._is_closed(notice.user_id):
+            self._finish(notice, False, "skipped_closed")
+            return
+        user = self.bot.get_user(notice.user_id)
+        try:
+            if user is None:
+                user = await self.bot.fetch_user(notice.user_id)
+            await user.send(content=notice.content, embed=notice.embed, **({"view": notice.view} if notice.view else {}))
+        except discord.Forbidden as e:
+            if e.code == CANNOT_MESSAGE_USER:
+                self.closed_dms[notice.user_id] = time.time()
+                self.stats["closed_dms"] += 1
+            self.logger.info(f"Could not DM user {notice.user_id}: {e.text or e}")
+            self._finish(notice, False, "failed")
+        except discord.NotFound:
+            self._finish(notice, False, "failed")
+        except discord.HTTPException as e:
+            notice.attempts += 1
+            if (e.status == 429 or e.status >= 500) and notice.attempts < MAX_ATTEMPTS:
+                backoff = min(BACKOFF_BASE * 2 ** (notice.attempts - 1), BACKOFF_MAX)
+                notice.not_before = time.time() + backoff * random.uniform(1, 1.5)
+                self.stats["retried"] += 1
+                self._push(notice)
+                self._changed(notice)
+                return
+            self.logger.error(f"Giving up on DM {notice.id} to user {notice.user_id} after {notice.attempts} attempts: {e}")
+            self._finish(notice, False, "failed")
+        else:
+            self._finish(notice, True, "delivered")
+
+    def _count(self, outcome, notice):
+        self.stats[outcome] += 1
+        self.stats[f"{outcome}:{notice.source}"] += 1
+
+    def _finish(self, notice, delivered, outcome):
+        self.pending.pop(notice.id, None)
+        self._count(outcome, notice)
+        if delivered:
+            self.wait_total += time.time() - notice.queued_at
+        if not notice.future.done():
+            notice.future.set_result(delivered)
+        # Closed DMs are saved too, so this saves even for notices with a view.
+        self._changed()
+
+    @commands.group()
+    @commands.is_owner()
+    async def dmqueue(self, ctx):
+        """Inspect the shared DM delivery queue."""
+        if ctx.invoked_subcommand is None:
+            await ctx.send_help(ctx.command)
+
+    @dmqueue.command(name="stats")
+    async def dmqueue_stats(self, ctx):
+        """Show queued, delivered, retried and failed DMs."""
+        delivered = self.stats["delivered"]
+        embed = discord.Embed(title="DM Queue", color=discord.Color.blue())
+        embed.add_field(name="Queued", value=f"{len(self.pending)} ({sum(1 for notice in self.pending.values() if notice.urgent)} urgent)", inline=True)
+        embed.add_field(name="Delivered", value=str(delivered), inline=True)
+        embed.add_field(name="Average Wait", value=f"{self.wait_total / delivered:.1f}s" if delivered else "n/a", inline=True)
+        embed.add_field(name="Retried", value=str(self.stats["retried"]), inline=True)
+        embed.add_field(name="Failed", value=str(self.stats["failed"]), inline=True)
+        embed.add_field(name="Skipped (DMs closed)", value=f"{self.stats['skipped_closed']} ({len(self.closed_dms)} users remembered)", inline=True)
+        sources = sorted({key.split(":", 1)[1] for key in self.stats if ":" in key})
+        rows = [
+            f"{source:<20}{self.stats['delivered:' + source]:>8}{self.stats['failed:' + source]:>8}{self.stats['skipped_closed:' + source]:>8}"
+            for source in sources
+        ]
+        if rows:
+            embed.add_field(name="By Source", value=box("\n".join([f"{'':<20}{'sent':>8}{'failed':>8}{'closed':>8}"] + rows)[:1000]), inline=False)
+        await ctx.send(embed=embed)
+
+    @dmqueue.command(name="forget")
+    async def dmqueue_forget(self, ctx, user: discord.User):
+        """Try DMing a user again even though their DMs were closed."""
+        if self.closed_dms.pop(user.id, None) is None:
+            await ctx.send(f"{user} is not marked as having closed DMs.")
+            return
+        self._changed()
+        await ctx.send(f"{user} will be sent DMs again.")
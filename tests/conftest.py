@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from benchmarks.bench_championscircle import Harness
+
+
+@pytest.fixture
+def run_harness():
+    """Run ``await body(harness)`` on a started ``Harness(size)`` and stop it afterwards."""
+
+    def run(size, body):
+        async def main():
+            harness = Harness(size)
+            await harness.start()
+            try:
+                return await body(harness)
+            finally:
+                await harness.stop()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,33 @@
+import asyncio
+import gc
+
+from championsCircle import bulk
+
+
+class _Bot:
+    def get_cog(self, name):
+        return None
+
+
+class _User:
+    id = 1
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(0.01)
+        self.sent.append(content)
+
+
+def test_inline_dm_is_held_until_sent():
+    async def run():
+        user = _User()
+        bulk.queue_dm(_Bot(), user, "hello", source="test")
+        gc.collect()
+        assert len(bulk._inline_sends) == 1
+        await asyncio.sleep(0.05)
+        assert user.sent == ["hello"]
+        assert not bulk._inline_sends
+
+    asyncio.run(run())
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from daypass import expiry
+from daypass.expiry import PassScheduler
+
+
+class _Bot:
+    def __init__(self):
+        self.guild = object()
+
+    def get_guild(self, guild_id):
+        return self.guild
+
+    async def wait_until_red_ready(self):
+        pass
+
+
+class _Cog:
+    def __init__(self, fail):
+        self.bot = _Bot()
+        self.fail = fail
+        self.calls = []
+
+    async def expire_passes(self, guild, tier, member_ids):
+        self.calls.append((tier, sorted(member_ids)))
+        if self.fail == "raise":
+            raise RuntimeError("Config write failed")
+        return {member_id for member_id in member_ids if member_id in self.fail}
+
+
+def _expire_due(scheduler):
+    async def run():
+        tasks = scheduler.dispatch(time.time())
+        await asyncio.gather(*tasks.values())
+
+    asyncio.run(run())
+
+
+def test_failed_removals_are_retried_with_backoff(monkeypatch):
+    monkeypatch.setattr(expiry, "RETRY_DELAY", 10.0)
+    scheduler = PassScheduler(_Cog(fail={2}))
+    scheduler.push(1, "vip", 1, time.time() - 1)
+    scheduler.push(1, "vip", 2, time.time() - 1)
+    _expire_due(scheduler)
+
+    assert scheduler.cog.calls == [("vip", [1, 2])]
+    assert (1, "vip", 1) not in scheduler
+    assert (1, "vip", 2) in scheduler
+    first_retry = scheduler._live[(1, "vip", 2)]
+    assert 5 < first_retry - time.time() <= 10
+
+    # Bring the retry forward instead of waiting for it.
+    scheduler.push(1, "vip", 2, time.time() - 1)
+    scheduler._failures[(1, "vip", 2)] = 1
+    _expire_due(scheduler)
+    assert 15 < scheduler._live[(1, "vip", 2)] - time.time() <= 20
+
+
+def test_whole_batch_is_retried_when_expiry_raises():
+    scheduler = PassScheduler(_Cog(fail="raise"))
+    scheduler.push(1, "default", 7, time.time() - 1)
+    _expire_due(scheduler)
+    assert (1, "default", 7) in scheduler
+
+
+def test_regranting_during_expiry_is_not_overridden_by_retry():
+    scheduler = PassScheduler(_Cog(fail={7}))
+    scheduler.push(1, "default", 7, time.time() - 1)
+    regranted_until = time.time() + 3600
+
+    async def run():
+        tasks = scheduler.dispatch(time.time())
+        scheduler.push(1, "default", 7, regranted_until)
+        await asyncio.gather(*tasks.values())
+
+    asyncio.run(run())
+    assert scheduler._live[(1, "default", 7)] == regranted_until
+
+
+def test_worker_wakes_up_for_a_retry_before_the_next_deadline(monkeypatch):
+    monkeypatch.setattr(expiry, "RETRY_DELAY", 0.25)
+    scheduler = PassScheduler(_Cog(fail={7}), window=0.0)
+
+    async def run():
+        scheduler.push(1, "default", 7, time.time())
+        scheduler.push(1, "default", 8, time.time() + 3600)
+        scheduler.start_worker()
+        try:
+            for _ in range(100):
+                if len(scheduler.cog.calls) >= 2:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            scheduler.stop()
+
+    asyncio.run(run())
+    assert scheduler.cog.calls[:2] == [("default", [7]), ("default", [7])]
@@ -0,0 +1,37 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from daypass.tiers import DEFAULT_DURATION, DEFAULT_TIER, migrate_guild_data
+
+
+@pytest.fixture(params=["UTC", "America/New_York", "Asia/Kolkata"])
+def host_timezone(request):
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = request.param
+    time.tzset()
+    yield request.param
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def test_single_role_becomes_default_tier():
+    data = {"schema_version": 0, "daypass_role_id": 5, "daypass_channel_id": 6, "active_passes": {}, "tiers": {}}
+    changed = migrate_guild_data(data)
+    assert {"tiers", "active_passes", "daypass_role_id", "daypass_channel_id"} <= changed
+    assert data["tiers"] == {DEFAULT_TIER: {"role_id": 5, "channel_id": 6, "duration": DEFAULT_DURATION}}
+    assert "daypass_role_id" not in data and "daypass_channel_id" not in data
+    assert migrate_guild_data(data) == set()
+
+
+def test_legacy_expiry_times_are_corrected_for_the_host_timezone(host_timezone):
+    # What the original cog stored for a pass ending in one hour.
+    legacy = (datetime.utcnow() + timedelta(hours=1)).timestamp()
+    data = {"schema_version": 0, "daypass_role_id": 5, "daypass_channel_id": 6, "active_passes": {"7": legacy}, "tiers": {}}
+    migrate_guild_data(data)
+    assert abs(data["active_passes"][DEFAULT_TIER]["7"] - (time.time() + 3600)) < 5
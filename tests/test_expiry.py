@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+
+def _status(cog, guild, member):
+    return cog.state.get(guild.id).applications.get(member.id).status
+
+
+def test_blocked_guild_does_not_hold_up_other_guilds(run_harness):
+    async def body(harness):
+        cog = harness.cog
+        blocked, blocked_member = harness.guild, harness.members[0]
+        free = harness.bot.add_guild()
+        free_member = free.add_member()
+        cog.state.get(free.id).set("render_window", 3600.0)
+        overdue = time.time() - cog.state.get(blocked.id)["application_duration"] * 86400 - 60
+        harness.add_applications(timestamp=overdue, members=[blocked_member, free_member])
+        for guild in (blocked, free):
+            cog.expiry.reschedule_guild(cog.state.get(guild.id))
+
+        async with cog.state.transaction(blocked.id):
+            tasks = cog.expiry.dispatch(time.time())
+            await asyncio.wait_for(tasks[free.id], 1)
+            assert _status(cog, free, free_member) == "cancelled"
+            assert _status(cog, blocked, blocked_member) == "active"
+            assert not tasks[blocked.id].done()
+        await asyncio.wait_for(tasks[blocked.id], 1)
+        assert _status(cog, blocked, blocked_member) == "cancelled"
+
+    run_harness(1, body)
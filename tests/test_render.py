@@ -0,0 +1,66 @@
+from unittest import mock
+
+import discord
+
+from benchmarks.fakes import FakeChannel, FakeMessage
+
+
+def test_render_survives_applications_cleared_mid_render(run_harness):
+    async def body(harness):
+        state = harness.cog.state.get(harness.guild.id)
+        harness.add_applications()
+        send = FakeChannel.send
+        sent = []
+
+        async def send_then_clear(self, *args, **kwargs):
+            # endtourney clears the store while the first board message is sent.
+            message = await send(self, *args, **kwargs)
+            sent.append(message)
+            if len(sent) == 2:
+                state.applications.clear()
+            return message
+
+        with mock.patch.object(FakeChannel, "send", send_then_clear):
+            await harness.cog.renderer.render(harness.guild, full=True)
+        assert len(state["board_message_ids"]) > 1
+
+    run_harness(1000, body)
+
+
+def test_full_render_deletes_board_messages_it_no_longer_needs(run_harness):
+    async def body(harness):
+        harness.add_applications()
+        await harness.cog.renderer.render(harness.guild, full=True)
+        state = harness.cog.state.get(harness.guild.id)
+        before = list(state["board_message_ids"])
+        assert len(before) > 2
+
+        kept = state.applications.get(harness.members[0].id)
+        state.applications.clear()
+        state.applications.add(kept)
+        await harness.cog.renderer.render(harness.guild, full=True)
+        assert state["board_message_ids"] == before[:1]
+        assert not set(before[1:]) & set(harness.channel.messages)
+
+    run_harness(600, body)
+
+
+def test_deleted_header_is_not_sent_again_without_its_buttons(run_harness):
+    async def body(harness):
+        state = harness.cog.state.get(harness.guild.id)
+        header = await harness.channel.send(embed=None)
+        state.set("champions_message_id", header.id)
+        harness.add_applications()
+
+        async def edit(self, **kwargs):
+            if self.id == header.id:
+                raise discord.NotFound(mock.Mock(status=404, reason="Not Found"), "Unknown Message")
+
+        with mock.patch.object(FakeMessage, "edit", edit):
+            await harness.cog.renderer.render(harness.guild, full=True)
+            harness.cog.renderer.request(harness.guild, full=True)
+            await harness.cog.renderer.render(harness.guild)
+        assert state["champions_message_id"] == header.id
+        assert len(harness.channel.messages) == 1 + len(state["board_message_ids"])
+
+    run_harness(5, body)
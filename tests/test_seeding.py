@@ -0,0 +1,27 @@
+import pytest
+
+from championsCircle.seeding import UNRANKED, format_rank, parse_rank
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Champion II Div 3", (16, 3, 0)),
+    ("GC1", (18, 0, 0)),
+    ("SSL", (21, 0, 0)),
+    ("Diamond 3 (1100 mmr)", (14, 0, 1100)),
+    ("c2 d4", (16, 4, 0)),
+    ("c2d4", (16, 4, 0)),
+    ("diamond d2", (12, 2, 0)),
+    ("d3", (14, 0, 0)),
+    ("1200mmr", (-1, 0, 1200)),
+    ("gc2 d2 1500 mmr", (19, 2, 1500)),
+    ("champ 1, peak 1600, currently 1400mmr", (15, 0, 1400)),
+    ("c3 12000mmr", (17, 0, 0)),
+    ("", UNRANKED),
+    ("no idea", UNRANKED),
+])
+def test_parse_rank(text, expected):
+    assert parse_rank(text) == expected
+
+
+def test_format_rank_round_trips_division():
+    assert format_rank(parse_rank("c2 d4")) == "Champion II Div IV"
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from benchmarks.fakes import FakeGroup
+from championsCircle.database import ApplicationDatabase
+from championsCircle.state import ApplicationStore
+
+
+def test_backend_is_committed_before_the_old_copy_is_removed(run_harness, tmp_path):
+    database = ApplicationDatabase(tmp_path / "applications.sqlite3").open()
+
+    async def body(harness):
+        harness.add_applications()
+        await harness.cog.state.flush()
+        committed = []
+
+        async def commit():
+            committed.append(harness.config.data[harness.guild.id].get("applications"))
+
+        async def clear_raw(self, key):
+            raise RuntimeError("Config write failed")
+
+        with mock.patch.object(FakeGroup, "clear_raw", clear_raw):
+            await harness.cog.state.switch_backend(database, commit=commit)
+        assert len(committed[0]) == 20
+        assert harness.cog.state.database is database
+        assert len(database.load(harness.guild.id)) == 20
+
+    try:
+        run_harness(20, body)
+    finally:
+        database.close()
+
+
+def test_sqlite_reload_keeps_the_store_order(run_harness, tmp_path):
+    database = ApplicationDatabase(tmp_path / "applications.sqlite3").open()
+
+    async def body(harness):
+        # Submit in reverse ID order so the primary key order differs.
+        harness.members.reverse()
+        harness.add_applications()
+        await harness.cog.state.switch_backend(database)
+        store = harness.cog.state.get(harness.guild.id).applications
+        for member in harness.members[20:5:-3]:
+            store.set_status(member.id, "approved")
+        store.set_status(harness.members[5].id, "denied")
+        store.set_status(harness.members[20].id, "denied")
+        await harness.cog.state.flush()
+        database.close()
+
+        reloaded = ApplicationStore(database.open().load(harness.guild.id), lambda: None)
+        assert list(reloaded.applications) == list(store.applications)
+        for status in ("active", "approved", "denied"):
+            assert [app.user_id for app in reloaded.with_status(status)] == [app.user_id for app in store.with_status(status)]
+
+    try:
+        run_harness(30, body)
+    finally:
+        database.close()
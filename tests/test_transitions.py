@@ -0,0 +1,33 @@
+import asyncio
+import random
+
+import pytest
+
+from benchmarks.stress_transitions import Stress, run
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_racing_transitions_leave_state_consistent(seed):
+    _, _, _, problems = asyncio.run(run(guilds=2, members=40, seed=seed))
+    assert problems == []
+
+
+def test_resubmit_after_approval_keeps_approval():
+    async def scenario():
+        stress = Stress(guilds=1, members=1, rng=random.Random(0))
+        await stress.start()
+        [guild] = stress.guilds
+        [member] = guild.applicants
+        try:
+            await stress.submit(guild, member)
+            await stress.approve(guild, member)
+            await stress.resubmit(guild, member)
+            applications = stress.cog.state.get(guild.id).applications
+            assert applications.get(member.id).status == "approved"
+            assert list(applications.seeding.seeds()) == [member.id]
+            assert member in guild.role.members
+            assert stress.check() == []
+        finally:
+            await stress.stop()
+
+    asyncio.run(scenario())